@@ -0,0 +1,49 @@
+"""
+Benchmark scriptleri için ortak kurulum.
+
+Her benchmark gerçek db.sqlite3'e dokunmadan, geçici bir SQLite dosyası
+(PostgreSQL'de test_<isim> veritabanı) üzerinde migrate edilmiş temiz bir
+veritabanı ile çalışır.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup(db_name=None, database=None):
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+    import django
+    from django.conf import settings
+
+    # "database": DATABASES['default'] üzerine yazılacak ayarlar (benchmark modları için)
+    default = settings.DATABASES['default']
+    default.update(database or {})
+    sqlite = default['ENGINE'].endswith('sqlite3')
+    if sqlite:
+        if db_name is None:
+            db_name = os.path.join(tempfile.mkdtemp(prefix='dalin-bench-'), 'bench.sqlite3')
+        default['NAME'] = db_name
+
+    django.setup()
+
+    if not sqlite:
+        # Sunucudaki gerçek veritabanına dokunma: test_<isim> oluşturulur ve migrate edilir
+        from django.db import connection
+        return connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_name
+
+
+def teardown(db_name):
+    from django.db import connection
+
+    if connection.vendor != 'sqlite':
+        connection.creation.destroy_test_db(db_name, verbosity=0)
@@ -0,0 +1,235 @@
+"""
+WSGI (sync view'lar) ile ASGI (store/async_views.py) verim karşılaştırması.
+
+Seed edilmiş geçici bir SQLite dosyası üzerinde iki sunucu sırayla açılır.
+Ardından asyncio tabanlı yerel bir yük üreticisi, müşterinin en sık açtığı
+sayfalara (ana sayfa, SSS, Siparişlerim, önizleme) --concurrency eşzamanlı
+keep-alive bağlantıyla --duration saniye boyunca istek atar.
+
+    pip install gunicorn uvicorn
+    python benchmarks/bench_asgi.py --concurrency 64 --duration 15
+
+Sunucu komutları --wsgi-cmd / --asgi-cmd ile değiştirilebilir ({port} ve
+{threads} yer tutucuları). Çalışan bir sunucuyu ölçmek için --wsgi-url /
+--asgi-url verilir (seed edilmiş veri yoksa sadece anonim sayfalar ölçülür).
+"""
+
+import argparse
+import asyncio
+import os
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from _bootstrap import ROOT, setup
+
+WSGI_CMD = 'gunicorn core.wsgi:application --workers 1 --threads {threads} --bind 127.0.0.1:{port}'
+ASGI_CMD = 'uvicorn core.asgi:application --workers 1 --no-access-log --host 127.0.0.1 --port {port}'
+
+
+# --- VERİ ---
+def seed(n_orders=200):
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from store.models import Order, OrderItem, Product, Profile
+
+    user = User.objects.create_user('bench', 'bench@example.com')
+    Profile.objects.filter(user=user).update(phone='0750', city='Erbil', address='Street 1', dalin_points=40)
+    Order.objects.bulk_create([Order(user=user, status='dubai', total_price_iqd=25000) for _ in range(n_orders)])
+    draft = Order.objects.create(user=user, status='draft')
+    OrderItem.objects.bulk_create([
+        OrderItem(order_id=order_id, product_link='https://shein.com/item', manual_price_usd='12.50')
+        for order_id in Order.objects.values_list('id', flat=True)
+    ])
+    Product.objects.bulk_create([
+        Product(title=f'Product {i}', price_usd=10, shein_link=f'https://shein.com/p{i}', image='products/p.jpg')
+        for i in range(24)
+    ])
+
+    # Oturum veritabanında; sunucu süreçleri aynı çerezi tanır
+    client = Client()
+    client.force_login(user)
+    session = client.cookies['sessionid'].value
+    return session, [
+        ('home', '/en/', False),
+        ('faq', '/en/faq/', False),
+        ('my_orders', '/en/my-orders/', True),
+        ('order_preview', f'/en/preview/{draft.pk}/', True),
+    ]
+
+
+# --- YÜK ÜRETİCİ ---
+async def fetch(reader, writer, host, path, cookie):
+    headers = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n'
+    if cookie:
+        headers += f'Cookie: sessionid={cookie}\r\n'
+    writer.write((headers + '\r\n').encode())
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('closed')
+    length, keep_alive, chunked = None, True, False
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value == 'close':
+            keep_alive = False
+        elif name == 'transfer-encoding' and value == 'chunked':
+            chunked = True
+
+    if chunked:
+        while (size := int((await reader.readline()).strip(), 16)):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        keep_alive = False
+    return int(status_line.split()[1]), keep_alive
+
+
+async def worker(base_url, paths, cookie, deadline, stats):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    connection = None
+    index = 0
+    while time.perf_counter() < deadline:
+        name, path, _ = paths[index % len(paths)]
+        index += 1
+        if connection is None:
+            connection = await asyncio.open_connection(host, port)
+        start = time.perf_counter()
+        try:
+            status, keep_alive = await fetch(*connection, f'{host}:{port}', path, cookie)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            stats['errors'] += 1
+            connection = None
+            continue
+        stats['latencies'].append(time.perf_counter() - start)
+        if status >= 400:
+            stats['errors'] += 1
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection:
+        connection[1].close()
+
+
+async def load(base_url, paths, cookie, concurrency, duration):
+    stats = {'latencies': [], 'errors': 0}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[
+        # Her bağlantı farklı sayfadan başlasın
+        worker(base_url, paths[i % len(paths):] + paths[:i % len(paths)], cookie, deadline, stats)
+        for i in range(concurrency)
+    ])
+    return stats
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+# --- SUNUCU ---
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, process, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('server did not start')
+
+
+def start_server(command, threads, env):
+    port = free_port()
+    args = shlex.split(command.format(port=port, threads=threads))
+    if not shutil.which(args[0]):
+        raise RuntimeError(f'{args[0]} is not installed')
+    process = subprocess.Popen(args, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        wait_for(port, process)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process, f'http://127.0.0.1:{port}'
+
+
+def measure(label, base_url, paths, cookie, args):
+    # Isınma: şablon/URL önbellekleri, bağlantılar
+    asyncio.run(load(base_url, paths, cookie, min(args.concurrency, 4), 1))
+    stats = asyncio.run(load(base_url, paths, cookie, args.concurrency, args.duration))
+    latencies = stats['latencies']
+    print(
+        f'{label:<5} {len(latencies) / args.duration:>8.1f} req/s  '
+        f'p50={percentile(latencies, 0.50) * 1000:>7.1f} ms  '
+        f'p95={percentile(latencies, 0.95) * 1000:>7.1f} ms  '
+        f'p99={percentile(latencies, 0.99) * 1000:>7.1f} ms  errors={stats["errors"]}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=64, help='Eşzamanlı bağlantı')
+    parser.add_argument('--duration', type=float, default=10, help='Ölçüm süresi (saniye)')
+    parser.add_argument('--threads', type=int, default=8, help='WSGI sunucusunun thread sayısı')
+    parser.add_argument('--wsgi-cmd', default=WSGI_CMD)
+    parser.add_argument('--asgi-cmd', default=ASGI_CMD)
+    parser.add_argument('--wsgi-url', help='Çalışan WSGI sunucusu (komut yerine)')
+    parser.add_argument('--asgi-url', help='Çalışan ASGI sunucusu (komut yerine)')
+    args = parser.parse_args()
+
+    db_name = setup()
+    cookie, paths = seed()
+    from django.db import connection
+    connection.close()
+
+    if args.wsgi_url or args.asgi_url:
+        # Dış sunucuda bizim oturumumuz yok: sadece anonim sayfalar
+        paths, cookie = [path for path in paths if not path[2]], None
+
+    env = {
+        **os.environ,
+        'DB_ENGINE': 'sqlite',
+        'SQLITE_PATH': db_name,
+        'PERF_SAMPLE_RATE': '0',
+        'PYTHONPATH': str(ROOT),
+    }
+    print(f"{args.concurrency} connections, {args.duration:g}s, pages: {', '.join(name for name, _, _ in paths)}")
+    for label, command, base_url in (
+        ('wsgi', args.wsgi_cmd, args.wsgi_url),
+        ('asgi', args.asgi_cmd, args.asgi_url),
+    ):
+        process = None
+        try:
+            if base_url is None:
+                process, base_url = start_server(command, args.threads, env)
+            measure(label, base_url, paths, cookie, args)
+        except RuntimeError as exc:
+            print(f'{label:<5} skipped: {exc}', file=sys.stderr)
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Eşzamanlı checkout (create_order + confirm_order) verimi: veritabanı modlarının karşılaştırması.
+
+    python benchmarks/bench_checkout.py --threads 8 --checkouts 25
+    DB_ENGINE=postgres DB_USER=... python benchmarks/bench_checkout.py --modes sqlite-wal,postgres
+
+Modlar:
+    sqlite-legacy  eski ayar: varsayılan journal, DEFERRED transaction, 5 sn timeout
+    sqlite-wal     core/settings.py'deki SQLite profili (WAL, busy_timeout, synchronous)
+    postgres       DB_* ortam değişkenleriyle PostgreSQL (test_<DB_NAME> üzerinde)
+
+Her mod ayrı bir süreçte çalışır (ayarlar django.setup() öncesi sabitlenir).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from _bootstrap import setup, teardown
+
+MODES = {
+    'sqlite-legacy': {
+        'env': {'DB_ENGINE': 'sqlite'},
+        'database': {'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    },
+    'sqlite-wal': {
+        'env': {'DB_ENGINE': 'sqlite'},
+        'database': {},
+    },
+    'postgres': {
+        'env': {'DB_ENGINE': 'postgres'},
+        'database': {},
+    },
+}
+
+
+def seed(n_users):
+    from django.contrib.auth.models import User
+    from store.models import Profile
+    from store.points import record
+
+    users = []
+    for i in range(n_users):
+        user = User.objects.create_user(f'bench{i}', f'bench{i}@example.com')
+        Profile.objects.filter(user=user).update(phone='0750', city='Erbil', address='Street 1')
+        record(user.id, 50, 'adjust')
+        users.append(user)
+    return users
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(mode, threads, checkouts, readers):
+    db_name = setup(database=MODES[mode]['database'])
+
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import resolve, reverse
+    from django.utils import translation
+
+    setup_test_environment()
+    users = seed(threads)
+    journal = None
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            journal = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+
+    def url(name, *args):
+        with translation.override('en'):
+            return reverse(name, args=args)
+
+    lock = threading.Lock()
+    latencies, errors = [], []
+    reads = 0
+    writers_done = threading.Event()
+    barrier = threading.Barrier(threads + readers)
+
+    def writer(user):
+        client = Client()
+        client.force_login(user)
+        barrier.wait()
+        for i in range(checkouts):
+            start = time.perf_counter()
+            try:
+                response = client.post(url('create_order'), {
+                    'links[]': ['https://shein.com/a', 'https://shein.com/b', 'https://shein.com/c'],
+                    'prices[]': ['12.50', '8', '3.99'],
+                    'use_points': 'on' if i % 2 else '',
+                })
+                order_id = resolve(response.url).kwargs['order_id']
+                client.post(url('confirm_order', order_id))
+            except Exception as exc:
+                with lock:
+                    errors.append(f'{type(exc).__name__}: {exc}')
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        connection.close()
+
+    def reader(user):
+        nonlocal reads
+        client = Client()
+        client.force_login(user)
+        barrier.wait()
+        while not writers_done.is_set():
+            try:
+                client.get(url('my_orders'))
+            except Exception as exc:
+                with lock:
+                    errors.append(f'{type(exc).__name__}: {exc}')
+                continue
+            with lock:
+                reads += 1
+        connection.close()
+
+    writer_threads = [threading.Thread(target=writer, args=(user,)) for user in users]
+    reader_threads = [threading.Thread(target=reader, args=(users[i % len(users)],)) for i in range(readers)]
+
+    start = time.perf_counter()
+    for thread in writer_threads + reader_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    writers_done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    from store.points import reconcile
+    drift = len(reconcile())
+    connection.close()
+    teardown(db_name)
+
+    return {
+        'mode': mode,
+        'vendor': connection.vendor,
+        'journal_mode': journal,
+        'checkouts': len(latencies),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'checkouts_per_s': round(len(latencies) / elapsed, 1),
+        'reads_per_s': round(reads / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'points_drift': drift,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='sqlite-legacy,sqlite-wal',
+                        help='Virgülle ayrılmış modlar: ' + ', '.join(MODES))
+    parser.add_argument('--threads', type=int, default=8, help='Eşzamanlı checkout yapan kullanıcı sayısı')
+    parser.add_argument('--checkouts', type=int, default=25, help='Kullanıcı başına checkout')
+    parser.add_argument('--readers', type=int, default=2, help='Aynı anda "Siparişlerim" okuyan thread sayısı')
+    parser.add_argument('--json', action='store_true', help='Sonuçları JSON olarak yazdır')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run(args.child, args.threads, args.checkouts, args.readers)))
+        return
+
+    results = []
+    for mode in args.modes.split(','):
+        if mode not in MODES:
+            parser.error(f'unknown mode: {mode}')
+        command = [
+            sys.executable, os.path.abspath(__file__), '--child', mode,
+            '--threads', str(args.threads), '--checkouts', str(args.checkouts),
+            '--readers', str(args.readers),
+        ]
+        child = subprocess.run(
+            command, env={**os.environ, **MODES[mode]['env']},
+            capture_output=True, text=True,
+        )
+        if child.returncode:
+            print(f'{mode}: failed\n{child.stderr}', file=sys.stderr)
+            continue
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f'{args.threads} writers x {args.checkouts} checkouts, {args.readers} readers')
+    for row in results:
+        print(
+            f"{row['mode']:<14} {row['checkouts_per_s']:>7} checkout/s  "
+            f"p50={row['p50_ms']:>7} ms  p95={row['p95_ms']:>7} ms  "
+            f"reads={row['reads_per_s']:>7}/s  errors={row['errors']}  drift={row['points_drift']}"
+        )
+        if row['first_error']:
+            print(f"{'':<14} first error: {row['first_error'][:100]}")
+
+
+if __name__ == '__main__':
+    main()
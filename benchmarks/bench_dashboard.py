@@ -0,0 +1,113 @@
+"""
+Admin ana sayfasındaki get_dashboard_stats için önce/sonra karşılaştırması.
+
+    python benchmarks/bench_dashboard.py --orders 100000
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from _bootstrap import setup
+
+
+def legacy_dashboard_stats():
+    # Eski uygulama: her sipariş için items.first() + dört ayrı count()
+    from store.models import Order
+    from store.pricing import MARKET_RATE
+
+    valid_orders = Order.objects.exclude(status__in=['draft', 'cancelled', 'cancel_requested'])
+    total_revenue_iqd = 0
+    total_real_cost_iqd = 0
+    for order in valid_orders:
+        if order.total_price_iqd:
+            total_revenue_iqd += order.total_price_iqd
+        item = order.items.first()
+        if order.actual_cost_usd:
+            total_real_cost_iqd += order.actual_cost_usd * Decimal(MARKET_RATE)
+        elif item and item.manual_price_usd:
+            total_real_cost_iqd += item.manual_price_usd * Decimal(MARKET_RATE)
+
+    Order.objects.filter(status='draft').count()
+    Order.objects.filter(status='pending').count()
+    Order.objects.filter(status__in=['approved', 'dubai', 'shipping', 'arrived']).count()
+    Order.objects.filter(status='delivered').count()
+    return total_revenue_iqd - total_real_cost_iqd
+
+
+def seed(n_orders, n_users=500, batch_size=5000):
+    from django.contrib.auth.models import User
+    from store.models import Order, OrderItem
+
+    rng = random.Random(42)
+    statuses = [code for code, _ in Order.STATUS_CHOICES]
+
+    User.objects.bulk_create(
+        [User(username=f'bench{i}') for i in range(n_users)], batch_size=batch_size
+    )
+    user_ids = list(User.objects.values_list('id', flat=True))
+
+    orders = []
+    for _ in range(n_orders):
+        orders.append(Order(
+            user_id=rng.choice(user_ids),
+            status=rng.choice(statuses),
+            total_price_iqd=Decimal(rng.randint(20, 400) * 1000),
+            actual_cost_usd=Decimal(rng.randint(10, 200)) if rng.random() < 0.5 else None,
+        ))
+    Order.objects.bulk_create(orders, batch_size=batch_size)
+
+    items = []
+    for order_id in Order.objects.values_list('id', flat=True):
+        for _ in range(rng.randint(1, 3)):
+            items.append(OrderItem(
+                order_id=order_id,
+                product_link='https://shein.com/item',
+                manual_price_usd=Decimal(rng.randint(500, 9000)) / 100,
+            ))
+    OrderItem.objects.bulk_create(items, batch_size=batch_size)
+
+    # bulk_create sinyal tetiklemez; özet tablosunu elle dolduralım
+    from store.reports import rebuild_rollups
+    rebuild_rollups()
+
+
+def measure(label, func):
+    from django.db import connection
+
+    # CaptureQueriesContext 9000 sorguda kesiliyor; sayacı kendimiz tutalım
+    queries = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    print(f'{label:<8} queries={queries:>7}  wall={elapsed * 1000:10.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=100_000)
+    parser.add_argument('--skip-legacy', action='store_true', help='Eski (yavaş) uygulamayı çalıştırma')
+    args = parser.parse_args()
+
+    setup()
+    seed(args.orders)
+
+    from store.templatetags.admin_dashboard import get_dashboard_stats
+
+    print(f'{args.orders} orders')
+    if not args.skip_legacy:
+        measure('before', legacy_dashboard_stats)
+    # Listeler lazy QuerySet; şablondaki gibi değerlendirelim
+    measure('after', lambda: [list(v) if hasattr(v, 'query') else v for v in get_dashboard_stats().values()])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Sipariş CSV dışa aktarımının ilk bayta kadar geçen süresi ve tepe bellek kullanımı.
+
+    python benchmarks/bench_export.py --orders 500000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from _bootstrap import setup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+
+    from bench_dashboard import seed
+    seed(args.orders)
+
+    from store.exports import csv_stream, export_rows
+    from store.models import Order
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    stream = csv_stream(export_rows(Order.objects.exclude(status='draft'), chunk_size=args.chunk_size))
+    first_byte = None
+    size = rows = 0
+    for chunk in stream:
+        if first_byte is None and rows:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+        rows += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'{args.orders} orders -> {rows - 2} rows, {size / 1e6:.1f} MB CSV')
+    print(f'first row after {first_byte * 1000:.1f} ms, total {elapsed:.1f} s, peak python memory {peak / 1e6:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+Checkout hunisi yük testi: gerçekçi veriyle doldurulmuş veritabanında
+create_order -> order_preview -> confirm_order -> admin durum değişiklikleri
+adımlarını Django test client ile sürer. Her adım için gecikme yüzdelikleri
+ve sorgu sayıları JSON'a yazılır; iki commit'in sonuçları karşılaştırılabilir.
+
+    python benchmarks/bench_funnel.py --users 200 --orders 20000 --runs 50 -o after.json
+    python benchmarks/bench_funnel.py --runs 50 --compare before.json
+
+--compare verilirse sorgu sayısı artan veya p95'i --tolerance oranından fazla
+yavaşlayan adımlar listelenir ve çıkış kodu 1 olur (CI'da kullanılabilir).
+
+Ekran görüntüleri istek içinde işlenir (IMAGE_WORKERS=0): create_order
+süresi küçültme dahil en kötü durumu gösterir, arka plan thread'leri
+ölçümleri bozmaz.
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+from _bootstrap import ROOT, setup, teardown
+
+STEPS = (
+    'home', 'create_order_form', 'create_order', 'order_preview', 'confirm_order',
+    'my_orders', 'admin_changelist', 'admin_approve', 'admin_deliver',
+)
+
+
+# --- VERİ ---
+def screenshot_bytes():
+    from PIL import Image
+
+    # Gradyan + gürültü: gerçek telefon ekran görüntüsü gibi sıkışır
+    image = Image.linear_gradient('L').resize((900, 1600)).convert('RGB')
+    noise = Image.effect_noise((900, 1600), 40).convert('RGB')
+    image = Image.blend(image, noise, 0.3)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def seed(n_users, n_orders, rng, batch_size=5000):
+    from django.contrib.auth.models import User
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from django.utils import timezone
+    from store.models import Order, OrderItem, OrderScreenshot, PointsTransaction, Profile
+    from store.points import record_many
+    from store.reports import rebuild_rollups
+
+    cities = ['Erbil', 'Sulaymaniyah', 'Duhok', 'Kirkuk', 'Baghdad']
+    User.objects.bulk_create(
+        [User(username=f'bench{i}', email=f'bench{i}@example.com') for i in range(n_users)],
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.values_list('id', flat=True))
+    # bulk_create sinyal tetiklemez; profilleri elle oluştur
+    Profile.objects.bulk_create([
+        Profile(user_id=user_id, phone=f'0750{user_id:07d}', city=rng.choice(cities), address='Street 1')
+        for user_id in user_ids
+    ], batch_size=batch_size)
+
+    statuses = [code for code, _ in Order.STATUS_CHOICES]
+    Order.objects.bulk_create([
+        Order(
+            user_id=rng.choice(user_ids),
+            status=rng.choice(statuses),
+            total_price_iqd=Decimal(rng.randint(20, 400) * 1000),
+            actual_cost_usd=Decimal(rng.randint(10, 200)) if rng.random() < 0.5 else None,
+        )
+        for _ in range(n_orders)
+    ], batch_size=batch_size)
+    order_ids = list(Order.objects.values_list('id', flat=True))
+
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order_id=order_id,
+            product_link=f'https://shein.com/item-{rng.randint(1, 5000)}',
+            manual_price_usd=Decimal(rng.randint(500, 9000)) / 100,
+        )
+        for order_id in order_ids
+        for _ in range(rng.randint(1, 5))
+    ], batch_size=batch_size)
+
+    # Her beş siparişten birinde (işlenmiş) ekran görüntüsü; dosya ortak
+    image = default_storage.save('screenshots/bench.jpg', ContentFile(screenshot_bytes()))
+    now = timezone.now()
+    OrderScreenshot.objects.bulk_create([
+        OrderScreenshot(order_id=order_id, image=image, thumbnail=image, processed_at=now)
+        for order_id in order_ids if rng.random() < 0.2
+    ], batch_size=batch_size)
+
+    # Puan kullanan checkout'lar için başlangıç bakiyesi
+    record_many([
+        PointsTransaction(user_id=user_id, kind='adjust', amount=rng.randint(0, 50))
+        for user_id in user_ids
+    ])
+    # bulk_create sinyal tetiklemez; özet tablosunu elle dolduralım
+    rebuild_rollups()
+
+
+# --- ÖLÇÜM ---
+class Recorder:
+    def __init__(self):
+        self.samples = {step: [] for step in STEPS}
+        self.queries = {step: [] for step in STEPS}
+        self.recording = True
+
+    def step(self, name, func):
+        from django.db import connection
+
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = func()
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f'{name}: HTTP {response.status_code}')
+        if self.recording:
+            self.samples[name].append(elapsed * 1000)
+            self.queries[name].append(count)
+        return response
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(recorder):
+    steps = {}
+    for step in STEPS:
+        samples, queries = recorder.samples[step], recorder.queries[step]
+        if not samples:
+            continue
+        steps[step] = {
+            'count': len(samples),
+            'p50_ms': round(percentile(samples, 0.50), 2),
+            'p95_ms': round(percentile(samples, 0.95), 2),
+            'p99_ms': round(percentile(samples, 0.99), 2),
+            'max_ms': round(max(samples), 2),
+            'queries_median': statistics.median(queries),
+            'queries_max': max(queries),
+        }
+    return steps
+
+
+def run_funnel(runs, warmup, rng):
+    from django.contrib.auth.models import User
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client
+    from django.urls import resolve, reverse
+    from django.utils import translation
+
+    def url(name, *args):
+        with translation.override('en'):
+            return reverse(name, args=args)
+
+    staff = User.objects.create_superuser('bench-admin', 'admin@example.com', 'pass')
+    admin = Client()
+    admin.force_login(staff)
+    anonymous = Client()
+    # --seed ile aynı kullanıcılar seçilsin (order_by('?') veritabanına göre değişir)
+    customers = rng.sample(list(User.objects.filter(is_staff=False).order_by('id')), runs + warmup)
+    upload = screenshot_bytes()
+    changelist = url('admin:store_order_changelist')
+
+    recorder = Recorder()
+    for index, user in enumerate(customers):
+        recorder.recording = index >= warmup
+        client = Client()
+        client.force_login(user)
+        count = rng.randint(1, 6)
+
+        recorder.step('home', lambda: anonymous.get(url('home')))
+        recorder.step('create_order_form', lambda: client.get(url('create_order')))
+        response = recorder.step('create_order', lambda: client.post(url('create_order'), {
+            'links[]': [f'https://shein.com/item-{rng.randint(1, 5000)}' for _ in range(count)],
+            'prices[]': [f'{rng.randint(500, 9000) / 100:.2f}' for _ in range(count)],
+            'use_points': 'on' if rng.random() < 0.3 else '',
+            'screenshots': [SimpleUploadedFile('cart.jpg', upload, content_type='image/jpeg')],
+        }))
+        order_id = resolve(response.url).kwargs['order_id']
+        recorder.step('order_preview', lambda: client.get(url('order_preview', order_id)))
+        recorder.step('confirm_order', lambda: client.post(url('confirm_order', order_id)))
+        recorder.step('my_orders', lambda: client.get(url('my_orders')))
+
+        recorder.step('admin_changelist', lambda: admin.get(changelist, {'status__exact': 'pending'}))
+        for step, action in (('admin_approve', 'mark_approved'), ('admin_deliver', 'mark_delivered')):
+            recorder.step(step, lambda: admin.post(changelist, {
+                'action': action, '_selected_action': [order_id], 'index': 0,
+            }))
+    return recorder
+
+
+# --- KARŞILAŞTIRMA ---
+def compare(baseline, current, tolerance):
+    regressions = []
+    print(f"{'step':<18} {'p95 before':>11} {'p95 after':>10} {'change':>8}   queries")
+    for step, after in current['steps'].items():
+        before = baseline['steps'].get(step)
+        if before is None:
+            print(f'{step:<18} {"-":>11} {after["p95_ms"]:>10} {"new":>8}   {after["queries_max"]}')
+            continue
+        change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+        flags = []
+        if change > tolerance:
+            flags.append('SLOWER')
+        if after['queries_max'] > before['queries_max']:
+            flags.append('MORE QUERIES')
+        if flags:
+            regressions.append(step)
+        print(
+            f'{step:<18} {before["p95_ms"]:>11} {after["p95_ms"]:>10} {change:>+8.0%}   '
+            f'{before["queries_max"]} -> {after["queries_max"]}  {" ".join(flags)}'
+        )
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--orders', type=int, default=20_000)
+    parser.add_argument('--runs', type=int, default=50, help='Ölçülen huni sayısı (her biri farklı kullanıcı)')
+    parser.add_argument('--warmup', type=int, default=5, help='Ölçülmeyen ısınma hunisi')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-o', '--output', help='Sonuçların yazılacağı JSON dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki JSON sonucu')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='İzin verilen p95 yavaşlama oranı')
+    args = parser.parse_args()
+    if args.runs + args.warmup > args.users:
+        parser.error('--users must be at least --runs + --warmup')
+
+    db_name = setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+
+    setup_test_environment()
+    media = tempfile.mkdtemp(prefix='dalin-bench-media-')
+    # Ölçüm middleware'i ve arka plan işçileri sonuçları oynatmasın
+    override_settings(MEDIA_ROOT=media, IMAGE_WORKERS=0, PERF_SAMPLE_RATE=0).enable()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    seed(args.users, args.orders, rng)
+    seeded = time.perf_counter() - start
+
+    recorder = run_funnel(args.runs, args.warmup, rng)
+    result = {
+        'meta': {
+            'commit': git_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'vendor': connection.vendor,
+            'users': args.users,
+            'orders': args.orders,
+            'runs': args.runs,
+            'seed': args.seed,
+            'seed_s': round(seeded, 1),
+            'debug': settings.DEBUG,
+        },
+        'steps': summarize(recorder),
+    }
+    connection.close()
+    teardown(db_name)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(json.load(baseline), result, args.tolerance)
+        if regressions:
+            print(f"\nRegressions: {', '.join(regressions)}")
+            sys.exit(1)
+        return
+
+    print(f"{args.users} users, {args.orders} orders, {args.runs} funnels ({connection.vendor})")
+    for step, row in result['steps'].items():
+        print(
+            f"{step:<18} p50={row['p50_ms']:>8} ms  p95={row['p95_ms']:>8} ms  "
+            f"p99={row['p99_ms']:>8} ms  queries={row['queries_median']:g}/{row['queries_max']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Her render edilen şablonda çalışan language_processor'ın istek başı maliyeti.
+
+    python benchmarks/bench_translations.py
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+from _bootstrap import setup
+
+
+class FakeRequest:
+    LANGUAGE_CODE = 'ckb'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20_000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from store import translations
+    from store.context_processors import language_processor
+
+    request = FakeRequest()
+
+    def legacy():
+        # Eski davranış: her çağrıda bütün sözlüğü yeniden kur
+        translations._base_dictionary().get(request.LANGUAGE_CODE)
+
+    def current():
+        language_processor(request)
+
+    override = os.path.join(tempfile.mkdtemp(), 'overrides.json')
+    with open(override, 'w', encoding='utf-8') as f:
+        json.dump({'ckb': {'home': 'Home'}}, f)
+
+    cases = [('before', legacy, None), ('after', current, None), ('after+file', current, override)]
+    for label, func, path in cases:
+        settings.TRANSLATIONS_OVERRIDE_FILE = path
+        func()
+        seconds = timeit.timeit(func, number=args.number)
+        print(f'{label:<11} {seconds / args.number * 1e6:8.2f} µs/request')
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from store.asgi import SharedThreadStreams
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Sık okunan müşteri sayfalarını async view'larla sun (store/async_views.py)
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
-application = get_asgi_application()
+# Canlı sipariş durumu (SSE) bağlantıları istek başına thread tutmasın (store/asgi.py)
+application = SharedThreadStreams(get_asgi_application())
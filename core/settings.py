@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'store.perf.PerformanceMiddleware', # En başta: tüm zinciri ölçer
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware', # Dil tespiti için gerekli (Kalsın)
@@ -66,7 +67,7 @@ ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'store.perf.TimedDjangoTemplates', # DjangoTemplates + render süresi ölçümü
         'DIRS': [BASE_DIR / 'store' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -87,13 +88,71 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
-# Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# --- VERİTABANI ---
+# Ortam değişkenleriyle seçilir: DB_ENGINE=postgres ise PostgreSQL (psycopg
+# kurulu olmalı), aksi halde SQLite. Bağlantılar DB_CONN_MAX_AGE saniye
+# boyunca isteklerde yeniden kullanılır; kopmuş bağlantı health check ile yenilenir.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'dalinshopping'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    # WAL: okuyucular yazanı beklemez ("database is locked" takılmalarının asıl sebebi).
+    # synchronous=NORMAL WAL ile güvenli; elektrik kesintisinde en fazla son commit kaybolur.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20))  # saniye
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # SQLite select_for_update'i yok sayar; yazma kilidini transaction
+                # başında alarak eşzamanlı puan/sipariş işlemlerini sıraya sokuyoruz.
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT,
+                'init_command': (
+                    f'PRAGMA journal_mode={SQLITE_JOURNAL_MODE};'
+                    f'PRAGMA synchronous={SQLITE_SYNCHRONOUS};'
+                    f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000}'
+                ),
+            },
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+
+# --- CACHE ---
+# Varsayılan süreç içi bellek; CACHE_DIR verilirse birden çok worker aynı
+# önbelleği paylaşsın diye dosya tabanlı backend kullanılır.
+if os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'dalin-shopping',
+        }
     }
-}
 
 
 # Password validation
@@ -132,15 +191,43 @@ LANGUAGES = [
     ('ckb', _('Kurdish')), # ku yerine ckb yaptık
 ]
 
+# store/translations.py'deki metinleri deploy etmeden değiştirmek için JSON dosyası.
+# Örn: {"en": {"home": "Home"}}. Dosya sadece değiştiğinde (mtime) tekrar okunur.
+TRANSLATIONS_OVERRIDE_FILE = os.environ.get('TRANSLATIONS_OVERRIDE_FILE')
+
 
 # --- STATIC & MEDIA FILES ---
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+# collectstatic hash'li dosya adları + .gz/.br kopyaları üretir (store/staticfiles.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'store.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+# Önde statik dosya sunucusu yoksa Django sunsun (uzun süreli önbellek başlıklarıyla)
+SERVE_STATIC = os.environ.get('SERVE_STATIC') == '1'
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Ekran görüntüsü küçültme işçi sayısı (0 = istek içinde, commit sonrası)
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+
+# İstek performans ölçümü (store/perf.py): isteklerin ne kadarı ölçülsün (0-1).
+# Sonuçlar: /admin/performance/. Server-Timing başlığı süreleri herkese (anonim
+# ziyaretçi dahil) gösterir; sadece geliştirme/yük testinde açın.
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', 0.1))
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', '0') == '1'
+
+# ASGI altında (core/asgi.py açar) sık okunan sayfalar store/async_views.py'den sunulur
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
+# Canlı sipariş durumu (SSE): süreçler arası yayın için broker sınıfının yolu
+# (protokol: store.status_stream.Broker); boşsa olaylar sadece aynı süreçte dağıtılır
+STATUS_BROKER = os.environ.get('STATUS_BROKER', '')
+
 
 # Giriş/Çıkış Yönlendirmeleri
 LOGIN_URL = 'login'
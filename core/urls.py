@@ -4,7 +4,7 @@ Updated for Multi-Language Support (I18N)
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns # <-- BU ÇOK ÖNEMLİ
@@ -13,16 +13,30 @@ from django.contrib.auth import views as auth_views
 from store.views import (
     home, create_order, order_preview, confirm_order, edit_order,
     order_success, my_orders, cancel_order, profile_view, 
-    register_view, login_view, logout_view, faq_view
+    register_view, login_view, logout_view, faq_view,
+    performance_dashboard, order_status,
 )
 
+# ASGI: okuma ağırlıklı sayfaların async sürümleri (aynı URL adları)
+if settings.ASYNC_VIEWS:
+    from store.async_views import home, my_orders, order_preview, faq_view, order_status
+
 # 1. Dil Değiştirme Fonksiyonu (Navbar'daki butonlar için şart)
 urlpatterns = [
     path('i18n/', include('django.conf.urls.i18n')),
+    # JSON uç noktası: dil önekine gerek yok (etiketler istek dilinde döner)
+    path('api/orders/status/', order_status, name='order_status'),
 ]
 
+# Canlı sipariş durumu (SSE) sadece ASGI'da: WSGI'da her bağlantı bir thread tutardı
+if settings.ASYNC_VIEWS:
+    from store.async_views import order_events
+    urlpatterns += [path('api/orders/events/', order_events, name='order_events')]
+
 # 2. Bütün Sayfaları Dil Desteği İçine Alıyoruz (i18n_patterns)
 urlpatterns += i18n_patterns(
+    # admin.site.urls'ten önce olmalı, yoksa admin'in catch-all'u yakalar
+    path('admin/performance/', performance_dashboard, name='perf_dashboard'),
     path('admin/', admin.site.urls),
     path('', home, name='home'),
     
@@ -56,6 +70,11 @@ urlpatterns += i18n_patterns(
     # Şu an varsayılan ayarda bıraktım, her dilde kod görünecek (Örn: /en/new-order, /ar/new-order).
 )
 
+# Statik dosyalar (collectstatic çıktısı), önde nginx vb. yoksa
+if settings.SERVE_STATIC:
+    from store.staticfiles import serve_static
+    urlpatterns += [re_path(r'^static/(?P<path>.+)$', serve_static)]
+
 # Medya Dosyaları (Resimler) için
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,6 +1,12 @@
 from django.contrib import admin
+from django.utils import timezone
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils.html import format_html
-from .models import Profile, Order, OrderItem, Product, OrderScreenshot
+from .models import Profile, Order, OrderItem, Product, OrderScreenshot, DailySalesRollup, EmailOutbox, ExchangeRate, PointsTransaction
+from .exports import csv_stream, export_filename, export_rows, openpyxl, write_xlsx
+from .reports import order_bucket, refresh_rollups
+from .points import record
+from .transitions import PIPELINE_STATUSES, bulk_set_status
 
 # --- 1. SİPARİŞ İÇİNDEKİ LİNKLER ---
 class OrderItemInline(admin.TabularInline):
@@ -14,15 +20,45 @@ class OrderItemInline(admin.TabularInline):
 class OrderScreenshotInline(admin.TabularInline):
     model = OrderScreenshot
     extra = 0
+    exclude = ('thumbnail', 'processed_at')
     readonly_fields = ('image_preview',)
 
     def image_preview(self, obj):
+        # Küçük önizleme varsa onu göster; tıklayınca tam boyut açılır
         if obj.image:
-            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height: 100px; border-radius: 5px;" /></a>', obj.image.url, obj.image.url)
+            return format_html('<a href="{}" target="_blank"><img src="{}" loading="lazy" style="max-height: 100px; border-radius: 5px;" /></a>', obj.image.url, obj.preview_url)
         return ""
     image_preview.short_description = "Preview"
 
+# --- MUHASEBE DIŞA AKTARIMI ---
+# Seçili (veya filtrelenmiş "tümünü seç") siparişleri sabit bellekle akıtır
+def export_orders_csv(modeladmin, request, queryset):
+    response = StreamingHttpResponse(csv_stream(export_rows(queryset)), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename("csv")}"'
+    return response
+export_orders_csv.short_description = "Export selected to CSV"
+
+# XLSX bir ZIP: dosya tamamı geçici dosyaya yazılmadan ilk bayt gönderilemez.
+# Büyük dışa aktarımlar için CSV (akış) veya "manage.py export_orders --format xlsx".
+def export_orders_xlsx(modeladmin, request, queryset):
+    return FileResponse(
+        write_xlsx(export_rows(queryset)),
+        as_attachment=True,
+        filename=export_filename('xlsx'),
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+export_orders_xlsx.short_description = "Export selected to Excel (XLSX, built before download; large: use CSV or export_orders)"
+
 # --- 3. SİPARİŞ YÖNETİMİ ---
+# Seçili siparişleri tek transaction içinde yeni duruma taşıyan admin aksiyonu
+def make_status_action(status, label):
+    def action(modeladmin, request, queryset):
+        updated = bulk_set_status(queryset, status)
+        modeladmin.message_user(request, f"{updated} order(s) moved to {label}.")
+    action.__name__ = f'mark_{status}'
+    action.short_description = f"Move selected to: {label}"
+    return action
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     # LİSTEDE GÖRÜNECEKLER (actual_cost_usd EKLENDİ)
@@ -33,22 +69,38 @@ class OrderAdmin(admin.ModelAdmin):
     
     list_filter = ('status', 'created_at')
     search_fields = ('user__username', 'user__first_name', 'user__profile__phone')
+    # Müşteri seçimi tüm kullanıcıları <select>'e doldurmasın
+    raw_id_fields = ('user',)
+    # Filtreli listede ikinci bir COUNT(*) atmasın
+    show_full_result_count = False
     inlines = [OrderItemInline, OrderScreenshotInline]
-    readonly_fields = ('customer_info', 'cancel_reason')
+    readonly_fields = ('customer_info', 'cancel_reason', 'our_rate', 'market_rate')
+    actions = [
+        make_status_action(code, label)
+        for code, label in Order.STATUS_CHOICES if code in PIPELINE_STATUSES
+    ] + [export_orders_csv] + ([export_orders_xlsx] if openpyxl else [])
     
     fieldsets = (
         ('Order Info', {
             # actual_cost_usd BURAYA DA EKLENDİ
-            'fields': ('user', 'status', 'total_price_iqd', 'actual_cost_usd', 'tracking_note', 'cancel_reason')
+            'fields': ('user', 'status', 'total_price_iqd', 'actual_cost_usd', 'our_rate', 'market_rate', 'tracking_note', 'cancel_reason')
         }),
         ('Customer Details', {
             'fields': ('customer_info',)
         }),
     )
 
+    # Liste ve düzenleme sayfası: kullanıcı + profil tek JOIN ile gelir
+    # (customer_phone / customer_info satır başına sorgu atmaz). Aksiyonlar da
+    # bu queryset'i alır; toplu durum değişikliği siparişleri pk ile yeniden
+    # seçip sadece sipariş satırlarını kilitler (transitions.lock_orders).
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user__profile')
+
     def customer_phone(self, obj):
         return obj.user.profile.phone
     customer_phone.short_description = "Phone"
+    customer_phone.admin_order_field = 'user__profile__phone'
 
     def status_colored(self, obj):
         color = 'black'
@@ -85,12 +137,71 @@ class OrderAdmin(admin.ModelAdmin):
         )
     customer_info.short_description = "Delivery Details"
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Inline'larda ürün eklendi/silindiyse maliyet değişmiş olabilir
+        refresh_rollups([order_bucket(form.instance)])
+
 # --- DİĞERLERİ ---
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'phone', 'city', 'dalin_points')
+    list_select_related = ('user',)
+    search_fields = ('user__username', 'phone')
+    # Bakiye sadece defterden değişir; düzeltme için Points Transactions'a "adjust" satırı ekleyin
+    readonly_fields = ('dalin_points',)
+
+# Defter sadece eklenir: düzenleme/silme yok, elle eklenen her satır "adjust" olur
+@admin.register(PointsTransaction)
+class PointsTransactionAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'user', 'kind', 'amount', 'order', 'note')
+    # Order.__str__ kullanıcı adını da gösteriyor
+    list_select_related = ('user', 'order__user')
+    list_filter = ('kind',)
+    search_fields = ('user__username', 'note')
+    raw_id_fields = ('user', 'order')
+    fields = ('user', 'amount', 'note')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        entry = record(obj.user_id, obj.amount, 'adjust', note=obj.note)
+        obj.pk, obj.kind, obj.created_at = entry.pk, entry.kind, entry.created_at
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ('title', 'price_usd', 'is_active')
-    list_editable = ('is_active',)
\ No newline at end of file
+    list_editable = ('is_active',)
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ('effective_from', 'our_rate', 'market_rate', 'created_at')
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'status', 'order_count', 'revenue_iqd', 'real_cost_usd', 'discount_iqd', 'points_spent', 'points_earned')
+    list_filter = ('status',)
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('order', 'to_email', 'subject', 'body', 'attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        queryset.exclude(status='sent').update(status='queued', next_attempt_at=timezone.now())
+    retry_now.short_description = "Retry selected emails now"
@@ -0,0 +1,50 @@
+import logging
+from functools import cached_property
+
+from django.urls import NoReverseMatch, reverse
+
+logger = logging.getLogger(__name__)
+
+# --- UZUN ÖMÜRLÜ AKIŞLAR İÇİN ORTAK THREAD ---
+# Django her ASGI isteğini kendi ThreadSensitiveContext'inde çalıştırır: senkron
+# middleware'ler için açılan thread yanıt bitene kadar yaşar. Saatlerce açık
+# kalan SSE bağlantılarında bu, abone başına bir thread demek. Bu sarmalayıcı
+# canlı durum akışını (order_events) bağlamsız çalıştırır; senkron kısımlar
+# ortak tek thread'i kullanır, boşta bekleyen abone thread tutmaz.
+#
+# ASGIHandler.handle Django'nun iç metodu: bulunamazsa (Django değişirse)
+# istekler olağan yoldan geçer, sadece bu tasarruf kaybolur.
+SHARED_THREAD_ROUTES = ('order_events',)
+
+
+class SharedThreadStreams:
+    def __init__(self, application):
+        self.application = application
+        self.handle = getattr(application, 'handle', None)
+        if self.handle is None:
+            logger.warning("ASGI handler has no handle(); event streams will use per-request threads")
+
+    # URL'ler uygulama yüklendikten sonra, ilk istekte çözülür. ASYNC_VIEWS
+    # kapalıysa rota yoktur, hiçbir istek ayrı yoldan gitmez.
+    @cached_property
+    def paths(self):
+        paths = set()
+        for name in SHARED_THREAD_ROUTES:
+            try:
+                paths.add(reverse(name))
+            except NoReverseMatch:
+                pass
+        return frozenset(paths)
+
+    def shares_thread(self, scope):
+        if self.handle is None or scope['type'] != 'http':
+            return False
+        path, root_path = scope['path'], scope.get('root_path') or ''
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return path in self.paths
+
+    async def __call__(self, scope, receive, send):
+        if self.shares_thread(scope):
+            return await self.handle(scope, receive, send)
+        return await self.application(scope, receive, send)
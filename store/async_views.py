@@ -0,0 +1,125 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.views.decorators.cache import never_cache
+
+from . import status_feed, status_stream
+from .conditional import amy_orders_validators, apreview_validators, conditional_page
+from .models import Order, Product, Profile
+from .page_cache import acache_version, cache_anonymous_page
+from .pagination import akeyset_page
+from .rates import acurrent_rates
+from .views import MY_ORDERS_PAGE_SIZE, preview_context, user_orders
+
+# --- ASGI İÇİN ASYNC VIEW'LAR ---
+# Müşterinin en sık açtığı okuma sayfalarının async karşılıkları (core/urls.py,
+# ASYNC_VIEWS açıkken bunları bağlar). Sorgular async ORM ile yapılır; şablon
+# render'ı TemplateResponse olarak handler'a bırakılır. Böylece önbellekten
+# sunulan istekler hiç thread'e geçmez.
+
+
+@cache_anonymous_page
+async def home(request):
+    rates = await acurrent_rates()
+    return TemplateResponse(request, 'store/index.html', {
+        # Lazy: sadece ürün ızgarası fragment'ı önbellekte yoksa render sırasında çalışır
+        'products': Product.objects.filter(is_active=True).order_by('-created_at'),
+        'our_rate': f"{rates.our_rate:,}",
+        'page_cache_version': await acache_version(),
+    })
+
+
+@login_required
+@conditional_page(None, amy_orders_validators)
+async def my_orders(request):
+    user = await request.auser()
+    cursor = request.GET.get('cursor')
+    # Durum yoklaması sorgudan önceki andan başlar: arada gelen değişiklik kaçmasın
+    status_since = timezone.now()
+    orders, next_cursor = await akeyset_page(user_orders(user.id), cursor, MY_ORDERS_PAGE_SIZE)
+    return TemplateResponse(request, 'store/my_orders.html', {
+        'orders': orders,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+        'status_since': status_since.isoformat(),
+    })
+
+
+# Long-poll: ?wait=<saniye> verilirse değişiklik olana (veya süre dolana) kadar
+# bekler. Bekleyen istek thread tutmaz, sadece event loop'ta uyur.
+@never_cache
+async def order_status(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    try:
+        since = status_feed.parse_since(request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'invalid since'}, status=400)
+    try:
+        wait = max(0, int(request.GET.get('wait') or 0))
+    except ValueError:
+        return JsonResponse({'error': 'invalid wait'}, status=400)
+    return JsonResponse(await status_feed.alatest(user.id, since, wait))
+
+
+@login_required
+@conditional_page(None, apreview_validators)
+async def order_preview(request, order_id):
+    user = await request.auser()
+    order = await aget_object_or_404(Order, id=order_id, user=user, status='draft')
+
+    # Toggle Points Butonu
+    if request.method == 'POST' and 'toggle_points' in request.POST:
+        order.wants_to_use_points = not order.wants_to_use_points
+        await order.asave()
+        return redirect('order_preview', order_id=order.id)
+
+    profile = await Profile.objects.aget(user=user)
+    items = [item async for item in order.items.all()]
+    screenshots = [screenshot async for screenshot in order.screenshots.all()]
+    return TemplateResponse(request, 'store/order_preview.html', preview_context(
+        order, items, screenshots, profile, await acurrent_rates()
+    ))
+
+
+@cache_anonymous_page
+async def faq_view(request):
+    return TemplateResponse(request, 'store/faq.html')
+
+
+# --- CANLI DURUM (SSE) ---
+# Sadece ASGI'da (core/asgi.py bu isteklere ayrı thread açtırmaz). DB işleri
+# (oturum, kaçırılanlar) bitince bağlantı bırakılır; sonrasında abone sadece
+# event loop'ta kuyruğunu bekler.
+@never_cache
+async def order_events(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    try:
+        since = status_feed.parse_since(request.headers.get('Last-Event-ID') or request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'invalid since'}, status=400)
+
+    # Önce abone ol, sonra DB'ye bak: aradaki değişiklik kaçmasın (tekrar gelmesi zararsız)
+    subscription = status_stream.get_hub().subscribe(user.id)
+    replay = []
+    while since:
+        rows = [row async for row in status_feed.changes(user.id, since)]
+        replay += [
+            {'user': user.id, 'previous': None, **order}
+            for order in status_feed.payload(rows, since)['orders']
+        ]
+        full = len(rows) >= status_feed.STATUS_LIMIT
+        since = status_feed.Cursor(rows[-1]['updated_at'], rows[-1]['id']) if full else None
+    await sync_to_async(status_stream.release_connection)()
+
+    response = StreamingHttpResponse(
+        status_stream.stream(subscription, replay), content_type='text/event-stream'
+    )
+    response['X-Accel-Buffering'] = 'no'   # nginx olayları tamponlamasın
+    return response
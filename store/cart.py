@@ -0,0 +1,65 @@
+from collections import Counter
+from decimal import Decimal
+
+from .images import schedule as schedule_screenshots
+from .models import OrderItem, OrderScreenshot
+
+
+# Formdan gelen links[] / prices[] listelerini (link, fiyat) çiftlerine çevirir;
+# boş satırlar atlanır.
+def parse_items(links, prices):
+    return [
+        (link, Decimal(price))
+        for link, price in zip(links, prices)
+        if link and price
+    ]
+
+
+# --- SİPARİŞ ÜRÜNLERİNİ KAYDETME ---
+# Sepeti mevcut satırlarla karşılaştırır ve sadece değişenlere dokunur:
+#   - aynı (link, fiyat) olan satırlar olduğu gibi kalır,
+#   - artakalan eski satırlar yeni değerlerle bulk_update edilir,
+#   - fazlası tek DELETE ile silinir, eksikler tek bulk_create ile eklenir.
+# Ürün sayısından bağımsız, sabit sayıda sorgu. Çağıran transaction.atomic içinde olmalı.
+def save_items(order, items, existing=None):
+    if existing is None:
+        existing = list(order.items.order_by('pk'))
+
+    wanted = Counter(items)
+    stale = []
+    for row in existing:
+        key = (row.product_link, row.manual_price_usd)
+        if wanted[key]:
+            wanted[key] -= 1
+        else:
+            stale.append(row)
+    missing = list(wanted.elements())
+
+    reused = stale[:len(missing)]
+    for row, (link, price) in zip(reused, missing):
+        row.product_link = link
+        row.manual_price_usd = price
+    if reused:
+        OrderItem.objects.bulk_update(reused, ['product_link', 'manual_price_usd'])
+
+    removed = stale[len(missing):]
+    if removed:
+        OrderItem.objects.filter(pk__in=[row.pk for row in removed]).delete()
+
+    added = missing[len(stale):]
+    if added:
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_link=link, manual_price_usd=price)
+            for link, price in added
+        ])
+
+
+# Dosyalar INSERT sırasında diske yazılır; küçültme commit sonrası arka planda
+def attach_screenshots(order, files):
+    if not files:
+        return []
+    screenshots = OrderScreenshot.objects.bulk_create([
+        OrderScreenshot(order=order, image=image) for image in files
+    ])
+    schedule_screenshots(screenshots)
+    return screenshots
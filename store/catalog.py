@@ -0,0 +1,160 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .images import EXTENSION, try_product_image
+from .models import Product
+from .page_cache import invalidate_pages
+
+BATCH_SIZE = 500
+UPDATE_FIELDS = ('title', 'price_usd', 'is_active', 'image')
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list = field(default_factory=list)   # [(satır, mesaj)]
+
+
+# --- MANİFEST OKUMA ---
+# CSV (başlıklı) veya JSON listesi. Alan adları: title, price, link, image
+# (price_usd / shein_link / image_path de kabul edilir), isteğe bağlı is_active.
+def read_manifest(path):
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as manifest:
+            yield from enumerate(json.load(manifest), start=1)
+        return
+
+    with open(path, encoding='utf-8-sig', newline='') as manifest:
+        reader = csv.DictReader(manifest)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _pick(raw, *names):
+    for name in names:
+        value = raw.get(name)
+        if value not in (None, ''):
+            return str(value).strip()
+    return ''
+
+
+def clean_row(raw, images_dir):
+    if not isinstance(raw, dict):
+        raise ValueError("row must be an object")
+    title = _pick(raw, 'title')
+    link = _pick(raw, 'link', 'shein_link')
+    image = _pick(raw, 'image', 'image_path')
+    if not title or not link:
+        raise ValueError("title and link are required")
+    try:
+        price = Decimal(_pick(raw, 'price', 'price_usd')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError("price is not a number")
+    active = _pick(raw, 'is_active').lower() not in ('0', 'false', 'no', 'n')
+
+    return {
+        'title': title[:200],
+        'price_usd': price,
+        'shein_link': link,
+        'image_path': os.path.join(images_dir, image) if image else None,
+        'is_active': active,
+    }
+
+
+# --- İÇE AKTARMA ---
+# shein_link anahtarıyla upsert: her parti için tek SELECT, tek bulk_create,
+# tek bulk_update. Görseller ayrı süreçlerde küçültülür (workers=0 ise aynı süreçte).
+def import_products(rows, images_dir, workers=None, batch_size=BATCH_SIZE, refresh_images=False):
+    result = ImportResult()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+    try:
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            _import_batch(batch, images_dir, pool, refresh_images, result)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    # bulk_create/bulk_update sinyal tetiklemez; ana sayfa önbelleğini elle yenile
+    if result.created or result.updated:
+        invalidate_pages()
+    return result
+
+
+def _import_batch(batch, images_dir, pool, refresh_images, result):
+    wanted = {}
+    for line, raw in batch:
+        try:
+            row = clean_row(raw, images_dir)
+        except ValueError as exc:
+            result.errors.append((line, str(exc)))
+            continue
+        # Aynı link manifestte iki kez varsa sonuncusu geçerli
+        wanted[row['shein_link']] = (line, row)
+
+    existing = {
+        product.shein_link: product
+        for product in Product.objects.filter(shein_link__in=wanted)
+    }
+
+    # Görsel gereken satırlar: yeni ürünler (+ istenirse mevcutlar)
+    needs_image = [
+        link for link, (line, row) in wanted.items()
+        if row['image_path'] and (link not in existing or refresh_images)
+    ]
+    paths = [wanted[link][1]['image_path'] for link in needs_image]
+    if pool:
+        processed = pool.map(try_product_image, paths, chunksize=8)
+    else:
+        processed = map(try_product_image, paths)
+    images = dict(zip(needs_image, processed))
+
+    to_create, to_update, replaced_files = [], [], []
+    for link, (line, row) in wanted.items():
+        data, error = images.get(link, (None, None))
+        if error:
+            result.errors.append((line, f"image: {error}"))
+
+        product = existing.get(link)
+        if product is None:
+            if data is None:
+                if not error:
+                    result.errors.append((line, "image is required for new products"))
+                continue
+            product = Product(shein_link=link)
+            to_create.append(product)
+        else:
+            changed = any(getattr(product, name) != row[name] for name in ('title', 'price_usd', 'is_active'))
+            if not changed and data is None:
+                result.unchanged += 1
+                continue
+            to_update.append(product)
+
+        product.title = row['title']
+        product.price_usd = row['price_usd']
+        product.is_active = row['is_active']
+        if data is not None:
+            if product.image:
+                replaced_files.append(product.image.name)
+            stem = os.path.splitext(os.path.basename(row['image_path']))[0]
+            product.image.save(f'{stem}.{EXTENSION}', ContentFile(data), save=False)
+
+    with transaction.atomic():
+        Product.objects.bulk_create(to_create)
+        Product.objects.bulk_update(to_update, UPDATE_FIELDS)
+    result.created += len(to_create)
+    result.updated += len(to_update)
+
+    storage = Product._meta.get_field('image').storage
+    for name in replaced_files:
+        storage.delete(name)
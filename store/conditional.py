@@ -0,0 +1,155 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Order, OrderItem, OrderScreenshot
+from .rates import acurrent_rates, current_rates
+
+# --- KOŞULLU GET (ETag / Last-Modified) ---
+# Sayfayı değiştiren her şey tek, hafif bir sorgudan bir "durum" olarak okunur.
+# Tarayıcının elindeki sürüm hâlâ geçerliyse 304 döner: liste sorgusu ve
+# şablon render'ı hiç çalışmaz.
+#
+# ETag'e dil ve CSRF çerezi de girer: giriş/çıkışta token yenilenince
+# tarayıcıdaki eski sayfanın formları bayat token taşımasın.
+#
+# Bekleyen flash mesajı varsa (ör. "Cannot cancel." ve yönlendirme) sayfa her
+# zaman render edilir ve doğrulayıcı gönderilmez: 304 mesajı göstermez, mesaj
+# kuyrukta kalıp sonraki bir sayfada çıkardı.
+
+
+def make_etag(request, *parts):
+    # base.html'deki dil formu zaten token üretiyor; ilk ziyarette de aynı çerez değeri girsin
+    get_token(request)
+    raw = '|'.join(str(part) for part in (
+        request.LANGUAGE_CODE, request.META['CSRF_COOKIE'], *parts
+    ))
+    return 'W/"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+# len() mesajları okur ama "kullanıldı" işaretlemez; şablon yine gösterir
+def _has_messages(request):
+    return len(messages.get_messages(request)) > 0
+
+
+def _latest(*values):
+    values = [value for value in values if value]
+    return max(values) if values else None
+
+
+def _check(request, state):
+    etag, last_modified = state
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), etag, last_modified
+
+
+def _add_headers(response, etag, last_modified):
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    response.headers.setdefault('ETag', etag)
+    return response
+
+
+# validators(request, *args) -> (etag, last_modified) veya None (kaynak yok: view 404 versin).
+# Async view'lar için avalidators verilir (senkron sorgu event loop'u bloklamasın).
+def conditional_page(validators, avalidators=None):
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or await sync_to_async(_has_messages)(request):
+                    return await view(request, *args, **kwargs)
+                state = await avalidators(request, *args, **kwargs)
+                if state is None:
+                    return await view(request, *args, **kwargs)
+                response, etag, last_modified = _check(request, state)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _add_headers(response, etag, last_modified)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_messages(request):
+                return view(request, *args, **kwargs)
+            state = validators(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            response, etag, last_modified = _check(request, state)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _add_headers(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+# --- SİPARİŞLERİM ---
+# Durum: sipariş sayısı + en son updated_at (toplu admin işlemleri de updated_at'i yeniler)
+def _orders_state(user_id):
+    return Order.objects.filter(user_id=user_id).exclude(status='draft').order_by()
+
+
+def _orders_validators(request, user, state):
+    etag = make_etag(request, user.pk, state['count'], state['latest'], request.GET.get('cursor', ''))
+    return etag, _latest(state['latest'], user.last_login)
+
+
+def my_orders_validators(request):
+    state = _orders_state(request.user.pk).aggregate(count=Count('id'), latest=Max('updated_at'))
+    return _orders_validators(request, request.user, state)
+
+
+async def amy_orders_validators(request):
+    user = await request.auser()
+    state = await _orders_state(user.pk).aaggregate(count=Count('id'), latest=Max('updated_at'))
+    return _orders_validators(request, user, state)
+
+
+# --- ÖNİZLEME ---
+# Durum: taslak + ürün ve ekran görüntüsü özetleri + puan bakiyesi (tek sorgu) ve kurlar
+def _preview_state(user_id, order_id):
+    def summary(model, **aggregate):
+        related = model.objects.filter(order=OuterRef('pk')).order_by().values('order')
+        return Subquery(related.annotate(**aggregate).values(*aggregate))
+
+    return (
+        Order.objects.filter(id=order_id, user_id=user_id, status='draft')
+        .annotate(
+            item_count=summary(OrderItem, n=Count('*')),
+            item_total=summary(OrderItem, total=Sum('manual_price_usd')),
+            item_last=summary(OrderItem, last=Max('id')),
+            shot_count=summary(OrderScreenshot, n=Count('*')),
+            shot_processed=summary(OrderScreenshot, processed=Max('processed_at')),
+        )
+        .values_list(
+            'updated_at', 'wants_to_use_points', 'user__profile__dalin_points',
+            'item_count', 'item_total', 'item_last', 'shot_count', 'shot_processed',
+        )
+    )
+
+
+def _preview_validators(request, user, state, rates):
+    if state is None:
+        return None
+    updated_at, *rest = state
+    return make_etag(request, user.pk, updated_at, *rest, *rates), _latest(updated_at, rest[-1])
+
+
+def preview_validators(request, order_id):
+    state = _preview_state(request.user.pk, order_id).first()
+    return _preview_validators(request, request.user, state, current_rates())
+
+
+async def apreview_validators(request, order_id):
+    user = await request.auser()
+    state = await _preview_state(user.pk, order_id).afirst()
+    return _preview_validators(request, user, state, await acurrent_rates())
@@ -0,0 +1,135 @@
+import csv
+import datetime
+import tempfile
+from decimal import Decimal
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import OrderItem
+from .rates import current_rates
+from .reports import MONEY, local_day_start, order_cost_usd
+
+try:
+    import openpyxl
+except ImportError:  # XLSX isteğe bağlı; CSV her zaman çalışır
+    openpyxl = None
+
+CHUNK_SIZE = 2000
+
+# (başlık, values_list alanı); None olanlar satır üretilirken hesaplanır
+COLUMNS = (
+    ('Order ID', 'id'),
+    ('Date', 'created_at'),
+    ('Status', 'status'),
+    ('Customer', 'user__username'),
+    ('Phone', 'user__profile__phone'),
+    ('City', 'user__profile__city'),
+    ('Items', 'item_count'),
+    ('Items Total ($)', 'items_usd'),
+    ('Real Cost ($)', 'cost_usd'),
+    ('Our Rate', 'our_rate'),
+    ('Market Rate', 'market_rate'),
+    ('Discount (IQD)', 'discount_amount'),
+    ('Points Used', 'points_spent'),
+    ('Points to Earn', 'points_to_earn'),
+    ('Final Price (IQD)', 'total_price_iqd'),
+    ('Real Cost (IQD)', None),
+    ('Net Profit (IQD)', None),
+)
+FIELDS = [field for _, field in COLUMNS if field]
+FIELD_INDEX = {field: index for index, field in enumerate(FIELDS)}
+
+
+# --- FİLTRELER (OrderAdmin list_filter ile aynı: durum + tarih aralığı) ---
+# Tarihler yerel gün; bitiş günü dahil. Gün sınırları indeks dostu aralık olarak verilir.
+def filter_orders(queryset, statuses=None, date_from=None, date_to=None):
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    if date_from:
+        queryset = queryset.filter(created_at__gte=local_day_start(date_from))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=local_day_start(date_to + datetime.timedelta(days=1)))
+    return queryset
+
+
+# --- FORMÜL ENJEKSİYONU ---
+# Müşterinin yazdığı metin (kullanıcı adı, telefon, şehir) Excel'de açılıyor:
+# =, +, -, @ (veya sekme/satır başı) ile başlayan hücre formül olarak çalışır.
+# Başına ' eklenince Excel onu düz metin gösterir. Sayılar olduğu gibi kalır.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def safe_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+# --- SATIRLAR ---
+# Ürün sayısı/toplamı alt sorgu ile: JOIN + GROUP BY olmadan satır satır akabilir
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    items = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order')
+    rows = (
+        queryset.order_by('pk')
+        .annotate(
+            item_count=Coalesce(Subquery(items.annotate(n=Count('*')).values('n'), output_field=IntegerField()), 0),
+            items_usd=Coalesce(Subquery(items.annotate(total=Sum('manual_price_usd')).values('total'), output_field=MONEY), Decimal('0'), output_field=MONEY),
+            cost_usd=order_cost_usd(),
+        )
+        .values_list(*FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    # Kur kaydedilmemiş (eski) siparişlerde güncel piyasa kuru kullanılır
+    default_rate = Decimal(current_rates().market_rate)
+
+    yield [title for title, _ in COLUMNS]
+    for row in rows:
+        row = list(row)
+        rate = row[FIELD_INDEX['market_rate']]
+        real_cost_iqd = (row[FIELD_INDEX['cost_usd']] * (Decimal(rate) if rate else default_rate)).quantize(Decimal('1'))
+        # Excel saat dilimli tarih kabul etmiyor; yerel saat olarak yaz
+        row[FIELD_INDEX['created_at']] = timezone.localtime(row[FIELD_INDEX['created_at']]).replace(tzinfo=None)
+        row = [safe_cell(value) for value in row]
+        yield row + [real_cost_iqd, row[FIELD_INDEX['total_price_iqd']] - real_cost_iqd]
+
+
+# --- CSV ---
+class _Echo:
+    # csv.writer'ın yazdığı satırı biriktirmeden geri verir
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    # Excel'in UTF-8'i (Kürtçe/Arapça isimler) doğru açması için BOM
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# --- XLSX ---
+# openpyxl'in write_only modu satırları diske akıtır; bellekte tüm tablo tutulmaz.
+# Dosya tamamlanmadan ZIP yazılamadığı için geçici dosyaya yazılıp döndürülür.
+def write_xlsx(rows, target=None):
+    if openpyxl is None:
+        raise RuntimeError("XLSX export requires openpyxl (pip install openpyxl).")
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Orders')
+    for row in rows:
+        sheet.append(row)
+
+    if target is None:
+        target = tempfile.TemporaryFile()
+    workbook.save(target)
+    if hasattr(target, 'seek'):
+        target.seek(0)
+    return target
+
+
+def export_filename(extension):
+    return f"orders-{timezone.localtime():%Y%m%d-%H%M}.{extension}"
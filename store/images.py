@@ -0,0 +1,160 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+logger = logging.getLogger(__name__)
+
+# --- AYARLAR ---
+MAX_DIMENSION = 1600      # Uzun kenar; sepet ekran görüntüsünü okumak için yeterli
+THUMB_DIMENSION = 200     # Admin ve sipariş sayfalarındaki küçük önizleme
+PRODUCT_DIMENSION = 800   # Ana sayfa ürün kartı
+QUALITY = 80
+THUMB_QUALITY = 70
+
+# Okunamayan dosya: bozuk/desteklenmeyen biçim veya piksel sınırını aşan
+# (sıkıştırma bombası) görüntü. Hepsinde orijinal olduğu gibi bırakılır.
+IMAGE_ERRORS = (OSError, UnidentifiedImageError, Image.DecompressionBombError)
+
+# WebP desteği olmayan Pillow derlemelerinde JPEG'e düşeriz
+if features.check('webp'):
+    FORMAT, EXTENSION = 'WEBP', 'webp'
+else:
+    FORMAT, EXTENSION = 'JPEG', 'jpg'
+
+
+# --- GÖRÜNTÜ DÖNÜŞÜMÜ ---
+def _encode(image, quality):
+    buffer = io.BytesIO()
+    if FORMAT == 'WEBP':
+        image.save(buffer, FORMAT, quality=quality, method=4)
+    else:
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, FORMAT, quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _open(original, max_dimension):
+    image = ImageOps.exif_transpose(original)
+    # Palet / CMYK vb. modlar WebP/JPEG'e doğrudan yazılamaz
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    return image
+
+
+# Telefon fotoğrafının EXIF yönünü uygular, küçültür, yeniden sıkıştırır.
+# Dönen değer: (ana görüntü bytes, küçük önizleme bytes)
+def normalize(source):
+    with Image.open(source) as original:
+        image = _open(original, MAX_DIMENSION)
+        main = _encode(image, QUALITY)
+
+        thumb = image.copy()
+        thumb.thumbnail((THUMB_DIMENSION, THUMB_DIMENSION), Image.Resampling.LANCZOS)
+        return main, _encode(thumb, THUMB_QUALITY)
+
+
+# Ürün görseli: sadece Pillow kullanır (Django/ORM yok), böylece import_products
+# bunu ayrı süreçlerde (ProcessPoolExecutor) çalıştırabilir.
+def product_image(path):
+    with Image.open(path) as original:
+        return _encode(_open(original, PRODUCT_DIMENSION), QUALITY)
+
+
+# Havuzda tek bir bozuk dosya tüm partiyi düşürmesin: (bytes, None) veya (None, hata)
+def try_product_image(path):
+    try:
+        return product_image(path), None
+    except IMAGE_ERRORS as exc:
+        return None, str(exc)
+
+
+def process_screenshot(pk):
+    # Geç import: modül, Django kurulmamış işçi süreçlerinden de import edilebilsin
+    from .models import OrderScreenshot
+
+    screenshot = OrderScreenshot.objects.filter(pk=pk, processed_at__isnull=True).first()
+    if screenshot is None or not screenshot.image:
+        return False
+
+    old_name = screenshot.image.name
+    storage = screenshot.image.storage
+    try:
+        with storage.open(old_name, 'rb') as source:
+            main, thumb = normalize(source)
+    except IMAGE_ERRORS as exc:
+        # Bozuk/desteklenmeyen/aşırı büyük dosya: orijinali bırak, tekrar tekrar denemeyelim
+        logger.warning("Could not process screenshot %s (%s): %s", pk, old_name, exc)
+        OrderScreenshot.objects.filter(pk=pk, processed_at__isnull=True).update(processed_at=timezone.now())
+        return False
+
+    stem = os.path.splitext(os.path.basename(old_name))[0]
+    screenshot.image.save(f'{stem}.{EXTENSION}', ContentFile(main), save=False)
+    screenshot.thumbnail.save(f'{stem}.{EXTENSION}', ContentFile(thumb), save=False)
+    # Commit sonrası işçi ile process_screenshots aynı satırı aynı anda işleyebilir:
+    # satırı sadece ilk bitiren günceller, diğeri kendi yazdığı dosyaları siler
+    claimed = OrderScreenshot.objects.filter(pk=pk, processed_at__isnull=True).update(
+        image=screenshot.image.name,
+        thumbnail=screenshot.thumbnail.name,
+        processed_at=timezone.now(),
+    )
+    if not claimed:
+        storage.delete(screenshot.image.name)
+        screenshot.thumbnail.storage.delete(screenshot.thumbnail.name)
+        return False
+
+    if screenshot.image.name != old_name:
+        storage.delete(old_name)
+    return True
+
+
+# --- ARKA PLAN İŞÇİ HAVUZU ---
+# İstek thread'i dosyayı diske yazıp hemen döner; küçültme bu havuzda yapılır.
+# Havuz süreç başına bir kez, ilk kullanımda açılır.
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS, thread_name_prefix='screenshots'
+        )
+    return _executor
+
+
+def _run_job(pks):
+    try:
+        for pk in pks:
+            try:
+                process_screenshot(pk)
+            except Exception:
+                logger.exception("Screenshot %s processing failed", pk)
+    finally:
+        # İşçi thread'i bağlantısını açık tutmasın (CONN_MAX_AGE'i beklemeden)
+        connection.close()
+
+
+# Transaction commit olduktan sonra çalışır (işçi satırları görebilsin diye).
+# IMAGE_WORKERS = 0 ise aynı thread'de işlenir (geliştirme / testler için).
+def schedule(screenshots):
+    pks = [screenshot.pk for screenshot in screenshots]
+    if not pks:
+        return
+
+    def submit():
+        if settings.IMAGE_WORKERS:
+            _get_executor().submit(_run_job, pks)
+        else:
+            for pk in pks:
+                process_screenshot(pk)
+
+    transaction.on_commit(submit)
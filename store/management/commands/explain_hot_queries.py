@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from store.models import Order
+from store.reports import day_filter, rollup_rows
+from store.views import MY_ORDERS_PAGE_SIZE, user_orders
+
+
+# Sitenin en sık çalışan Order sorguları; view'larla aynı şekilde kurulur
+def hot_queries(user_id):
+    today = timezone.localdate()
+    return [
+        ("my_orders (first page)",
+         user_orders(user_id).order_by('-created_at', '-id')[:MY_ORDERS_PAGE_SIZE + 1]),
+        ("dashboard recent_orders",
+         Order.objects.select_related('user').exclude(status='draft').order_by('-created_at')[:5]),
+        ("dashboard top_customers",
+         User.objects.annotate(
+             total_spent=Sum('order__total_price_iqd', filter=Q(order__status='delivered'))
+         ).order_by('-total_spent')[:5]),
+        ("admin list_filter status=pending",
+         Order.objects.filter(status='pending').order_by('-created_at')[:100]),
+        ("rollup refresh (today, pending)",
+         rollup_rows(Order.objects.filter(day_filter(today, 'pending')))),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Print the database query plans of the hot Order queries to verify index usage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int,
+            help="User id for per-user queries. Default: the user with the most orders.",
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help="Run EXPLAIN ANALYZE (PostgreSQL only; executes the queries).",
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user']
+        if user_id is None:
+            user_id = (
+                Order.objects.values('user_id').annotate(n=Count('id'))
+                .order_by('-n').values_list('user_id', flat=True).first()
+            ) or 0
+
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError("--analyze is only supported on PostgreSQL.")
+            explain_options = {'analyze': True, 'buffers': True}
+
+        self.stdout.write(f"Database: {connection.vendor}, user id: {user_id}")
+        for label, queryset in hot_queries(user_id):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label}"))
+            self.stdout.write(queryset.explain(**explain_options))
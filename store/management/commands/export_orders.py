@@ -0,0 +1,65 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.exports import CHUNK_SIZE, csv_stream, export_rows, filter_orders, openpyxl, write_xlsx
+from store.models import Order
+
+
+def parse_date(value, option):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"{option} must be a date in YYYY-MM-DD format.")
+
+
+class Command(BaseCommand):
+    help = "Export orders with items, costs, discounts and profit to CSV or XLSX for accounting."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=('csv', 'xlsx'), default='csv')
+        parser.add_argument(
+            '--status', action='append',
+            help="Only this status (repeatable). Default: every status except draft.",
+        )
+        parser.add_argument('--from', dest='date_from', help="First day (YYYY-MM-DD), inclusive.")
+        parser.add_argument('--to', dest='date_to', help="Last day (YYYY-MM-DD), inclusive.")
+        parser.add_argument(
+            '--output', '-o',
+            help="File to write. CSV defaults to stdout; XLSX requires a file.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        statuses = options['status']
+        valid = {code for code, _ in Order.STATUS_CHOICES}
+        if statuses and not set(statuses) <= valid:
+            raise CommandError(f"Unknown status. Choose from: {', '.join(sorted(valid))}")
+
+        queryset = Order.objects.all() if statuses else Order.objects.exclude(status='draft')
+        queryset = filter_orders(
+            queryset,
+            statuses=statuses,
+            date_from=options['date_from'] and parse_date(options['date_from'], '--from'),
+            date_to=options['date_to'] and parse_date(options['date_to'], '--to'),
+        )
+        rows = export_rows(queryset, chunk_size=options['chunk_size'])
+
+        if options['format'] == 'xlsx':
+            if openpyxl is None:
+                raise CommandError("XLSX export requires openpyxl (pip install openpyxl).")
+            if not options['output']:
+                raise CommandError("--output is required for XLSX.")
+            write_xlsx(rows, options['output'])
+        elif options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as target:
+                target.writelines(csv_stream(rows))
+        else:
+            # Stdout'a BOM yazmayalım (başka bir programa pipe ediliyor olabilir)
+            stream = csv_stream(rows)
+            next(stream)
+            for line in stream:
+                self.stdout.write(line, ending='')
+
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
@@ -0,0 +1,51 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.catalog import BATCH_SIZE, import_products, read_manifest
+
+
+class Command(BaseCommand):
+    help = "Import or update Products from a CSV/JSON manifest (title, price, link, image), keyed on the Shein link."
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help="Path to a .csv or .json manifest.")
+        parser.add_argument(
+            '--images-dir',
+            help="Directory that image paths are relative to. Default: the manifest's directory.",
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Image processes. Default: one per CPU. 0 processes images in this process.",
+        )
+        parser.add_argument(
+            '--refresh-images', action='store_true',
+            help="Re-process images of existing products too. Default: only new products get images.",
+        )
+
+    def handle(self, *args, **options):
+        manifest = options['manifest']
+        if not os.path.isfile(manifest):
+            raise CommandError(f"Manifest not found: {manifest}")
+        images_dir = options['images_dir'] or os.path.dirname(os.path.abspath(manifest))
+
+        try:
+            result = import_products(
+                read_manifest(manifest),
+                images_dir,
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                refresh_images=options['refresh_images'],
+            )
+        except ValueError as exc:
+            # Bozuk JSON / CSV
+            raise CommandError(f"Could not read manifest: {exc}")
+
+        for line, message in result.errors:
+            self.stderr.write(f"row {line}: {message}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result.created}, updated {result.updated}, "
+            f"unchanged {result.unchanged}, {len(result.errors)} error(s)."
+        ))
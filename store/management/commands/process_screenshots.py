@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from store.images import process_screenshot
+from store.models import OrderScreenshot
+
+
+class Command(BaseCommand):
+    help = "Resize, recompress and thumbnail screenshots that have not been processed yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help="Process at most this many screenshots. Default: all pending.",
+        )
+
+    def handle(self, *args, **options):
+        pending = (
+            OrderScreenshot.objects.filter(processed_at__isnull=True)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        processed = skipped = 0
+        for pk in pending.iterator():
+            if process_screenshot(pk):
+                processed += 1
+            else:
+                skipped += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} screenshot(s), skipped {skipped}."
+        ))
@@ -0,0 +1,26 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.reports import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailySalesRollup table from Order rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help="Only rebuild days on or after this date (YYYY-MM-DD). Default: everything.",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+
+        count = rebuild_rollups(since=since)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup rows."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from store.points import reconcile
+
+
+class Command(BaseCommand):
+    help = "Compare Profile.dalin_points with the PointsTransaction ledger and optionally fix drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help="Overwrite mismatched balances with the ledger total. Default: report only.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = reconcile(fix=options['fix'])
+
+        for user_id, cached, ledger in mismatched:
+            self.stdout.write(f"user {user_id}: balance {cached}, ledger {ledger} ({ledger - cached:+})")
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("All balances match the ledger."))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(mismatched)} balance(s)."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{len(mismatched)} balance(s) differ. Run with --fix to correct them."
+            ))
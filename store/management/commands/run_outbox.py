@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.outbox import drain
+
+
+class Command(BaseCommand):
+    help = "Send queued order status emails from the EmailOutbox table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Emails sent per SMTP connection.")
+        parser.add_argument('--interval', type=float, default=10, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"📧 Sent {sent}, failed {failed}")
+            if options['once']:
+                return
+            time.sleep(options['interval'])
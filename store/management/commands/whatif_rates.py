@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from store.models import Order
+from store.pricing import MARKET_RATE, OUR_RATE, SHIPPING_FEE, reprice_orders
+from store.reports import EXCLUDED_STATUSES
+
+
+class Command(BaseCommand):
+    help = "Re-price confirmed orders with different rates and compare revenue (what-if report)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--our-rate', type=int, default=OUR_RATE)
+        parser.add_argument('--market-rate', type=int, default=MARKET_RATE)
+        parser.add_argument('--shipping-fee', type=int, default=SHIPPING_FEE)
+        parser.add_argument('--status', action='append', help="Only these statuses (repeatable).")
+
+    def handle(self, *args, **options):
+        orders = Order.objects.exclude(status__in=EXCLUDED_STATUSES)
+        if options['status']:
+            orders = orders.filter(status__in=options['status'])
+
+        quotes = reprice_orders(
+            orders,
+            our_rate=options['our_rate'],
+            market_rate=options['market_rate'],
+            shipping_fee=options['shipping_fee'],
+        )
+
+        current = orders.aggregate(total=Sum('total_price_iqd'))['total'] or Decimal('0')
+        what_if = sum((q.final_price for q in quotes.values()), Decimal('0'))
+
+        self.stdout.write(f"Orders:            {len(quotes)}")
+        self.stdout.write(f"Current revenue:   {current:,.0f} IQD")
+        self.stdout.write(f"What-if revenue:   {what_if:,.0f} IQD  (our rate {options['our_rate']})")
+        self.stdout.write(f"Difference:        {what_if - current:+,.0f} IQD")
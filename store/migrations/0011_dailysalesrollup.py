@@ -0,0 +1,72 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:03
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+# Mevcut siparişlerden ilk özet. store.reports'u import etmez: o kod ve
+# modeller değişse de migration bu andaki (tarihsel) modellerle çalışsın.
+def build_rollups(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    OrderItem = apps.get_model('store', 'OrderItem')
+    DailySalesRollup = apps.get_model('store', 'DailySalesRollup')
+    money = models.DecimalField(max_digits=14, decimal_places=2)
+
+    def total(expression, field=money):
+        return Coalesce(Sum(expression), Value(0), output_field=field)
+
+    items_total = Subquery(
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(total=Sum('manual_price_usd'))
+        .values('total'),
+        output_field=money,
+    )
+    cost_usd = Coalesce('actual_cost_usd', items_total, Value(Decimal('0')), output_field=money)
+
+    rows = (
+        Order.objects.order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'status')
+        .annotate(
+            order_count=Count('id'),
+            revenue_iqd=total('total_price_iqd'),
+            real_cost_usd=total(cost_usd),
+            discount_iqd=total('discount_amount'),
+            points_spent=total('points_spent', IntegerField()),
+            points_earned=total('points_to_earn', IntegerField()),
+        )
+    )
+    DailySalesRollup.objects.bulk_create([DailySalesRollup(**row) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_order_actual_cost_usd'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('status', models.CharField(choices=[('draft', '📝 Draft (Not Confirmed)'), ('pending', '⏳ Pending Approval'), ('approved', '✅ Order Placed (Shein)'), ('dubai', '🇦🇪 Arrived in Dubai'), ('shipping', '🚚 On the way to Iraq'), ('arrived', '🏢 In Erbil Branch'), ('delivered', '📦 Delivered'), ('cancel_requested', '⚠️ Cancellation Requested'), ('cancelled', '❌ Cancelled')], max_length=20, verbose_name='Status')),
+                ('order_count', models.IntegerField(default=0, verbose_name='Orders')),
+                ('revenue_iqd', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Revenue (IQD)')),
+                ('real_cost_usd', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Real Cost ($)')),
+                ('discount_iqd', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='Discount Given (IQD)')),
+                ('points_spent', models.IntegerField(default=0, verbose_name='Points Spent')),
+                ('points_earned', models.IntegerField(default=0, verbose_name='Points Earned')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'status'), name='unique_rollup_day_status')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
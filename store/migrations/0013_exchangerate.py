@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('our_rate', models.IntegerField(verbose_name='Our Rate (IQD/$)')),
+                ('market_rate', models.IntegerField(verbose_name='Market Rate (IQD/$)')),
+                ('effective_from', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Effective From')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-effective_from'],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='market_rate',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Market Rate (IQD/$)'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='our_rate',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Our Rate (IQD/$)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_exchangerate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderscreenshot',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderscreenshot',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='screenshots/thumbs/'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Defter boş başlar; mevcut bakiyeler birer "opening" satırı olarak yazılır
+# ki defter toplamı ile Profile.dalin_points ilk günden eşit olsun.
+def open_balances(apps, schema_editor):
+    Profile = apps.get_model('store', 'Profile')
+    PointsTransaction = apps.get_model('store', 'PointsTransaction')
+
+    balances = Profile.objects.exclude(dalin_points=0).values_list('user_id', 'dalin_points')
+    PointsTransaction.objects.bulk_create(
+        [
+            PointsTransaction(user_id=user_id, kind='opening', amount=points, note='Balance before ledger')
+            for user_id, points in balances.iterator(chunk_size=2000)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0014_orderscreenshot_thumbnail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('opening', 'Opening Balance'), ('earn', 'Earned (Delivery)'), ('spend', 'Spent (Discount)'), ('adjust', 'Manual Adjustment')], max_length=10)),
+                ('amount', models.IntegerField(verbose_name='Points (+/-)')),
+                ('note', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='points_transactions', to='store.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='points_user_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('kind__in', ['earn', 'spend'])), fields=('order', 'kind'), name='unique_points_per_order')],
+            },
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
+from django.utils import timezone
 from django.db.models.signals import pre_save # pre_save eklemeyi unutma
 
 # --- 1. PROFILE ---
@@ -63,25 +62,121 @@ class Order(models.Model):
     points_to_earn = models.IntegerField(default=0, verbose_name="Points to Earn")
     points_added_to_profile = models.BooleanField(default=False, verbose_name="Points Loaded?")
 
+    # Sipariş onaylandığında geçerli olan kurlar (geçmiş siparişler için)
+    our_rate = models.IntegerField(null=True, blank=True, verbose_name="Our Rate (IQD/$)")
+    market_rate = models.IntegerField(null=True, blank=True, verbose_name="Market Rate (IQD/$)")
+
+    class Meta:
+        indexes = [
+            # "Siparişlerim": kullanıcının taslak olmayan siparişleri, yeniden eskiye (keyset)
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                condition=~models.Q(status='draft'),
+                name='order_user_recent_idx',
+            ),
+            # Dashboard "son siparişler": taslak olmayanlar, yeniden eskiye
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=~models.Q(status='draft'),
+                name='order_recent_idx',
+            ),
+            # Admin durum filtresi + tarih sıralaması, rollup (gün, durum) yenilemesi
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ]
+
+    # --- DEĞİŞİKLİK TAKİBİ ---
+    # Veritabanından yüklenen değerleri hatırlıyoruz; böylece sinyaller durum
+    # değişikliğini anlamak için siparişi tekrar SELECT etmek zorunda kalmıyor.
+    TRACKED_FIELDS = ('status', 'points_added_to_profile')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def save(self, **kwargs):
+        # "points_added_to_profile" atomik UPDATE ile değişir; eski bir kopyanın
+        # save() çağrısı bayrağı geri False yapıp puanı iki kez yüklemesin. Bayrak
+        # bu kopyada değiştirildiyse (yüklenen değerden farklıysa) yazılır.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            loaded = getattr(self, '_loaded_values', {})
+            skip = set(deferred)
+            flag = 'points_added_to_profile'
+            if flag in loaded and loaded[flag] == self.points_added_to_profile:
+                skip.add(flag)
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in skip
+            ]
+        super().save(**kwargs)
+        # post_save sinyalleri eski değerleri gördü; artık yeni hal "yüklenmiş" hal
+        self._remember_loaded_values()
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._remember_loaded_values(fields)
+
+    # fields: sadece bu alanlar yeniden yüklendi (refresh_from_db(fields=...))
+    def _remember_loaded_values(self, fields=None):
+        names = [name for name in self.TRACKED_FIELDS if fields is None or name in fields]
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{name: self.__dict__[name] for name in names if name in self.__dict__},
+        }
+
+    def is_tracked(self):
+        return 'status' in getattr(self, '_loaded_values', {})
+
+    @property
+    def previous_status(self):
+        return getattr(self, '_loaded_values', {}).get('status')
+
+    def status_changed(self):
+        return self.previous_status is not None and self.previous_status != self.status
+
     def __str__(self):
         return f"Order #{self.id} - {self.user.username}"
 
+@receiver(pre_save, sender=Order)
+def load_previous_status(sender, instance, raw=False, **kwargs):
+    # Sadece takip edilmeyen (elle pk verilerek oluşturulmuş) nesneler için sorgu at
+    if raw or instance.pk is None or instance.is_tracked():
+        return
+    old_status = Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    instance._loaded_values = {'status': old_status} if old_status else {}
+
 @receiver(post_save, sender=Order)
-def add_points_on_delivery(sender, instance, **kwargs):
-    if instance.status == 'delivered' and not instance.points_added_to_profile:
-        profile = instance.user.profile
-        profile.dalin_points += instance.points_to_earn
-        profile.save()
-        instance.points_added_to_profile = True
-        instance.save()
+def add_points_on_delivery(sender, instance, raw=False, **kwargs):
+    if raw or instance.status != 'delivered' or instance.points_added_to_profile:
+        return
+
+    from .points import record
+
+    # Tek atomik UPDATE: iki eşzamanlı kayıttan sadece biri puanı yükler
+    with transaction.atomic(savepoint=False):
+        claimed = Order.objects.filter(pk=instance.pk, points_added_to_profile=False).update(
+            points_added_to_profile=True
+        )
+        if claimed and instance.points_to_earn:
+            record(instance.user_id, instance.points_to_earn, 'earn', order=instance)
+    instance.points_added_to_profile = True
 
 # --- 3. ORDER SCREENSHOTS ---
 class OrderScreenshot(models.Model):
     order = models.ForeignKey(Order, related_name='screenshots', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='screenshots/')
-    
+    # store/images.py arka planda doldurur; o zamana kadar orijinal gösterilir
+    thumbnail = models.ImageField(upload_to='screenshots/thumbs/', blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
-        return f"Screenshot for Order #{self.order.id}"
+        return f"Screenshot for Order #{self.order_id}"
+
+    @property
+    def preview_url(self):
+        return (self.thumbnail or self.image).url
 
 # --- 4. ORDER ITEMS ---
 class OrderItem(models.Model):
@@ -105,45 +200,170 @@ class Product(models.Model):
         return self.title
 
 
+# --- 6. GÜNLÜK SATIŞ ÖZETİ (ROLLUP) ---
+# Gün + durum başına önceden hesaplanmış toplamlar. Dashboard ve raporlar
+# bütün sipariş tablosunu taramak yerine bu birkaç yüz satırı okur.
+class DailySalesRollup(models.Model):
+    day = models.DateField(verbose_name="Day")
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, verbose_name="Status")
+    order_count = models.IntegerField(default=0, verbose_name="Orders")
+    revenue_iqd = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Revenue (IQD)")
+    real_cost_usd = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Real Cost ($)")
+    discount_iqd = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="Discount Given (IQD)")
+    points_spent = models.IntegerField(default=0, verbose_name="Points Spent")
+    points_earned = models.IntegerField(default=0, verbose_name="Points Earned")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='unique_rollup_day_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.order_count} orders"
+
+@receiver(post_save, sender=Order)
+def update_daily_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .reports import order_bucket, refresh_rollups
+
+    # Durum değiştiyse eski günün/durumun satırını da yenile
+    day, status = order_bucket(instance)
+    buckets = {(day, status)}
+    if instance.status_changed():
+        buckets.add((day, instance.previous_status))
+    refresh_rollups(buckets)
+
+@receiver(post_delete, sender=Order)
+def remove_from_daily_rollup(sender, instance, **kwargs):
+    from .reports import order_bucket, refresh_rollups
+    refresh_rollups([order_bucket(instance)])
+
+
+# --- 7. E-POSTA KUYRUĞU (OUTBOX) ---
+# İstek sırasında sadece satır eklenir; gönderimi "manage.py run_outbox" yapar.
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    order = models.ForeignKey(Order, related_name='emails', on_delete=models.SET_NULL, null=True, blank=True)
+    to_email = models.EmailField(verbose_name="To")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Next Attempt")
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+# --- 8. DÖVİZ KURLARI ---
+# Kuru değiştirmek için deploy gerekmesin; admin yeni bir satır ekler.
+# Sıcak yollar bu tabloyu store/rates.py'deki süreç içi önbellekten okur.
+class ExchangeRate(models.Model):
+    our_rate = models.IntegerField(verbose_name="Our Rate (IQD/$)")
+    market_rate = models.IntegerField(verbose_name="Market Rate (IQD/$)")
+    effective_from = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Effective From")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-effective_from']
+
+    def __str__(self):
+        return f"$1 = {self.our_rate} IQD (market {self.market_rate}) from {self.effective_from:%Y-%m-%d %H:%M}"
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_rate_cache(sender, **kwargs):
+    from .rates import invalidate
+    invalidate()
+
+
+# --- 9. PUAN HAREKETLERİ (LEDGER) ---
+# Sadece eklenir, asla güncellenmez. Profile.dalin_points bu tablonun
+# önbelleğe alınmış toplamıdır ve sadece store/points.py üzerinden değişir.
+class PointsTransaction(models.Model):
+    KIND_CHOICES = (
+        ('opening', 'Opening Balance'),
+        ('earn', 'Earned (Delivery)'),
+        ('spend', 'Spent (Discount)'),
+        ('adjust', 'Manual Adjustment'),
+    )
+
+    user = models.ForeignKey(User, related_name='points_transactions', on_delete=models.CASCADE)
+    order = models.ForeignKey(Order, related_name='points_transactions', on_delete=models.SET_NULL, null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    amount = models.IntegerField(verbose_name="Points (+/-)")
+    note = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='points_user_idx'),
+        ]
+        constraints = [
+            # Bir sipariş en fazla bir kez puan kazandırır / harcatır
+            models.UniqueConstraint(
+                fields=['order', 'kind'],
+                condition=models.Q(kind__in=['earn', 'spend']),
+                name='unique_points_per_order',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.amount:+} ({self.kind})"
+
+
+# --- SAYFA ÖNBELLEĞİ GEÇERSİZLEME ---
+# Ana sayfa ürünleri ve kuru gösterdiği için ikisinden biri değişince
+# önbellekteki sayfalar (ve ürün ızgarası fragment'ı) yenilenir.
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_page_cache(sender, raw=False, **kwargs):
+    if raw:
+        return
+    from .page_cache import invalidate_pages
+    invalidate_pages()
+
+
 # --- OTOMATİK E-POSTA BİLDİRİM SİSTEMİ ---
-@receiver(pre_save, sender=Order)
-def send_email_on_status_change(sender, instance, **kwargs):
-    # Eğer sipariş yeni oluşturuluyorsa (henüz ID'si yoksa) işlem yapma
-    if not instance.pk:
+@receiver(post_save, sender=Order)
+def queue_email_on_status_change(sender, instance, raw=False, **kwargs):
+    # Eğer durum değişmişse (Örn: pending -> approved) kuyruğa bir satır ekle;
+    # SMTP'yi burada beklemiyoruz. Yeni oluşturulan siparişler için mail yok.
+    if raw or not instance.status_changed():
+        return
+
+    from .outbox import queue_status_email
+    queue_status_email(instance)
+
+
+# --- DURUM AKIŞI: LONG-POLL VE SSE DİNLEYENLERİNİ UYANDIR ---
+# Not veya durum değişmiş olabilir; taslaklar müşteri listesinde görünmez.
+# SSE'ye sadece durum geçişleri yayınlanır.
+@receiver(post_save, sender=Order)
+def notify_status_watchers(sender, instance, raw=False, **kwargs):
+    if raw or instance.status == 'draft':
         return
-    
-    try:
-        # Veritabanındaki eski halini bul
-        old_order = Order.objects.get(pk=instance.pk)
-        
-        # Eğer durum değişmişse (Örn: pending -> approved)
-        if old_order.status != instance.status:
-            
-            subject = f"📦 Update on Order #{instance.id}"
-            message = f"""
-            Hello {instance.user.username},
-
-            Good news! The status of your order #{instance.id} has changed.
-            
-            🆕 New Status: {instance.get_status_display()}
-            
-            {f'Tracking Note: {instance.tracking_note}' if instance.tracking_note else ''}
-
-            You can check the details on your profile:
-            http://127.0.0.1:8000/my-orders/
-
-            Thank you for shopping with Dalin Shopping!
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [instance.user.email], # Müşterinin mailine gönder
-                fail_silently=False,
-            )
-            print(f"📧 EMAIL SENT TO {instance.user.email}: Status changed to {instance.status}")
-            
-    except Order.DoesNotExist:
-        pass
 
+    from .status_feed import touch_on_commit
+    touch_on_commit([instance.user_id])
+    if instance.status_changed():
+        from .status_stream import publish_on_commit, transition
+        publish_on_commit([transition(instance, instance.previous_status)])
@@ -0,0 +1,125 @@
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+# Başarısız gönderimler için: 1dk, 2dk, 4dk, 8dk ... sonra "failed"
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 60
+
+# Bir worker bir satırı aldıktan sonra bu süre boyunca başka worker almasın
+LEASE_SECONDS = 300
+
+
+# --- DURUM DEĞİŞİKLİĞİ MAİLİ ---
+def status_email(order):
+    subject = f"📦 Update on Order #{order.id}"
+    message = f"""
+    Hello {order.user.username},
+
+    Good news! The status of your order #{order.id} has changed.
+    
+    🆕 New Status: {order.get_status_display()}
+    
+    {f'Tracking Note: {order.tracking_note}' if order.tracking_note else ''}
+
+    You can check the details on your profile:
+    http://127.0.0.1:8000/my-orders/
+
+    Thank you for shopping with Dalin Shopping!
+    """
+    return EmailOutbox(order=order, to_email=order.user.email, subject=subject, body=message)
+
+
+def queue_status_email(order):
+    if not order.user.email:
+        return None
+    email = status_email(order)
+    email.save()
+    return email
+
+
+# --- WORKER TARAFI ---
+def retry_delay(attempts):
+    return datetime.timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[e.pk for e in batch]).update(
+                next_attempt_at=now + datetime.timedelta(seconds=LEASE_SECONDS)
+            )
+    return batch
+
+
+def deliver(batch, connection):
+    now = timezone.now()
+    for email in batch:
+        try:
+            EmailMessage(
+                email.subject,
+                email.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [email.to_email],
+                connection=connection,
+            ).send()
+        except Exception as exc:
+            mark_failed(email, exc, now)
+        else:
+            email.status = 'sent'
+            email.sent_at = now
+            email.last_error = ''
+            email.attempts += 1
+    save_results(batch)
+
+
+def save_results(batch):
+    EmailOutbox.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+
+
+def mark_failed(email, exc, now):
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def drain(batch_size=50):
+    sent = failed = 0
+    batch = claim_batch(batch_size)
+    if not batch:
+        return sent, failed
+
+    try:
+        # Kuyruk boşalana kadar bütün batch'ler için tek SMTP bağlantısı
+        with get_connection() as connection:
+            while batch:
+                deliver(batch, connection)
+                sent += sum(1 for email in batch if email.status == 'sent')
+                failed += sum(1 for email in batch if email.status != 'sent')
+                # claim_batch hata verirse except bloğu gönderilmiş batch'e dokunmasın
+                batch = []
+                batch = claim_batch(batch_size)
+    except Exception as exc:
+        # Bağlantı açılamadı: alınmış ama denenmemiş batch'i tekrar denemeye bırak
+        now = timezone.now()
+        for email in batch:
+            mark_failed(email, exc, now)
+        save_results(batch)
+        failed += len(batch)
+    return sent, failed
@@ -0,0 +1,118 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+# --- ANONİM SAYFA ÖNBELLEĞİ ---
+# Ana sayfa ve SSS gibi herkese aynı görünen sayfalar dil başına bir kez
+# render edilir. Önbellekten gelen istek veritabanına hiç dokunmaz.
+PAGE_CACHE_TIMEOUT = 60 * 5
+VERSION_KEY = 'page-cache:version'
+
+# Önbellekteki HTML'de CSRF token yerine bu işaret durur; her istekte
+# ziyaretçinin kendi token'ı ile değiştirilir (dil formu için gerekli).
+CSRF_PLACEHOLDER = '__CSRF_TOKEN_PLACEHOLDER__'
+
+
+def cache_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+async def acache_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        version = 1
+        await cache.aadd(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_pages():
+    # Anahtarları tek tek silmek yerine sürümü artırıyoruz; eski kayıtlar zaman aşımıyla düşer
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def page_key(request, version):
+    return f'page:{version}:{request.LANGUAGE_CODE}:{request.path}'
+
+
+def is_cacheable(request, user):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.GET
+        and not user.is_authenticated
+    )
+
+
+def _prepare(response):
+    # Önbelleğe girecek sürüm: render edilmemiş, ziyaretçiye özel token içermeyen
+    if response.status_code != 200 or not hasattr(response, 'context_data'):
+        return False
+    response.context_data = {**(response.context_data or {}), 'csrf_token': CSRF_PLACEHOLDER}
+    return True
+
+
+def _serve(request, cached, hit):
+    content, content_type = cached
+    response = HttpResponse(
+        content.replace(CSRF_PLACEHOLDER, get_token(request)),
+        content_type=content_type,
+    )
+    response['X-Page-Cache'] = 'hit' if hit else 'miss'
+    return response
+
+
+def _rendered(response):
+    return (response.content.decode(response.charset), response['Content-Type'])
+
+
+# View TemplateResponse döndürmeli: render'dan önce context'e müdahale ediyoruz.
+# Async view'lar için async bir sarmalayıcı döner (ASGI'da thread'e geçmeden önbellekten sunar).
+def cache_anonymous_page(view):
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not is_cacheable(request, await request.auser()):
+                return await view(request, *args, **kwargs)
+
+            key = page_key(request, await acache_version())
+            cached = await cache.aget(key)
+            hit = cached is not None
+            if not hit:
+                response = await view(request, *args, **kwargs)
+                if not _prepare(response):
+                    return response
+                # Şablon render'ı (context processor'lar, lazy queryset'ler) senkron
+                await sync_to_async(response.render)()
+                cached = _rendered(response)
+                await cache.aset(key, cached, PAGE_CACHE_TIMEOUT)
+            return _serve(request, cached, hit)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request, request.user):
+            return view(request, *args, **kwargs)
+
+        key = page_key(request, cache_version())
+        cached = cache.get(key)
+        hit = cached is not None
+        if not hit:
+            response = view(request, *args, **kwargs)
+            if not _prepare(response):
+                return response
+            response.render()
+            cached = _rendered(response)
+            cache.set(key, cached, PAGE_CACHE_TIMEOUT)
+        return _serve(request, cached, hit)
+
+    return wrapper
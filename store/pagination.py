@@ -0,0 +1,48 @@
+import base64
+import datetime
+
+from django.db.models import Q
+
+# --- KEYSET (CURSOR) SAYFALAMA ---
+# OFFSET yerine "son görülen (created_at, id)" değerinden devam eder; sayfa
+# numarası ne olursa olsun sorgu maliyeti aynı kalır ve COUNT(*) gerekmez.
+
+
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        # Bozuk/elle değiştirilmiş cursor: ilk sayfayı göster
+        return None
+
+
+def _page_query(queryset, cursor, page_size):
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    return queryset.order_by('-created_at', '-id')[:page_size + 1]
+
+
+def _split(page, page_size):
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+# Queryset '-created_at', '-id' sıralı olmalı. (sayfa, sonraki_cursor) döner.
+def keyset_page(queryset, cursor, page_size):
+    return _split(list(_page_query(queryset, cursor, page_size)), page_size)
+
+
+async def akeyset_page(queryset, cursor, page_size):
+    page = [obj async for obj in _page_query(queryset, cursor, page_size)]
+    return _split(page, page_size)
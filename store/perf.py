@@ -0,0 +1,226 @@
+import bisect
+import contextvars
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+# --- İSTEK BAŞI PERFORMANS ÖLÇÜMÜ ---
+# Örneklenen isteklerde duvar süresi, SQL sorgu sayısı/süresi ve şablon render
+# süresi ölçülür; URL adı başına süreç içi histogramlarda toplanır.
+# PERF_SERVER_TIMING açıksa Server-Timing başlığıyla tarayıcıya da gönderilir.
+# Örneklenmeyen isteğin maliyeti tek bir random() çağrısıdır.
+
+# Milisaniye kova sınırları (son kova: 5 sn üstü)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = contextvars.ContextVar('perf_timings', default=None)
+
+
+class Timings:
+    __slots__ = ('queries', 'sql', 'template')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    # Kova üst sınırı olarak yaklaşık yüzdelik (son kovada gözlenen en büyük değer)
+    def percentile(self, q):
+        count = sum(self.counts)
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+        return self.max
+
+
+class ViewStats:
+    def __init__(self):
+        self.count = 0
+        self.wall = Histogram()
+        self.queries = 0
+        self.max_queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+
+    def add(self, wall_ms, timings):
+        self.count += 1
+        self.wall.add(wall_ms)
+        self.queries += timings.queries
+        self.max_queries = max(self.max_queries, timings.queries)
+        self.sql_ms += timings.sql * 1000
+        self.template_ms += timings.template * 1000
+
+    def as_dict(self, name):
+        return {
+            'name': name,
+            'count': self.count,
+            'avg_ms': self.wall.total / self.count,
+            'p50_ms': self.wall.percentile(0.50),
+            'p95_ms': self.wall.percentile(0.95),
+            'max_ms': self.wall.max,
+            'avg_queries': self.queries / self.count,
+            'max_queries': self.max_queries,
+            'avg_sql_ms': self.sql_ms / self.count,
+            'avg_template_ms': self.template_ms / self.count,
+            'buckets': list(zip(BUCKETS_MS + (None,), self.wall.counts)),
+        }
+
+
+_stats = {}
+_lock = threading.Lock()
+
+
+def record(name, wall_ms, timings):
+    with _lock:
+        _stats.setdefault(name, ViewStats()).add(wall_ms, timings)
+
+
+# En yavaştan hızlıya (ortalama süre), URL adı başına özet
+def snapshot():
+    with _lock:
+        rows = [stats.as_dict(name) for name, stats in _stats.items()]
+    return sorted(rows, key=lambda row: row['avg_ms'], reverse=True)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+# --- SQL ---
+# Her bağlantıya kalıcı olarak takılır; ölçülmeyen istekte maliyeti tek bir
+# ContextVar okuması. Async view'larda ORM başka thread'deki bağlantıyı
+# kullanır, ContextVar ise sync_to_async ile oraya taşınır.
+def _query_timer(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql += time.perf_counter() - start
+        timings.queries += 1
+
+
+def _instrument(connection, **kwargs):
+    if _query_timer not in connection.execute_wrappers:
+        # Başa eklenir: bağlantı bir execute_wrapper() bloğu içinde açılırsa
+        # blok sonundaki pop() bizimkini değil kendi sarmalayıcısını atsın
+        connection.execute_wrappers.insert(0, _query_timer)
+
+
+connection_created.connect(_instrument)
+
+
+# --- ŞABLON ---
+# TEMPLATES BACKEND olarak kullanılır; render süresini o anki isteğe ekler.
+# {% include %} / {% extends %} motor içinde kalır, yani süre iki kez sayılmaz.
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+# --- MIDDLEWARE ---
+# Middleware zincirin başında durur (oturum/kimlik süresi de ölçülsün); bu
+# noktada request.user henüz yok, bu yüzden örnekleme sadece orana bakar.
+def _should_sample():
+    rate = settings.PERF_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # ASGI'da zinciri senkron yapıp her isteği thread'e itmesin
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Middleware yüklenmeden önce açılmış bağlantılar (connection_created kaçırıldı)
+        for connection in connections.all(initialized_only=True):
+            _instrument(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _should_sample():
+            return self.get_response(request)
+
+        timings, token, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        if not _should_sample():
+            return await self.get_response(request)
+
+        timings, token, start = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, start)
+
+    def _start(self):
+        timings = Timings()
+        return timings, _current.set(timings), time.perf_counter()
+
+    def _finish(self, request, response, timings, start):
+        wall_ms = (time.perf_counter() - start) * 1000
+        record(_view_name(request), wall_ms, timings)
+        if settings.PERF_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'app;dur={wall_ms:.1f}, '
+                f'db;dur={timings.sql * 1000:.1f};desc="{timings.queries} queries", '
+                f'tpl;dur={timings.template * 1000:.1f}'
+            )
+        return response
@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import PointsTransaction, Profile
+
+
+# --- PUAN DEFTERİ ---
+# Her puan hareketi PointsTransaction'a bir satır olarak yazılır; bakiye
+# (Profile.dalin_points) aynı transaction içinde F() ile artırılır/azaltılır.
+# Hiçbir yerde "oku, topla, save()" yapılmaz.
+def record(user_id, amount, kind, order=None, note=''):
+    # Genelde zaten bir transaction içinden çağrılır; ekstra savepoint açmayalım
+    with transaction.atomic(savepoint=False):
+        # Önce defter: aynı sipariş için ikinci earn/spend unique kısıtına takılır
+        entry = PointsTransaction.objects.create(
+            user_id=user_id, order=order, kind=kind, amount=amount, note=note
+        )
+        Profile.objects.filter(user_id=user_id).update(dalin_points=F('dalin_points') + amount)
+    return entry
+
+
+# Birden çok hareketi tek INSERT + tek UPDATE ile yazar.
+# entries: PointsTransaction nesneleri (kaydedilmemiş)
+def record_many(entries):
+    entries = [entry for entry in entries if entry.amount]
+    if not entries:
+        return
+
+    per_user = defaultdict(int)
+    for entry in entries:
+        per_user[entry.user_id] += entry.amount
+
+    with transaction.atomic(savepoint=False):
+        PointsTransaction.objects.bulk_create(entries)
+        Profile.objects.filter(user_id__in=per_user).update(
+            dalin_points=F('dalin_points') + Case(
+                *[When(user_id=user_id, then=Value(points)) for user_id, points in per_user.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+
+# Harcama kararından önce bakiyeyi satır kilidiyle okur; çağıran atomic içinde olmalı.
+# Kilit commit'e kadar sürer, böylece iki sekmeden aynı puan iki kez harcanamaz.
+def locked_balance(user_id):
+    return (
+        Profile.objects.select_for_update()
+        .values_list('dalin_points', flat=True)
+        .get(user_id=user_id)
+    )
+
+
+# --- MUTABAKAT ---
+def ledger_totals():
+    return Coalesce(
+        Subquery(
+            PointsTransaction.objects.filter(user_id=OuterRef('user_id'))
+            .order_by()
+            .values('user_id')
+            .annotate(total=Sum('amount'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+# Önbellekteki bakiyesi defterle uyuşmayan profilleri döndürür:
+# [(user_id, dalin_points, defter toplamı)]. fix=True ise hepsini tek UPDATE ile düzeltir.
+def reconcile(fix=False):
+    with transaction.atomic():
+        mismatched = list(
+            Profile.objects.annotate(ledger=ledger_totals())
+            .exclude(dalin_points=F('ledger'))
+            .order_by('user_id')
+            .values_list('user_id', 'dalin_points', 'ledger')
+        )
+        if fix and mismatched:
+            Profile.objects.filter(user_id__in=[row[0] for row in mismatched]).update(
+                dalin_points=ledger_totals()
+            )
+    return mismatched
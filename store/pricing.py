@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db.models import DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+
+# --- AYARLAR ---
+MARKET_RATE = 1450        # Piyasa kuru (müşteriye "piyasa fiyatı" olarak gösterilen ve kâr hesabında kullanılan)
+OUR_RATE = 1200           # Bizim sattığımız kur
+SHIPPING_FEE = 5000       # Sipariş başı kargo (IQD)
+POINT_EARN_RATE = 1000    # Her 1000 IQD için 1 puan
+POINT_VALUE_IQD = 25      # 1 puan = 25 IQD indirim
+
+
+@dataclass(frozen=True)
+class Quote:
+    total_usd: Decimal
+    market_price_iqd: Decimal
+    our_price_iqd: Decimal
+    shipping_fee: Decimal
+    total_before_discount: Decimal
+    points_to_spend: int
+    discount: Decimal
+    final_price: Decimal
+    points_to_earn: int
+
+
+# --- TEK SİPARİŞ ---
+def quote(prices, points_balance=0, use_points=False,
+          our_rate=OUR_RATE, market_rate=MARKET_RATE, shipping_fee=SHIPPING_FEE):
+    return quote_batch(
+        [sum(prices, Decimal('0'))], [points_balance], [use_points],
+        our_rate=our_rate, market_rate=market_rate, shipping_fee=shipping_fee,
+    )[0]
+
+
+# --- TOPLU FİYATLAMA ---
+# Kolon bazlı: i. sipariş için totals_usd[i], points_balances[i], use_points[i].
+# Kur/kargo dönüşümleri döngü dışında bir kez yapılır; binlerce siparişi
+# "kur değişseydi ne olurdu?" raporları için tek geçişte fiyatlar.
+def quote_batch(totals_usd, points_balances=None, use_points=None,
+                our_rate=OUR_RATE, market_rate=MARKET_RATE, shipping_fee=SHIPPING_FEE):
+    our_rate = Decimal(our_rate)
+    market_rate = Decimal(market_rate)
+    shipping_fee = Decimal(shipping_fee)
+    point_value = Decimal(POINT_VALUE_IQD)
+
+    if points_balances is None:
+        points_balances = [0] * len(totals_usd)
+    if use_points is None:
+        use_points = [bool(points) for points in points_balances]
+
+    quotes = []
+    for total_usd, balance, wants_points in zip(totals_usd, points_balances, use_points):
+        our_price_iqd = total_usd * our_rate
+        total_before_discount = our_price_iqd + shipping_fee
+
+        points_to_spend = 0
+        if wants_points and balance > 0:
+            points_to_spend = balance
+            # İndirim toplamı geçemez
+            if points_to_spend * point_value > total_before_discount:
+                points_to_spend = int(total_before_discount / point_value)
+        discount = points_to_spend * point_value
+
+        final_price = total_before_discount - discount
+        quotes.append(Quote(
+            total_usd=total_usd,
+            market_price_iqd=total_usd * market_rate,
+            our_price_iqd=our_price_iqd,
+            shipping_fee=shipping_fee,
+            total_before_discount=total_before_discount,
+            points_to_spend=points_to_spend,
+            discount=discount,
+            final_price=final_price,
+            points_to_earn=int(final_price / POINT_EARN_RATE),
+        ))
+    return quotes
+
+
+# Kayıtlı siparişleri verilen kurlarla yeniden fiyatlar: {order_id: Quote}.
+# Ürün toplamları tek sorguda gelir; siparişte harcanan puanlar aynen kullanılır.
+def reprice_orders(orders, chunk_size=2000, **rates):
+    rows = (
+        orders.order_by()
+        .annotate(items_usd=Coalesce(
+            Sum('items__manual_price_usd'), Value(Decimal('0')),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ))
+        .values_list('id', 'items_usd', 'points_spent')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    result = {}
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            result.update(_quote_rows(chunk, rates))
+            chunk = []
+    result.update(_quote_rows(chunk, rates))
+    return result
+
+
+def _quote_rows(rows, rates):
+    if not rows:
+        return {}
+    ids, totals, points = zip(*rows)
+    return dict(zip(ids, quote_batch(list(totals), list(points), **rates)))
@@ -0,0 +1,58 @@
+import time
+from typing import NamedTuple
+
+from django.utils import timezone
+
+from .models import ExchangeRate
+from .pricing import MARKET_RATE, OUR_RATE
+
+# Kurlar bu süre boyunca süreç içinde tutulur. Aynı süreçteki kayıtlar önbelleği
+# hemen temizler; diğer worker'lar en geç bu süre sonunda yeni kuru görür.
+CACHE_TTL = 60
+
+
+class Rates(NamedTuple):
+    our_rate: int
+    market_rate: int
+
+
+DEFAULT_RATES = Rates(OUR_RATE, MARKET_RATE)
+
+_cached = None  # (Rates, expires_at)
+
+
+def _active_rate():
+    return (
+        ExchangeRate.objects.filter(effective_from__lte=timezone.now())
+        .order_by('-effective_from')
+        .values_list('our_rate', 'market_rate')
+    )
+
+
+def _fresh():
+    cached = _cached
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
+    return None
+
+
+def _store(rate):
+    global _cached
+
+    rates = Rates(*rate) if rate else DEFAULT_RATES
+    _cached = (rates, time.monotonic() + CACHE_TTL)
+    return rates
+
+
+def current_rates():
+    return _fresh() or _store(_active_rate().first())
+
+
+# Async view'lar için: önbellek doluysa thread'e geçmeden döner
+async def acurrent_rates():
+    return _fresh() or _store(await _active_rate().afirst())
+
+
+def invalidate():
+    global _cached
+    _cached = None
@@ -0,0 +1,198 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import DailySalesRollup, Order, OrderItem
+from .pricing import MARKET_RATE
+
+# Ciroya ve kâra dahil edilmeyen durumlar
+EXCLUDED_STATUSES = ('draft', 'cancelled', 'cancel_requested')
+
+# "Active / Transit" sayacındaki durumlar
+ACTIVE_STATUSES = ('approved', 'dubai', 'shipping', 'arrived')
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+# --- SİPARİŞ BAŞINA GERÇEK MALİYET ($) ---
+# 1. Admin "actual_cost_usd" girdiyse onu kullan.
+# 2. Girmediyse müşterinin girdiği ürün fiyatlarının toplamını baz al.
+# Tek bir SQL ifadesi; sipariş başına ayrı sorgu atmaz.
+def order_cost_usd():
+    items_total = Subquery(
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(total=Sum('manual_price_usd'))
+        .values('total'),
+        output_field=MONEY,
+    )
+    return Coalesce('actual_cost_usd', items_total, Value(Decimal('0')), output_field=MONEY)
+
+
+# --- DURUM BAZLI ÖZET (TEK GROUP BY SORGUSU) ---
+def status_breakdown(queryset=None):
+    if queryset is None:
+        queryset = Order.objects.all()
+
+    rows = (
+        queryset.order_by()
+        .values('status')
+        .annotate(
+            count=Count('id'),
+            revenue_iqd=Sum('total_price_iqd'),
+            cost_usd=Sum(order_cost_usd()),
+        )
+    )
+
+    return {
+        row['status']: {
+            'count': row['count'],
+            'revenue_iqd': row['revenue_iqd'] or Decimal('0'),
+            'cost_usd': row['cost_usd'] or Decimal('0'),
+        }
+        for row in rows
+    }
+
+
+# --- KASA / MALİYET / NET KÂR + SAYAÇLAR ---
+def summarize(breakdown, market_rate=MARKET_RATE):
+    revenue_iqd = Decimal('0')
+    real_cost_iqd = Decimal('0')
+
+    for status, row in breakdown.items():
+        if status in EXCLUDED_STATUSES:
+            continue
+        revenue_iqd += row['revenue_iqd']
+        # Maliyet piyasa kuruyla IQD'ye çevrilir
+        real_cost_iqd += row['cost_usd'] * Decimal(market_rate)
+
+    def count(*statuses):
+        return sum(breakdown[s]['count'] for s in statuses if s in breakdown)
+
+    return {
+        'revenue_iqd': revenue_iqd,
+        'real_cost_iqd': real_cost_iqd,
+        'net_profit': revenue_iqd - real_cost_iqd,
+
+        'count_draft': count('draft'),
+        'count_pending': count('pending'),
+        'count_active': count(*ACTIVE_STATUSES),
+        'count_delivered': count('delivered'),
+    }
+
+
+# --- GÜNLÜK ÖZET (DailySalesRollup) ---
+def rollup_aggregates():
+    def total(expression, field=MONEY):
+        return Coalesce(Sum(expression), Value(0), output_field=field)
+
+    return {
+        'order_count': Count('id'),
+        'revenue_iqd': total('total_price_iqd'),
+        'real_cost_usd': total(order_cost_usd()),
+        'discount_iqd': total('discount_amount'),
+        'points_spent': total('points_spent', IntegerField()),
+        'points_earned': total('points_to_earn', IntegerField()),
+    }
+
+
+def order_bucket(order):
+    return timezone.localdate(order.created_at), order.status
+
+
+def local_day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+# created_at__date yerine yerel gün sınırları: order_status_created_idx kullanılabilsin
+def day_filter(day, status):
+    return Q(
+        status=status,
+        created_at__gte=local_day_start(day),
+        created_at__lt=local_day_start(day + datetime.timedelta(days=1)),
+    )
+
+
+def rollup_rows(orders):
+    return (
+        orders.order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'status')
+        .annotate(**rollup_aggregates())
+    )
+
+
+ROLLUP_FIELDS = (
+    'order_count', 'revenue_iqd', 'real_cost_usd', 'discount_iqd',
+    'points_spent', 'points_earned', 'updated_at',
+)
+
+
+# Sadece değişen (gün, durum) satırlarını yeniden hesaplar:
+# tek GROUP BY sorgusu + tek upsert (+ boşalan satırlar için tek DELETE)
+def refresh_rollups(buckets):
+    buckets = set(buckets)
+    if not buckets:
+        return
+
+    condition = Q()
+    for day, status in buckets:
+        condition |= day_filter(day, status)
+
+    rows = [DailySalesRollup(**row) for row in rollup_rows(Order.objects.filter(condition))]
+    if rows:
+        DailySalesRollup.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['day', 'status'],
+            update_fields=ROLLUP_FIELDS,
+        )
+
+    empty = buckets - {(row.day, row.status) for row in rows}
+    if empty:
+        condition = Q()
+        for day, status in empty:
+            condition |= Q(day=day, status=status)
+        DailySalesRollup.objects.filter(condition).delete()
+
+
+# Tüm tabloyu (veya "since" gününden sonrasını) sıfırdan hesaplar.
+def rebuild_rollups(since=None):
+    orders = Order.objects.all()
+    rollups = DailySalesRollup.objects.all()
+    if since:
+        orders = orders.filter(created_at__date__gte=since)
+        rollups = rollups.filter(day__gte=since)
+
+    rows = rollup_rows(orders)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = DailySalesRollup.objects.bulk_create(
+            [DailySalesRollup(**row) for row in rows], batch_size=500
+        )
+    return len(created)
+
+
+# status_breakdown() ile aynı şekil, ama siparişler yerine özet tablosundan
+def rollup_breakdown():
+    rows = (
+        DailySalesRollup.objects.values('status')
+        .annotate(
+            count=Sum('order_count'),
+            revenue_iqd=Sum('revenue_iqd'),
+            cost_usd=Sum('real_cost_usd'),
+        )
+    )
+    return {
+        row['status']: {
+            'count': row['count'],
+            'revenue_iqd': row['revenue_iqd'] or Decimal('0'),
+            'cost_usd': row['cost_usd'] or Decimal('0'),
+        }
+        for row in rows
+    }
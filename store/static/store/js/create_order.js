@@ -0,0 +1,44 @@
+// 1. YENİ ÜRÜN EKLEME (çeviriler create_order.html'deki <template> içinde)
+function addNewItem() {
+    const container = document.getElementById('items-container');
+    const itemCount = container.querySelectorAll('.item-row').length + 1;
+
+    const newRow = document.getElementById('item-row-template').content.cloneNode(true);
+    newRow.querySelector('.item-index').textContent = itemCount;
+    container.appendChild(newRow);
+}
+
+// 2. DOSYA SEÇİMİ GÖSTERGESİ
+const fileInput = document.getElementById('fileInput');
+const uploadLabel = document.getElementById('uploadLabel');
+const fileNameDisplay = document.getElementById('fileNameDisplay');
+
+function setUploadLabel(icon, text) {
+    uploadLabel.replaceChildren();
+    const i = document.createElement('i');
+    i.className = 'fa-solid ' + icon;
+    uploadLabel.append(i, ' ' + text);
+}
+
+fileInput.addEventListener('change', function(e) {
+    const count = e.target.files.length;
+    if (count > 0) {
+        uploadLabel.style.backgroundColor = 'rgba(46, 204, 113, 0.1)';
+        uploadLabel.style.borderColor = '#2ecc71';
+        uploadLabel.style.color = '#27ae60';
+        // Tekil/Çoğul ayrımı basitçe yapıldı
+        setUploadLabel('fa-check-circle', count + ' ' + uploadLabel.dataset.selectedText);
+
+        let names = [];
+        for (let i = 0; i < count; i++) {
+            names.push(e.target.files[i].name);
+        }
+        fileNameDisplay.textContent = names.join(', ');
+    } else {
+        uploadLabel.style.backgroundColor = 'var(--bg-body)';
+        uploadLabel.style.borderColor = 'transparent';
+        uploadLabel.style.color = 'var(--text-muted)';
+        setUploadLabel('fa-camera', uploadLabel.dataset.emptyText);
+        fileNameDisplay.textContent = '';
+    }
+});
@@ -0,0 +1,18 @@
+// Akordeon Aç/Kapa Mantığı (Aynen korundu)
+var acc = document.getElementsByClassName("faq-question");
+var i;
+
+for (i = 0; i < acc.length; i++) {
+    acc[i].addEventListener("click", function() {
+        this.classList.toggle("active");
+        var panel = this.nextElementSibling;
+        if (panel.style.maxHeight) {
+            panel.style.maxHeight = null;
+            // İkonlar text olduğu için çeviriye gerek yok (+/- evrenseldir)
+            this.querySelector('.icon').innerText = "+";
+        } else {
+            panel.style.maxHeight = panel.scrollHeight + "px";
+            this.querySelector('.icon').innerText = "-";
+        } 
+    });
+}
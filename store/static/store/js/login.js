@@ -0,0 +1,64 @@
+const usernameInput = document.getElementById('username');
+const passwordInput = document.getElementById('password');
+const toggleBtn = document.getElementById('toggleBtn');
+const duckMascot = document.querySelector('.duck-mascot');
+const pupils = document.querySelectorAll('.pupil');
+
+// Şifre Görünüyor mu Kontrolü
+const isPassVisible = () => passwordInput.getAttribute('type') === 'text';
+
+// --- USERNAME ---
+usernameInput.addEventListener('input', (e) => {
+    if (isPassVisible()) return;
+    const val = e.target.value.length;
+    const moveX = Math.min(val, 25) - 10; 
+    const moveY = Math.abs(moveX) / 5;
+    pupils.forEach(pupil => {
+        pupil.style.transform = `translate(${moveX}px, ${moveY}px)`;
+    });
+});
+
+usernameInput.addEventListener('focus', () => { 
+    if (!isPassVisible()) {
+        duckMascot.classList.add('looking'); 
+    }
+});
+
+usernameInput.addEventListener('blur', () => { 
+    duckMascot.classList.remove('looking'); 
+    if (!isPassVisible()) {
+        pupils.forEach(pupil => { pupil.style.transform = 'translate(0,0)'; });
+    }
+});
+
+// --- PASSWORD ---
+passwordInput.addEventListener('focus', () => {
+    if (isPassVisible()) {
+        duckMascot.classList.add('peeking');
+    } else {
+        duckMascot.classList.add('covering');
+    }
+    duckMascot.classList.remove('looking');
+});
+
+passwordInput.addEventListener('blur', () => {
+    duckMascot.classList.remove('covering');
+});
+
+// --- TOGGLE BUTTON ---
+function togglePassword() {
+    const type = passwordInput.getAttribute('type') === 'password' ? 'text' : 'password';
+    passwordInput.setAttribute('type', type);
+    toggleBtn.innerText = type === 'text' ? '🙈' : '👁️'; 
+
+    if (type === 'text') {
+        duckMascot.classList.remove('covering');
+        duckMascot.classList.remove('looking');
+        duckMascot.classList.add('peeking');
+    } else {
+        duckMascot.classList.remove('peeking');
+        if (document.activeElement === passwordInput) {
+            duckMascot.classList.add('covering');
+        }
+    }
+}
@@ -0,0 +1,94 @@
+// Sipariş durumlarını sayfayı yenilemeden güncelle.
+// ASGI'da canlı akış (api/orders/events/, SSE) kullanılır; yoksa veya
+// bağlantı kurulamazsa api/orders/status/ yoklanır: sunucu ASGI ise istek
+// değişiklik olana kadar bekler (long-poll), değilse poll_after sonra tekrar sorulur.
+(function () {
+    var list = document.querySelector('.orders-list');
+    if (!list || !window.fetch) return;
+
+    var since = list.dataset.since;
+    var updateLabel = list.dataset.updateLabel;
+
+    // Takip adımları: hangi durumlarda aktif (şablondaki koşulların aynısı)
+    var STEPS = [
+        function () { return true; },
+        function (s) { return ['pending', 'draft', 'cancelled'].indexOf(s) === -1; },
+        function (s) { return ['shipping', 'arrived', 'delivered'].indexOf(s) !== -1; },
+        function (s) { return s === 'delivered'; }
+    ];
+
+    function apply(order) {
+        var card = list.querySelector('.order-card[data-order-id="' + order.id + '"]');
+        if (!card) return false;
+        // İptal bandı vb. yeniden çizmek yerine sayfayı tazele
+        if (order.status === 'cancelled') return true;
+
+        var badge = card.querySelector('.status-badge');
+        badge.className = 'status-badge status-' + order.status;
+        badge.textContent = order.status_display;
+
+        card.querySelectorAll('.tracking-track .step').forEach(function (step, i) {
+            step.classList.toggle('active', STEPS[i](order.status));
+        });
+
+        var box = card.querySelector('.tracking-note-box');
+        if (order.tracking_note) {
+            if (!box) {
+                box = document.createElement('div');
+                box.className = 'tracking-note-box';
+                var label = document.createElement('strong');
+                label.textContent = '📢 ' + updateLabel + ': ';
+                var text = document.createElement('span');
+                text.className = 'note-text';
+                box.appendChild(label);
+                box.appendChild(text);
+                card.querySelector('.tracking-track').after(box);
+            }
+            box.querySelector('.note-text').textContent = order.tracking_note;
+        } else if (box) {
+            box.remove();
+        }
+        return false;
+    }
+
+    function poll(delay) {
+        setTimeout(function () {
+            var url = list.dataset.statusUrl + '?wait=25&since=' + encodeURIComponent(since || '');
+            fetch(url, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+                .then(function (response) {
+                    if (!response.ok) throw new Error(response.status);
+                    return response.json();
+                })
+                .then(function (data) {
+                    var reload = false;
+                    data.orders.forEach(function (order) { reload = apply(order) || reload; });
+                    if (reload) return window.location.reload();
+                    since = data.since || since;
+                    poll(data.more ? 0 : data.poll_after * 1000);
+                })
+                // Oturum düştü / sunucu yeniden başlıyor: daha seyrek dene
+                .catch(function () { poll(30000); });
+        }, delay);
+    }
+
+    function listen() {
+        var url = list.dataset.eventsUrl + '?since=' + encodeURIComponent(since || '');
+        var source = new EventSource(url);
+        source.addEventListener('status', function (event) {
+            var order = JSON.parse(event.data);
+            since = event.lastEventId || since;
+            if (apply(order)) window.location.reload();
+        });
+        // Tarayıcı kopan bağlantıyı kendisi yeniler (Last-Event-ID ile);
+        // tamamen kapandıysa (401, proxy desteklemiyor) yoklamaya geç
+        source.onerror = function () {
+            if (source.readyState === EventSource.CLOSED) poll(0);
+        };
+    }
+
+    if (list.dataset.eventsUrl && window.EventSource) {
+        listen();
+    } else {
+        poll(0);
+    }
+})();
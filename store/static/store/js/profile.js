@@ -0,0 +1,15 @@
+function toggleEdit() {
+    var viewMode = document.getElementById("viewMode");
+    var editMode = document.getElementById("editMode");
+    var editBtn = document.getElementById("editBtn");
+
+    if (editMode.style.display === "none") {
+        editMode.style.display = "block";
+        viewMode.style.display = "none";
+        editBtn.style.display = "none"; 
+    } else {
+        editMode.style.display = "none";
+        viewMode.style.display = "block";
+        editBtn.style.display = "block"; 
+    }
+}
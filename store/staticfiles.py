@@ -0,0 +1,117 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+
+try:
+    import brotli
+except ImportError:  # Brotli isteğe bağlı; gzip her zaman üretilir
+    brotli = None
+
+# --- STATİK DOSYA DEPOSU ---
+# collectstatic: dosya adlarına içerik hash'i eklenir (base.3f2a9c1d7e4b.css),
+# metin dosyalarının yanına .gz (ve brotli kuruluysa .br) kopyası yazılır.
+# Hash'li ad içerik değişince değiştiği için tarayıcı dosyayı süresiz önbellekleyebilir.
+COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map')
+MIN_COMPRESS_SIZE = 512   # Bundan küçük dosyada kazanç başlık maliyetini karşılamıyor
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            for compressed in self.compress(name):
+                yield name, compressed, True
+
+    def compress(self, name):
+        if not name.endswith(COMPRESS_EXTENSIONS):
+            return
+        with self.open(name) as source:
+            content = source.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+        for suffix, data in variants:
+            # Sıkıştırma işe yaramıyorsa (zaten sıkışık içerik) kopya yazma
+            if len(data) >= len(content) * 0.95:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
+            yield name + suffix
+
+    # Manifestte olmayan dosyanın hash'i STATIC_ROOT'taki kopyasından hesaplanır
+    manifest_strict = False
+
+    # collectstatic hiç çalıştırılmamışsa (testler, yeni kurulum) manifest de
+    # kopyalar da yoktur: şablonlar hata vermesin, dosyalar hash'siz adıyla sunulur
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+
+# --- SUNUM ---
+# Önde statik dosya sunucusu (nginx, PythonAnywhere static mapping) yoksa
+# SERVE_STATIC=1 ile Django sunar: önceden sıkıştırılmış kopya seçilir,
+# hash'li dosyalar bir yıl "immutable" önbelleklenir.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+# "gzip;q=0" o kodlamayı reddetmek demek; q verilmezse 1, "*" listelenmeyenler için
+def accepted_encodings(header):
+    qualities = {}
+    for part in header.split(','):
+        name, *params = [value.strip() for value in part.split(';')]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    return {name for name, _ in ENCODINGS if qualities.get(name, qualities.get('*', 0)) > 0}
+
+
+def serve_static(request, path):
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if name in accepted and os.path.isfile(full_path + suffix):
+            encoding, full_path = name, full_path + suffix
+            break
+
+    response = FileResponse(open(full_path, 'rb'), content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    if HASHED_NAME.search(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=3600'
+    return response
@@ -0,0 +1,136 @@
+import asyncio
+import datetime
+import time
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Order
+
+# --- SİPARİŞ DURUMU AKIŞI (JSON / LONG-POLL) ---
+# "Siparişlerim" sayfası tüm HTML'i yeniden çekmek yerine sadece değişen
+# siparişlerin durumunu ve takip notunu sorar: ?since=<son cevaptaki since>.
+#
+# Long-poll: değişiklik yoksa async view bağlantıyı LONG_POLL_MAX saniyeye kadar
+# tutar. Bekleyen istemci thread tutmaz; sadece kullanıcının önbellekteki damgasını
+# POLL_INTERVAL'da bir okur. Damga, sipariş kaydedilince (commit sonrası) yenilenir.
+# Önbellek worker'lar arasında ortak değilse (locmem) diğer worker'daki
+# değişiklik en geç DB_RECHECK saniyede veritabanından görülür.
+STATUS_LIMIT = 100
+LONG_POLL_MAX = 25
+POLL_INTERVAL = 0.5
+DB_RECHECK = 10
+STAMP_TIMEOUT = 60 * 60
+SHORT_POLL_AFTER = 15   # Senkron (WSGI) sunumda istemcinin bekleyeceği süre
+
+STATUS_LABELS = dict(Order.STATUS_CHOICES)
+
+
+def stamp_key(user_id):
+    return f'order-status:{user_id}'
+
+
+def touch(user_ids):
+    stamp = time.time_ns()
+    cache.set_many({stamp_key(user_id): stamp for user_id in set(user_ids)}, STAMP_TIMEOUT)
+
+
+# Sipariş kaydı transaction içindeyse bekleyenler commit'ten sonra uyansın
+# (yoksa uyanan istek değişikliği henüz göremez)
+def touch_on_commit(user_ids):
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: touch(user_ids))
+
+
+# --- İMLEÇ ---
+# Toplu admin işlemi siparişlerin hepsine aynı updated_at'i verir: tek başına
+# zaman damgası, sayfa sınırında aynı ana düşen siparişleri atlatırdı. İmleç
+# bu yüzden "<updated_at>,<son id>" taşır. Sadece zaman verilirse (sayfanın
+# render anı, Unix zamanı) o andan sonrası döner.
+class Cursor(NamedTuple):
+    at: datetime.datetime
+    id: int = None
+
+    def __str__(self):
+        return self.at.isoformat() if self.id is None else f'{self.at.isoformat()},{self.id}'
+
+
+def parse_since(value):
+    if not value:
+        return None
+    value, _, last_id = value.partition(',')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        raise ValueError(f"invalid since: {value!r}")
+    try:
+        return Cursor(datetime.datetime.fromtimestamp(float(value), tz=datetime.timezone.utc), last_id)
+    except (ValueError, OverflowError, OSError):
+        # Sayı değil ya da aralık dışı (1e20, inf): ISO tarih olarak denenir
+        pass
+    since = parse_datetime(value)
+    if since is None:
+        raise ValueError(f"invalid since: {value!r}")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return Cursor(since, last_id)
+
+
+# En eski değişiklikten başlar: limit dolarsa sonraki istek kaldığı yerden devam eder
+def changes(user_id, cursor):
+    orders = Order.objects.filter(user_id=user_id).exclude(status='draft')
+    if cursor:
+        after = Q(updated_at__gt=cursor.at)
+        if cursor.id is not None:
+            after |= Q(updated_at=cursor.at, id__gt=cursor.id)
+        orders = orders.filter(after)
+    return (
+        orders.order_by('updated_at', 'id')
+        .values('id', 'status', 'tracking_note', 'updated_at')[:STATUS_LIMIT]
+    )
+
+
+def payload(rows, cursor, poll_after=0):
+    if rows:
+        cursor = Cursor(rows[-1]['updated_at'], rows[-1]['id'])
+    return {
+        'orders': [
+            {
+                'id': row['id'],
+                'status': row['status'],
+                'status_display': STATUS_LABELS.get(row['status'], row['status']),
+                'tracking_note': row['tracking_note'] or '',
+                'updated_at': row['updated_at'].isoformat(),
+            }
+            for row in rows
+        ],
+        'since': str(cursor) if cursor else None,
+        'more': len(rows) >= STATUS_LIMIT,
+        'poll_after': poll_after,
+    }
+
+
+def latest(user_id, cursor):
+    return payload(list(changes(user_id, cursor)), cursor, poll_after=SHORT_POLL_AFTER)
+
+
+async def alatest(user_id, cursor, wait=0):
+    # Damga sorgudan önce okunur: arada gelen değişiklik kaçmasın
+    stamp = await cache.aget(stamp_key(user_id))
+    rows = [row async for row in changes(user_id, cursor)]
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(wait, LONG_POLL_MAX)
+    recheck_at = loop.time() + DB_RECHECK
+    while not rows and loop.time() < deadline:
+        await asyncio.sleep(min(POLL_INTERVAL, deadline - loop.time()))
+        current = await cache.aget(stamp_key(user_id))
+        if current == stamp and loop.time() < recheck_at:
+            continue
+        stamp, recheck_at = current, loop.time() + DB_RECHECK
+        rows = [row async for row in changes(user_id, cursor)]
+    return payload(rows, cursor)
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# --- CANLI SİPARİŞ DURUMU (SSE) ---
+# Admin'de (tek tek veya toplu) durum değişince olay, commit'ten sonra bu sürecin
+# Hub'ına yayınlanır; Hub onu sadece o kullanıcının açık bağlantılarına dağıtır.
+# Bekleyen her abone bir asyncio.Queue'dan ibarettir: thread ve DB bağlantısı
+# tutmaz, bir worker binlerce boşta bağlantıyı taşıyabilir.
+#
+# Birden çok süreç varsa (admin WSGI'da, SSE ASGI'da; birden çok uvicorn worker'ı)
+# STATUS_BROKER ile süreçler arası bir yayın kanalı takılır: yayın broker'a gider,
+# her süreç broker'ı tek bir görevle dinleyip kendi abonelerine dağıtır.
+HEARTBEAT = 15       # saniye; proxy'ler boşta bağlantıyı kesmesin
+RETRY_MS = 5000      # EventSource yeniden bağlanma süresi
+QUEUE_SIZE = 100     # Okumayan istemci belleği şişirmesin; dolarsa bağlantı kapanır
+
+
+class Broker:
+    """
+    Süreçler arası yayın kanalı protokolü (STATUS_BROKER ile seçilen sınıf
+    argümansız oluşturulur). Bu sınıf sadece belgedir; uyan her nesne olur:
+
+    publish(message)
+        Olayı (JSON'a çevrilebilir dict) tüm süreçlere yayınlar. Commit'ten
+        sonra herhangi bir thread'den, senkron çağrılır; hata fırlatırsa
+        loglanır, sipariş işlemi etkilenmez.
+
+    listen()
+        Tüm süreçlerin (bu süreç dahil) yayınlarını sırayla veren async
+        iterator. Her süreçte tek bir görev dinler; iterator biterse veya
+        hata verirse bir saniye sonra yeniden çağrılır.
+    """
+
+
+class Subscription:
+    def __init__(self, hub, user_id):
+        self.hub = hub
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.lagged = False
+
+    # Sadece aboneliğin event loop'unda çalışır (call_soon_threadsafe)
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    # None: kuyruk taştı, istemci Last-Event-ID ile yeniden bağlanıp eksikleri DB'den alsın
+    async def get(self):
+        if self.lagged:
+            return None
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    def __init__(self, broker=None):
+        self.broker = broker
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        if self.broker is not None:
+            self._ensure_listener(subscription.loop)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, message):
+        if self.broker is None:
+            self.deliver(message)
+            return
+        try:
+            self.broker.publish(message)
+        except Exception:
+            # Bildirim kaybı siparişi etkilemesin; istemci yeniden bağlanınca DB'den alır
+            logger.exception("Could not publish order status event")
+
+    def deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message['user'], ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # Döngüsü kapanmış (sunucu kapanıyor) abone
+                self.unsubscribe(subscription)
+
+    def _ensure_listener(self, loop):
+        listener = self._listener
+        if listener is not None and not listener.done() and listener.get_loop() is loop:
+            return
+        self._listener = loop.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self.broker.listen():
+                    self.deliver(message)
+            except Exception:
+                logger.exception("Order status broker listener failed, retrying")
+            await asyncio.sleep(1)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                broker = import_string(settings.STATUS_BROKER)() if settings.STATUS_BROKER else None
+                _hub = Hub(broker)
+    return _hub
+
+
+# --- YAYIN ---
+def transition(order, previous):
+    return {
+        'user': order.user_id,
+        'id': order.pk,
+        'status': order.status,
+        'previous': previous,
+        'status_display': order.get_status_display(),
+        'tracking_note': order.tracking_note or '',
+        'updated_at': order.updated_at.isoformat(),
+    }
+
+
+def publish_on_commit(messages):
+    messages = list(messages)
+    if not messages:
+        return
+
+    def publish():
+        hub = get_hub()
+        for message in messages:
+            hub.publish(message)
+    transaction.on_commit(publish)
+
+
+# --- SSE BİÇİMİ ---
+# id olarak status_feed imleci (updated_at,id): yeniden bağlanan tarayıcı
+# Last-Event-ID ile gönderir, arada kaçan değişiklikler DB'den tamamlanır.
+def format_event(message):
+    data = {key: value for key, value in message.items() if key != 'user'}
+    return f"id: {message['updated_at']},{message['id']}\nevent: status\ndata: {json.dumps(data)}\n\n"
+
+
+def release_connection():
+    # Bağlantı uzun süre boşta kalacak; transaction içinde değilsek (testler) kapat
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+async def stream(subscription, replay=()):
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        for message in replay:
+            yield format_event(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), HEARTBEAT)
+            except TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if message is None:
+                return
+            yield format_event(message)
+    finally:
+        subscription.close()
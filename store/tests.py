@@ -1,3 +1,1980 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import csv
+import gzip
+import importlib
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import close_old_connections, connection
+from django.http import Http404
+from django.test import AsyncRequestFactory, Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone, translation
+
+from .models import (
+    DailySalesRollup, EmailOutbox, ExchangeRate, Order, OrderItem, OrderScreenshot, PointsTransaction,
+    Product, Profile,
+)
+from . import rates
+from .outbox import MAX_ATTEMPTS
+from .page_cache import CSRF_PLACEHOLDER
+from . import images, perf, status_feed, status_stream
+from .points import reconcile, record, record_many
+from .translations import BASE_CATALOGS, get_translations
+from .transitions import bulk_set_status, lock_orders
+from .pricing import (
+    MARKET_RATE, OUR_RATE, POINT_EARN_RATE, POINT_VALUE_IQD, SHIPPING_FEE,
+    quote, quote_batch, reprice_orders,
+)
+from .templatetags.admin_dashboard import get_dashboard_stats
+
+
+def url(name, *args):
+    # LANGUAGE_CODE 'en-us', URL öneki ise 'en'
+    with translation.override('en'):
+        return reverse(name, args=args)
+
+
+def make_order(user, status='pending', total=0, actual_cost=None, prices=()):
+    order = Order.objects.create(
+        user=user, status=status, total_price_iqd=total, actual_cost_usd=actual_cost
+    )
+    for price in prices:
+        OrderItem.objects.create(order=order, product_link='https://shein.com/x', manual_price_usd=price)
+    if prices:
+        # Gerçek akışta ürünler eklendikten sonra sipariş tekrar kaydedilir (confirm_order)
+        order.save()
+    return order
+
+
+# --- ADMIN DASHBOARD ---
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+
+    def evaluate(self):
+        stats = get_dashboard_stats()
+        list(stats['top_customers'])
+        list(stats['recent_orders'])
+        return stats
+
+    def test_revenue_cost_and_counts(self):
+        make_order(self.user, 'delivered', total=60000, actual_cost=Decimal('30'), prices=[Decimal('40')])
+        make_order(self.user, 'dubai', total=30000, prices=[Decimal('10'), Decimal('5')])
+        make_order(self.user, 'pending', total=12000)
+        make_order(self.user, 'cancelled', total=99000, prices=[Decimal('70')])
+        make_order(self.user, 'draft', prices=[Decimal('70')])
+
+        stats = self.evaluate()
+
+        cost = (Decimal('30') + Decimal('15')) * MARKET_RATE
+        self.assertEqual(stats['revenue_iqd'], Decimal('102000'))
+        self.assertEqual(stats['real_cost_iqd'], cost)
+        self.assertEqual(stats['net_profit'], Decimal('102000') - cost)
+        self.assertEqual(stats['count_draft'], 1)
+        self.assertEqual(stats['count_pending'], 1)
+        self.assertEqual(stats['count_active'], 1)
+        self.assertEqual(stats['count_delivered'], 1)
+
+    def test_query_count_does_not_grow_with_orders(self):
+        for _ in range(3):
+            make_order(self.user, 'approved', total=1000, prices=[Decimal('1')])
+        # Kurlar süreç içinde önbellekli; sonuç önceki testlerin sırasına bağlı kalmasın
+        rates.current_rates()
+        with self.assertNumQueries(4):
+            self.evaluate()
+
+        for _ in range(20):
+            make_order(self.user, 'delivered', total=1000, prices=[Decimal('1')])
+        with self.assertNumQueries(4):
+            self.evaluate()
+
+
+# --- GÜNLÜK ÖZET (ROLLUP) ---
+class DailySalesRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+
+    def snapshot(self):
+        return list(
+            DailySalesRollup.objects.order_by('day', 'status')
+            .values('day', 'status', 'order_count', 'revenue_iqd', 'real_cost_usd',
+                    'discount_iqd', 'points_spent', 'points_earned')
+        )
+
+    def test_status_change_moves_order_between_buckets(self):
+        order = make_order(self.user, 'pending', total=50000, prices=[Decimal('20')])
+        self.assertEqual(DailySalesRollup.objects.get(status='pending').order_count, 1)
+
+        order.status = 'approved'
+        order.save()
+
+        self.assertFalse(DailySalesRollup.objects.filter(status='pending').exists())
+        row = DailySalesRollup.objects.get(status='approved')
+        self.assertEqual(row.order_count, 1)
+        self.assertEqual(row.revenue_iqd, Decimal('50000'))
+        self.assertEqual(row.real_cost_usd, Decimal('20'))
+
+    def test_delete_removes_order_from_rollup(self):
+        order = make_order(self.user, 'pending', total=50000)
+        order.delete()
+        self.assertFalse(DailySalesRollup.objects.exists())
+
+    def test_incremental_rows_match_full_rebuild(self):
+        make_order(self.user, 'delivered', total=60000, actual_cost=Decimal('30'))
+        make_order(self.user, 'delivered', total=10000, prices=[Decimal('3.50')])
+        order = make_order(self.user, 'pending', total=20000)
+        order.status = 'cancelled'
+        order.save()
+        incremental = self.snapshot()
+
+        call_command('rebuild_rollups', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_rebuild_since_only_touches_later_days(self):
+        make_order(self.user, 'pending', total=1000)
+        DailySalesRollup.objects.update(order_count=99)
+
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+        call_command('rebuild_rollups', since=tomorrow.isoformat(), stdout=io.StringIO())
+        self.assertEqual(DailySalesRollup.objects.get().order_count, 99)
+
+
+# --- E-POSTA KUYRUĞU ---
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP down")
+
+
+class CountingEmailBackend(BaseEmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+
+    def send_messages(self, email_messages):
+        mail.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.order = make_order(self.user, 'pending', total=1000)
+
+    def run_outbox(self):
+        call_command('run_outbox', once=True, stdout=io.StringIO())
+
+    def test_status_change_only_queues(self):
+        self.order.status = 'approved'
+        self.order.save()
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.to_email, 'ali@example.com')
+        self.assertEqual(email.status, 'queued')
+
+    def test_saving_without_status_change_queues_nothing(self):
+        self.order.tracking_note = 'Packed'
+        self.order.save()
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_delivered_order_queues_single_email(self):
+        self.order.status = 'delivered'
+        self.order.save()
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_worker_sends_queued_emails(self):
+        self.order.status = 'approved'
+        self.order.save()
+
+        self.run_outbox()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f'#{self.order.id}', mail.outbox[0].subject)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, 'sent')
+        self.assertIsNotNone(email.sent_at)
+
+        # İkinci çalıştırma tekrar göndermez
+        self.run_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='store.tests.CountingEmailBackend')
+    def test_batch_reuses_one_connection(self):
+        for _ in range(5):
+            self.order.status = 'dubai' if self.order.status != 'dubai' else 'shipping'
+            self.order.save()
+
+        CountingEmailBackend.opened = 0
+        self.run_outbox()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+
+    @override_settings(EMAIL_BACKEND='store.tests.FailingEmailBackend')
+    def test_failures_back_off_and_give_up(self):
+        self.order.status = 'approved'
+        self.order.save()
+
+        self.run_outbox()
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.status, 'queued')
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn('SMTP down', email.last_error)
+
+        for _ in range(MAX_ATTEMPTS):
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            self.run_outbox()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.attempts, MAX_ATTEMPTS)
+
+
+# --- TOPLU DURUM DEĞİŞİKLİĞİ ---
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pass') for i in range(3)]
+
+    def make_orders(self, count, status='arrived'):
+        orders = []
+        for i in range(count):
+            order = make_order(self.users[i % 3], status, total=10000)
+            order.points_to_earn = 10
+            order.save()
+            orders.append(order)
+        return Order.objects.filter(pk__in=[o.pk for o in orders])
+
+    def test_delivered_credits_points_once_per_order(self):
+        orders = self.make_orders(6)
+        EmailOutbox.objects.all().delete()
+
+        self.assertEqual(bulk_set_status(orders, 'delivered'), 6)
+        self.assertEqual(bulk_set_status(orders, 'delivered'), 0)
+
+        for user in self.users:
+            user.profile.refresh_from_db()
+            self.assertEqual(user.profile.dalin_points, 20)
+        self.assertTrue(all(o.points_added_to_profile for o in orders))
+        self.assertEqual(EmailOutbox.objects.count(), 6)
+        self.assertEqual(DailySalesRollup.objects.get(status='delivered').order_count, 6)
+        self.assertFalse(DailySalesRollup.objects.filter(status='arrived').exists())
+
+    def test_drafts_are_skipped(self):
+        draft = make_order(self.users[0], 'draft')
+        self.assertEqual(bulk_set_status(Order.objects.filter(pk=draft.pk), 'shipping'), 0)
+        draft.refresh_from_db()
+        self.assertEqual(draft.status, 'draft')
+
+    def test_query_count_does_not_grow_with_orders(self):
+        def count_queries(orders):
+            with CaptureQueriesContext(connection) as ctx:
+                bulk_set_status(orders, 'delivered')
+            return len(ctx.captured_queries)
+
+        # Her iki çağrıda da "delivered" rollup satırı zaten var olsun
+        make_order(self.users[0], 'delivered')
+        small = count_queries(self.make_orders(3))
+        large = count_queries(self.make_orders(30, status='shipping'))
+        self.assertEqual(small, large)
+
+    def test_admin_action(self):
+        orders = self.make_orders(4, status='dubai')
+        admin_user = User.objects.create_superuser('boss', 'boss@example.com', 'pass')
+        self.client.force_login(admin_user)
+
+        response = self.client.post(url('admin:store_order_changelist'), {
+            'action': 'mark_shipping',
+            '_selected_action': [o.pk for o in orders],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(orders.values_list('status', flat=True)), {'shipping'})
+
+    def test_admin_queryset_locks_only_orders(self):
+        from django.contrib.admin.sites import site
+        from .admin import OrderAdmin
+
+        orders = self.make_orders(3, status='dubai')
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser('boss', 'boss@example.com', 'pass')
+        # Admin'in eklediği JOIN'ler (profil dahil) kilit sorgusuna taşınmasın
+        queryset = OrderAdmin(Order, site).get_queryset(request)
+        self.assertIn('store_profile', str(queryset.query))
+        queryset = queryset.filter(pk__in=orders.values('pk'))
+
+        locked = lock_orders(queryset, 'shipping')
+        self.assertEqual(locked.query.select_for_update_of, ('self',))
+        self.assertEqual(locked.query.select_related, {'user': {}})
+        self.assertNotIn('store_profile', str(locked.query))
+
+        self.assertEqual(bulk_set_status(queryset, 'shipping'), 3)
+        self.assertEqual(set(orders.values_list('status', flat=True)), {'shipping'})
+
+
+# --- SİNYALLER: DEĞİŞİKLİK TAKİBİ VE SORGU SAYISI ---
+class OrderSignalQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        order = make_order(self.user, 'pending', total=10000)
+        Order.objects.filter(pk=order.pk).update(points_to_earn=7)
+        # Admin'deki gibi: sipariş veritabanından yüklenir, sonra değiştirilir
+        self.order = Order.objects.get(pk=order.pk)
+
+    def test_loaded_values_are_tracked(self):
+        self.assertEqual(self.order.previous_status, 'pending')
+        self.order.status = 'approved'
+        self.assertTrue(self.order.status_changed())
+        self.order.save()
+        self.assertEqual(self.order.previous_status, 'approved')
+        self.assertFalse(self.order.status_changed())
+
+    def test_save_without_status_change(self):
+        # UPDATE order + rollup (SELECT + upsert)
+        self.order.tracking_note = 'Packed'
+        with self.assertNumQueries(3):
+            self.order.save()
+
+    def test_status_change(self):
+        # UPDATE order + rollup (SELECT + upsert + DELETE) + kullanıcı + outbox INSERT
+        self.order.status = 'approved'
+        with self.assertNumQueries(6):
+            self.order.save()
+
+    def test_delivery(self):
+        # Yukarıdakine ek olarak: puan bayrağı UPDATE + defter INSERT + bakiye UPDATE
+        self.order.status = 'delivered'
+        with self.assertNumQueries(9):
+            self.order.save()
+
+        self.assertEqual(Profile.objects.get(user=self.user).dalin_points, 7)
+        self.assertTrue(Order.objects.get(pk=self.order.pk).points_added_to_profile)
+
+    def test_points_are_credited_once(self):
+        stale = Order.objects.get(pk=self.order.pk)
+        self.order.status = 'delivered'
+        self.order.save()
+        self.order.save()
+
+        # Bayrağı görmemiş eski bir kopya da ikinci kez puan yükleyemez
+        stale.status = 'delivered'
+        stale.save()
+
+        self.assertEqual(Profile.objects.get(user=self.user).dalin_points, 7)
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+    def test_explicit_points_flag_change_is_saved(self):
+        # Bayrağı bu kopyada değiştiren düz save() yazımı kaybetmesin
+        self.order.points_added_to_profile = True
+        self.order.save()
+        self.assertTrue(Order.objects.get(pk=self.order.pk).points_added_to_profile)
+
+        self.order.points_added_to_profile = False
+        self.order.save()
+        self.assertFalse(Order.objects.get(pk=self.order.pk).points_added_to_profile)
+
+    def test_untracked_instance_falls_back_to_query(self):
+        order = Order(pk=self.order.pk, user=self.user, status='approved',
+                      created_at=self.order.created_at, total_price_iqd=10000)
+        order.save()
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+
+# --- ÇEVİRİ KATALOGLARI ---
+class TranslationCatalogTests(TestCase):
+    def write_overrides(self, path, data, mtime):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_catalogs_are_built_once_and_frozen(self):
+        texts = get_translations('ar')
+        self.assertIs(texts, get_translations('ar'))
+        self.assertEqual(texts['direction'], 'rtl')
+        with self.assertRaises(TypeError):
+            texts['home'] = 'x'
+
+    def test_unknown_language_falls_back_to_english(self):
+        self.assertIs(get_translations('fr'), BASE_CATALOGS['en'])
+        self.assertIs(get_translations(None), BASE_CATALOGS['en'])
+
+    def test_override_file_is_reloaded_only_when_mtime_changes(self):
+        path = os.path.join(tempfile.mkdtemp(), 'overrides.json')
+        self.write_overrides(path, {'en': {'home': 'Start'}}, 1_000_000_000)
+
+        with override_settings(TRANSLATIONS_OVERRIDE_FILE=path):
+            texts = get_translations('en')
+            self.assertEqual(texts['home'], 'Start')
+            self.assertEqual(texts['faq'], BASE_CATALOGS['en']['faq'])
+
+            # İçerik değişti ama mtime aynı: önbellekteki katalog kullanılır
+            self.write_overrides(path, {'en': {'home': 'Begin'}}, 1_000_000_000)
+            self.assertIs(get_translations('en'), texts)
+
+            self.write_overrides(path, {'en': {'home': 'Begin'}}, 2_000_000_000)
+            self.assertEqual(get_translations('en')['home'], 'Begin')
+
+            # Bozuk dosya: son geçerli katalog kalır
+            with open(path, 'w') as f:
+                f.write('{not json')
+            os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+            with self.assertLogs('store.translations', 'WARNING'):
+                self.assertEqual(get_translations('en')['home'], 'Begin')
+
+    def test_pages_render_with_catalogs(self):
+        response = self.client.get(url('faq'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['t']['faq'], BASE_CATALOGS['en']['faq'])
+
+
+# --- FİYATLAMA ---
+# hypothesis bağımlılığı eklemeden, sabit tohumlu rastgele girdilerle özellik testleri
+class PricingPropertyTests(TestCase):
+    CASES = 500
+
+    def random_cases(self, seed):
+        rng = random.Random(seed)
+        for _ in range(self.CASES):
+            prices = [Decimal(rng.randint(1, 50000)) / 100 for _ in range(rng.randint(0, 8))]
+            balance = rng.choice([0, rng.randint(0, 200), rng.randint(0, 100000)])
+            yield prices, balance, rng.random() < 0.7
+
+    def test_quote_invariants(self):
+        for prices, balance, use_points in self.random_cases(1):
+            q = quote(prices, balance, use_points)
+            total_usd = sum(prices, Decimal('0'))
+
+            self.assertEqual(q.total_usd, total_usd)
+            self.assertEqual(q.our_price_iqd, total_usd * OUR_RATE)
+            self.assertEqual(q.market_price_iqd, total_usd * MARKET_RATE)
+            self.assertEqual(q.total_before_discount, q.our_price_iqd + SHIPPING_FEE)
+            self.assertEqual(q.discount, q.points_to_spend * POINT_VALUE_IQD)
+            self.assertEqual(q.final_price, q.total_before_discount - q.discount)
+            self.assertEqual(q.points_to_earn, int(q.final_price / POINT_EARN_RATE))
+
+            self.assertGreaterEqual(q.final_price, 0)
+            self.assertLessEqual(q.discount, q.total_before_discount)
+            self.assertLessEqual(q.points_to_spend, balance)
+            self.assertGreaterEqual(q.points_to_spend, 0)
+            if not use_points:
+                self.assertEqual(q.points_to_spend, 0)
+            elif balance * POINT_VALUE_IQD <= q.total_before_discount:
+                # Yeterince pahalı siparişte bütün puanlar harcanır
+                self.assertEqual(q.points_to_spend, balance)
+            else:
+                # Puan fazlaysa: bir puan daha harcamak toplamı aşardı
+                self.assertGreater(q.discount + POINT_VALUE_IQD, q.total_before_discount)
+
+    def test_more_items_never_cost_less(self):
+        rng = random.Random(2)
+        for prices, balance, use_points in self.random_cases(2):
+            extra = Decimal(rng.randint(1, 10000)) / 100
+            before = quote(prices, balance, use_points)
+            after = quote(prices + [extra], balance, use_points)
+            self.assertGreaterEqual(after.total_before_discount, before.total_before_discount)
+            # Puanlar tavana takılınca final fiyat 25 IQD'lik kalana düşebilir;
+            # ama indirim hiçbir zaman azalmaz
+            self.assertGreaterEqual(after.discount, before.discount)
+
+    def test_batch_matches_single_quotes(self):
+        cases = list(self.random_cases(3))
+        batch = quote_batch(
+            [sum(prices, Decimal('0')) for prices, _, _ in cases],
+            [balance for _, balance, _ in cases],
+            [use for _, _, use in cases],
+            our_rate=1300,
+        )
+        for (prices, balance, use_points), q in zip(cases, batch):
+            self.assertEqual(q, quote(prices, balance, use_points, our_rate=1300))
+
+    def test_reprice_orders_uses_one_query(self):
+        user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        orders = [make_order(user, 'pending', prices=[Decimal('10'), Decimal('2.50')]) for _ in range(5)]
+        Order.objects.filter(pk=orders[0].pk).update(points_spent=40)
+
+        with self.assertNumQueries(1):
+            quotes = reprice_orders(Order.objects.all(), our_rate=1000)
+
+        self.assertEqual(quotes[orders[1].pk], quote([Decimal('12.50')], our_rate=1000))
+        self.assertEqual(quotes[orders[0].pk], quote([Decimal('12.50')], 40, True, our_rate=1000))
+
+
+class CheckoutPricingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        Profile.objects.filter(user=self.user).update(dalin_points=100)
+        self.client.force_login(self.user)
+        self.order = make_order(self.user, 'draft', prices=[Decimal('10'), Decimal('5')])
+        Order.objects.filter(pk=self.order.pk).update(wants_to_use_points=True)
+
+    def test_preview_and_confirm_agree(self):
+        expected = quote([Decimal('15')], 100, True)
+
+        response = self.client.get(url('order_preview', self.order.pk))
+        self.assertEqual(response.context['final_price'], expected.final_price)
+        self.assertEqual(response.context['points_to_spend'], 100)
+
+        response = self.client.post(url('confirm_order', self.order.pk))
+        self.assertEqual(response.status_code, 200)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'pending')
+        self.assertEqual(self.order.total_price_iqd, expected.final_price)
+        self.assertEqual(self.order.discount_amount, expected.discount)
+        self.assertEqual(self.order.points_to_earn, expected.points_to_earn)
+        self.assertEqual(Profile.objects.get(user=self.user).dalin_points, 0)
+
+
+# --- DÖVİZ KURLARI ---
+class ExchangeRateTests(TestCase):
+    def setUp(self):
+        rates.invalidate()
+        # TestCase geri alması sinyal tetiklemez; sonraki testlere kur sızmasın
+        self.addCleanup(rates.invalidate)
+
+    def test_defaults_without_rows(self):
+        self.assertEqual(rates.current_rates(), rates.DEFAULT_RATES)
+
+    def test_cached_until_saved(self):
+        ExchangeRate.objects.create(our_rate=1300, market_rate=1500)
+        self.assertEqual(rates.current_rates(), (1300, 1500))
+        with self.assertNumQueries(0):
+            rates.current_rates()
+
+        ExchangeRate.objects.create(our_rate=1250, market_rate=1480)
+        self.assertEqual(rates.current_rates(), (1250, 1480))
+
+    def test_future_rate_is_not_used_yet(self):
+        ExchangeRate.objects.create(our_rate=1300, market_rate=1500)
+        ExchangeRate.objects.create(
+            our_rate=2000, market_rate=2000,
+            effective_from=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.assertEqual(rates.current_rates(), (1300, 1500))
+
+    def test_ttl_expiry_rereads(self):
+        rates.current_rates()
+        # Başka bir worker'ın eklediği kur: bu süreçte sinyal yok, sadece TTL
+        ExchangeRate.objects.bulk_create([ExchangeRate(our_rate=1111, market_rate=1400)])
+        self.assertEqual(rates.current_rates(), rates.DEFAULT_RATES)
+
+        rates._cached = (rates._cached[0], 0)
+        self.assertEqual(rates.current_rates(), (1111, 1400))
+
+    def test_confirmed_order_records_rates(self):
+        ExchangeRate.objects.create(our_rate=1300, market_rate=1500)
+        user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.client.force_login(user)
+        order = make_order(user, 'draft', prices=[Decimal('10')])
+
+        self.client.post(url('confirm_order', order.pk))
+
+        order.refresh_from_db()
+        self.assertEqual((order.our_rate, order.market_rate), (1300, 1500))
+        self.assertEqual(order.total_price_iqd, quote([Decimal('10')], our_rate=1300).final_price)
+
+    def test_home_shows_current_rate(self):
+        ExchangeRate.objects.create(our_rate=1300, market_rate=1500)
+        response = self.client.get(url('home'))
+        self.assertContains(response, '$1 = 1,300 IQD')
+
+
+# --- SİPARİŞLERİM SAYFASI ---
+class MyOrdersPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.client.force_login(self.user)
+
+    def add_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(user=self.user, status='pending')
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product_link='https://shein.com/x', manual_price_usd=1)
+                for _ in range(3)
+            ])
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url('my_orders'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant(self):
+        self.add_orders(2)
+        small = self.count_queries()
+        self.add_orders(40)
+        self.assertEqual(self.count_queries(), small)
+
+    def test_item_counts_are_annotated(self):
+        self.add_orders(1)
+        response = self.client.get(url('my_orders'))
+        self.assertEqual(response.context['orders'][0].item_count, 3)
+
+    def test_cursor_pages_cover_every_order_once(self):
+        from .views import MY_ORDERS_PAGE_SIZE
+
+        self.add_orders(MY_ORDERS_PAGE_SIZE * 2 + 5)
+        make_order(self.user, 'draft')
+        # Aynı created_at'e sahip siparişler de atlanmamalı
+        Order.objects.filter(pk__lte=Order.objects.order_by('pk')[4].pk).update(
+            created_at=timezone.now()
+        )
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            response = self.client.get(url('my_orders'), {'cursor': cursor} if cursor else {})
+            seen += [order.pk for order in response.context['orders']]
+            cursor = response.context['next_cursor']
+            pages += 1
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        expected = Order.objects.exclude(status='draft').order_by('-created_at', '-id')
+        self.assertEqual(seen, list(expected.values_list('pk', flat=True)))
+
+    def test_garbage_cursor_shows_first_page(self):
+        self.add_orders(1)
+        response = self.client.get(url('my_orders'), {'cursor': '%%%nope'})
+        self.assertEqual(len(response.context['orders']), 1)
+
+
+# --- ANONİM SAYFA ÖNBELLEĞİ ---
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        rates.invalidate()
+        self.addCleanup(rates.invalidate)
+
+    def add_product(self, title):
+        return Product.objects.create(
+            title=title, image='products/x.jpg', price_usd=Decimal('9.99'),
+            shein_link='https://shein.com/p',
+        )
+
+    def assert_served_from_cache(self, name):
+        first = self.client.get(url(name))
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            second = self.client.get(url(name))
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        # CSRF token'ı her yanıtta farklı maskelenir; geri kalanı birebir aynı
+        masked = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]+"')
+        self.assertEqual(masked.sub(b'', second.content), masked.sub(b'', first.content))
+
+    def test_home_and_faq_hit_without_queries(self):
+        self.add_product('Summer Dress')
+        self.assert_served_from_cache('home')
+        self.assert_served_from_cache('faq')
+
+    def test_filebased_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            caches = {'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory,
+            }}
+            with override_settings(CACHES=caches):
+                self.add_product('Summer Dress')
+                self.assert_served_from_cache('home')
+                self.add_product('Winter Coat')
+                self.assertContains(self.client.get(url('home')), 'Winter Coat')
+
+    def test_languages_cached_separately(self):
+        self.client.get(url('home'))
+        with translation.override('ar'):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, get_translations('ar')['trending_title'])
+
+    def test_product_change_invalidates(self):
+        product = self.add_product('Summer Dress')
+        self.client.get(url('home'))
+
+        product.title = 'Autumn Dress'
+        product.save()
+        self.assertContains(self.client.get(url('home')), 'Autumn Dress')
+
+        product.delete()
+        self.assertNotContains(self.client.get(url('home')), 'Autumn Dress')
+
+    def test_rate_change_invalidates(self):
+        self.client.get(url('home'))
+        ExchangeRate.objects.create(our_rate=1300, market_rate=1500)
+        self.assertContains(self.client.get(url('home')), '$1 = 1,300 IQD')
+
+    def test_cached_page_carries_visitor_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.get(url('home'))
+        response = client.get(url('home'))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+
+        # Dil değiştirme formu önbellekten gelen sayfada da çalışmalı
+        token = client.cookies['csrftoken'].value
+        switched = client.post('/i18n/setlang/', {'language': 'ar', 'csrfmiddlewaretoken': token})
+        self.assertEqual(switched.status_code, 302)
+
+    def test_logged_in_users_get_fresh_page(self):
+        self.client.get(url('home'))
+        user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.client.force_login(user)
+
+        response = self.client.get(url('home'))
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, url('my_orders'))
+
+
+# --- EKRAN GÖRÜNTÜSÜ İŞLEME ---
+def photo_bytes(size=(3000, 2000), orientation=None, fmt='JPEG'):
+    from PIL import Image
+
+    # Telefon fotoğrafına benzesin diye degrade + biraz gürültü
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 20)
+    image = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+class ScreenshotPipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, IMAGE_WORKERS=0))
+        self.media_root = media.name
+
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        Profile.objects.filter(user=self.user).update(phone='0750', city='Erbil', address='Street 1')
+
+    def upload(self, content, name='cart.jpg'):
+        order = make_order(self.user, 'draft')
+        return OrderScreenshot.objects.create(
+            order=order, image=SimpleUploadedFile(name, content, content_type='image/jpeg')
+        )
+
+    def test_rotates_downscales_and_thumbnails(self):
+        from PIL import Image
+
+        original = photo_bytes(orientation=6)  # 90° döndürülmüş telefon fotoğrafı
+        screenshot = self.upload(original)
+        original_path = screenshot.image.path
+
+        self.assertTrue(images.process_screenshot(screenshot.pk))
+        screenshot.refresh_from_db()
+
+        self.assertFalse(os.path.exists(original_path))
+        self.assertIsNotNone(screenshot.processed_at)
+        with Image.open(screenshot.image.path) as image:
+            self.assertEqual(image.size, (1067, 1600))
+            self.assertEqual(image.format, images.FORMAT)
+        with Image.open(screenshot.thumbnail.path) as thumb:
+            self.assertLessEqual(max(thumb.size), images.THUMB_DIMENSION)
+
+        self.assertLess(screenshot.image.size * 10, len(original))
+        self.assertEqual(screenshot.preview_url, screenshot.thumbnail.url)
+
+    def test_processed_once(self):
+        screenshot = self.upload(photo_bytes(size=(400, 300)))
+        self.assertTrue(images.process_screenshot(screenshot.pk))
+        self.assertFalse(images.process_screenshot(screenshot.pk))
+
+    def test_concurrent_processing_keeps_winner_files(self):
+        screenshot = self.upload(photo_bytes(size=(400, 300)))
+        normalize = images.normalize
+        winner = []
+
+        # İşçi dönüştürürken process_screenshots aynı satırı bitirir
+        def normalize_while_backfill_runs(source):
+            result = normalize(source)
+            with mock.patch.object(images, 'normalize', normalize):
+                winner.append(images.process_screenshot(screenshot.pk))
+            return result
+
+        with mock.patch.object(images, 'normalize', normalize_while_backfill_runs):
+            self.assertFalse(images.process_screenshot(screenshot.pk))
+        self.assertEqual(winner, [True])
+
+        screenshot.refresh_from_db()
+        self.assertTrue(os.path.exists(screenshot.image.path))
+        self.assertTrue(os.path.exists(screenshot.thumbnail.path))
+        # Kaybedenin dosyaları ve orijinal silindi
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(screenshot.image.path))),
+            sorted([os.path.basename(screenshot.image.path), 'thumbs']),
+        )
+        self.assertEqual(
+            os.listdir(os.path.dirname(screenshot.thumbnail.path)),
+            [os.path.basename(screenshot.thumbnail.path)],
+        )
+
+    def test_broken_file_kept_and_not_retried(self):
+        screenshot = self.upload(b'not really a jpeg')
+        with self.assertLogs('store.images', 'WARNING'):
+            self.assertFalse(images.process_screenshot(screenshot.pk))
+
+        screenshot.refresh_from_db()
+        self.assertIsNotNone(screenshot.processed_at)
+        self.assertTrue(os.path.exists(screenshot.image.path))
+        self.assertEqual(screenshot.preview_url, screenshot.image.url)
+
+    def test_decompression_bomb_kept_and_not_retried(self):
+        from PIL import Image
+
+        screenshot = self.upload(photo_bytes(size=(400, 300)))
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            with self.assertLogs('store.images', 'WARNING'):
+                self.assertFalse(images.process_screenshot(screenshot.pk))
+
+        screenshot.refresh_from_db()
+        self.assertIsNotNone(screenshot.processed_at)
+        self.assertEqual(screenshot.preview_url, screenshot.image.url)
+
+    def test_create_order_processes_after_commit(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('cart.png', photo_bytes(fmt='PNG'), content_type='image/png')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(url('create_order'), {
+                'links[]': ['https://shein.com/a'], 'prices[]': ['10'], 'screenshots': [upload],
+            })
+            # İstek sırasında hiçbir şey işlenmez; sadece commit sonrasına sıraya girer
+            self.assertIsNone(OrderScreenshot.objects.get().processed_at)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertIsNotNone(OrderScreenshot.objects.get().processed_at)
+
+    def test_worker_pool_receives_job(self):
+        screenshot = self.upload(photo_bytes(size=(400, 300)))
+        submitted = []
+
+        class RecordingExecutor:
+            def submit(self, fn, *args):
+                submitted.append(args)
+
+        with override_settings(IMAGE_WORKERS=2), \
+                self.captureOnCommitCallbacks(execute=True):
+            images._executor = RecordingExecutor()
+            self.addCleanup(setattr, images, '_executor', None)
+            images.schedule([screenshot])
+
+        self.assertEqual(submitted, [([screenshot.pk],)])
+
+    def test_backfill_command(self):
+        for _ in range(3):
+            self.upload(photo_bytes(size=(400, 300)))
+
+        out = io.StringIO()
+        call_command('process_screenshots', stdout=out)
+        self.assertIn('Processed 3', out.getvalue())
+        self.assertFalse(OrderScreenshot.objects.filter(processed_at__isnull=True).exists())
+
+
+# --- SEPET KAYDETME (TOPLU INSERT / FARK) ---
+class CartPersistenceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        Profile.objects.filter(user=self.user).update(phone='0750', city='Erbil', address='Street 1')
+        self.client.force_login(self.user)
+
+    def cart(self, count, price='10'):
+        return {
+            'links[]': [f'https://shein.com/item-{i}' for i in range(count)],
+            'prices[]': [price] * count,
+        }
+
+    def count_queries(self, path, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(path, data)
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_create_query_count_does_not_grow_with_cart(self):
+        small = self.count_queries(url('create_order'), self.cart(5))
+        large = self.count_queries(url('create_order'), self.cart(50))
+
+        self.assertEqual(large, small)
+        order = Order.objects.latest('pk')
+        self.assertEqual(order.items.count(), 50)
+        self.assertEqual(order.status, 'draft')
+
+    def test_edit_query_count_does_not_grow_with_cart(self):
+        self.client.post(url('create_order'), self.cart(5))
+        self.client.post(url('create_order'), self.cart(50))
+        small, large = Order.objects.order_by('pk')
+
+        # Her ürünün fiyatı değişsin: en kötü durum
+        small_count = self.count_queries(url('edit_order', small.pk), self.cart(5, price='12'))
+        large_count = self.count_queries(url('edit_order', large.pk), self.cart(50, price='12'))
+
+        self.assertEqual(large_count, small_count)
+        self.assertEqual(
+            set(large.items.values_list('manual_price_usd', flat=True)), {Decimal('12')}
+        )
+
+    def test_edit_only_touches_changed_rows(self):
+        self.client.post(url('create_order'), self.cart(3))
+        order = Order.objects.get()
+        first, second, third = order.items.order_by('pk')
+
+        self.client.post(url('edit_order', order.pk), {
+            'links[]': [first.product_link, 'https://shein.com/new', third.product_link, 'https://shein.com/extra'],
+            'prices[]': ['10', '7.50', '10', '3'],
+        })
+
+        items = list(order.items.order_by('pk'))
+        self.assertEqual([item.pk for item in items[:3]], [first.pk, second.pk, third.pk])
+        self.assertEqual(
+            [(item.product_link, item.manual_price_usd) for item in items],
+            [
+                (first.product_link, Decimal('10')),
+                ('https://shein.com/new', Decimal('7.50')),
+                (third.product_link, Decimal('10')),
+                ('https://shein.com/extra', Decimal('3')),
+            ],
+        )
+
+    def test_edit_removes_dropped_items(self):
+        self.client.post(url('create_order'), self.cart(4))
+        order = Order.objects.get()
+        keep = order.items.order_by('pk').first()
+
+        self.client.post(url('edit_order', order.pk), {
+            'links[]': [keep.product_link], 'prices[]': ['10'],
+        })
+        self.assertEqual(list(order.items.values_list('pk', flat=True)), [keep.pk])
+
+
+# --- PUAN DEFTERİ ---
+class PointsLedgerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.client.force_login(self.user)
+
+    def balance(self):
+        return Profile.objects.get(user=self.user).dalin_points
+
+    def test_confirm_spends_through_ledger(self):
+        record_many([PointsTransaction(user=self.user, kind='adjust', amount=100)])
+
+        order = make_order(self.user, 'draft', prices=[Decimal('1')])
+        order.wants_to_use_points = True
+        order.save()
+        self.client.post(url('confirm_order', order.pk))
+
+        order.refresh_from_db()
+        self.assertEqual(order.points_spent, 100)
+        self.assertEqual(self.balance(), 0)
+        spend = PointsTransaction.objects.get(kind='spend')
+        self.assertEqual((spend.order_id, spend.amount), (order.pk, -100))
+        self.assertEqual(reconcile(), [])
+
+    def test_delivery_and_bulk_delivery_write_ledger(self):
+        single = make_order(self.user, 'shipping')
+        many = [make_order(self.user, 'shipping') for _ in range(2)]
+        Order.objects.filter(pk__in=[single.pk] + [o.pk for o in many]).update(points_to_earn=5)
+
+        single.refresh_from_db()
+        single.status = 'delivered'
+        single.save()
+        bulk_set_status(Order.objects.filter(pk__in=[o.pk for o in many]), 'delivered')
+
+        self.assertEqual(self.balance(), 15)
+        self.assertEqual(PointsTransaction.objects.filter(kind='earn').count(), 3)
+        self.assertEqual(reconcile(), [])
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        record(self.user.id, 40, 'adjust')
+        Profile.objects.filter(user=self.user).update(dalin_points=999)
+
+        out = io.StringIO()
+        call_command('reconcile_points', stdout=out)
+        self.assertIn('balance 999, ledger 40', out.getvalue())
+        self.assertEqual(self.balance(), 999)
+
+        call_command('reconcile_points', '--fix', stdout=io.StringIO())
+        self.assertEqual(self.balance(), 40)
+        self.assertEqual(reconcile(), [])
+
+    def test_admin_adjustment_goes_through_ledger(self):
+        admin_user = User.objects.create_superuser('boss', 'boss@example.com', 'pass')
+        self.client.force_login(admin_user)
+
+        response = self.client.post(url('admin:store_pointstransaction_add'), {
+            'user': self.user.pk, 'amount': 25, 'note': 'Goodwill',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.balance(), 25)
+        self.assertEqual(PointsTransaction.objects.get().kind, 'adjust')
+
+
+class PointsConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        if connection.vendor == 'sqlite':
+            self.use_file_database()
+
+    # Bellek içi (shared cache) SQLite'ta kilitli tabloyu bekleyen bağlantı
+    # busy_timeout kadar beklemez, hemen hata alır. Bu testler gerçek kilit
+    # için şemanın kopyası olan geçici bir dosya DB'sinde çalışır; diğer
+    # testler bellek içi DB'de kalır.
+    def use_file_database(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'db.sqlite3')
+
+        connection.ensure_connection()
+        memory, name = connection.connection, connection.settings_dict['NAME']
+        target = connection.get_new_connection({**connection.get_connection_params(), 'database': path})
+        memory.backup(target)
+        target.close()
+
+        # Thread'lerin bağlantıları da aynı settings_dict'ten açılır
+        connection.connection = None
+        connection.settings_dict['NAME'] = path
+
+        def restore():
+            connection.close()
+            connection.settings_dict['NAME'] = name
+            connection.connection = memory
+        self.addCleanup(restore)
+
+    def run_threads(self, target):
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_parallel_confirms_cannot_overspend(self):
+        user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        record(user.id, 100, 'adjust')
+
+        orders = []
+        for _ in range(self.THREADS):
+            order = make_order(user, 'draft', prices=[Decimal('10')])
+            order.wants_to_use_points = True
+            order.save()
+            orders.append(order)
+
+        def confirm(index):
+            client = Client()
+            client.force_login(user)
+            client.post(url('confirm_order', orders[index].pk))
+
+        errors = self.run_threads(confirm)
+        self.assertEqual(errors, [])
+
+        spent = sum(Order.objects.values_list('points_spent', flat=True))
+        self.assertEqual(spent, 100)
+        self.assertEqual(Profile.objects.get(user=user).dalin_points, 0)
+        self.assertEqual(reconcile(), [])
+
+    def test_parallel_deliveries_credit_once(self):
+        user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        order = make_order(user, 'shipping')
+        Order.objects.filter(pk=order.pk).update(points_to_earn=7)
+
+        def deliver(index):
+            copy = Order.objects.get(pk=order.pk)
+            copy.status = 'delivered'
+            copy.save()
+
+        errors = self.run_threads(deliver)
+        self.assertEqual(errors, [])
+        self.assertEqual(Profile.objects.get(user=user).dalin_points, 7)
+        self.assertEqual(reconcile(), [])
+
+
+# --- VERİTABANI PROFİLİ ---
+class SQLiteProfileTests(TestCase):
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite profile only')
+
+    def test_connection_pragmas(self):
+        from django.conf import settings
+
+        # Bellek içi test DB'si WAL olamaz; ayarlar geçici bir dosya DB'sinde denenir
+        with tempfile.TemporaryDirectory() as directory:
+            params = {**connection.get_connection_params(), 'database': os.path.join(directory, 'db.sqlite3')}
+            raw = connection.get_new_connection(params)
+            try:
+                def pragma(name):
+                    return raw.execute(f'PRAGMA {name}').fetchone()[0]
+
+                self.assertEqual(pragma('journal_mode'), 'wal')
+                self.assertEqual(pragma('synchronous'), 1)  # NORMAL
+                self.assertEqual(pragma('busy_timeout'), settings.SQLITE_BUSY_TIMEOUT * 1000)
+            finally:
+                raw.close()
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+# --- ORDER İNDEKSLERİ ---
+class HotQueryPlanTests(TestCase):
+    def test_explain_hot_queries_uses_order_indexes(self):
+        user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        make_order(user, 'pending')
+
+        out = io.StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        plans = out.getvalue()
+
+        self.assertIn('== my_orders (first page)', plans)
+        if connection.vendor == 'sqlite':
+            for index in ('order_user_recent_idx', 'order_recent_idx', 'order_status_created_idx'):
+                self.assertIn(index, plans)
+
+    def test_analyze_needs_postgres(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('EXPLAIN ANALYZE is supported here')
+        from django.core.management.base import CommandError
+        with self.assertRaises(CommandError):
+            call_command('explain_hot_queries', '--analyze', stdout=io.StringIO())
+
+
+# --- ADMIN LİSTE SORGU SAYILARI ---
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        admin_user = User.objects.create_superuser('boss', 'boss@example.com', 'pass')
+        self.client.force_login(admin_user)
+        self.customers = [User.objects.create_user(f'user{i}') for i in range(25)]
+
+    def add_orders(self, count):
+        Order.objects.bulk_create([
+            Order(user=self.customers[i % len(self.customers)], status='pending', total_price_iqd=1000)
+            for i in range(count)
+        ])
+
+    def changelist_queries(self, name, admin_class, per_page):
+        with mock.patch.object(admin_class, 'list_per_page', per_page):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url(name))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_order_changelist_is_constant(self):
+        from .admin import OrderAdmin
+
+        self.add_orders(500)
+        small = self.changelist_queries('admin:store_order_changelist', OrderAdmin, 100)
+        large = self.changelist_queries('admin:store_order_changelist', OrderAdmin, 500)
+
+        self.assertEqual(small, large)
+        # oturum, admin kullanıcısı, COUNT, sipariş + kullanıcı + profil (tek JOIN)
+        self.assertEqual(large, 4)
+
+    def test_order_change_page_does_not_list_users(self):
+        self.add_orders(1)
+        order = Order.objects.get()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url('admin:store_order_change', order.pk))
+        self.assertContains(response, self.customers[0].profile.phone or 'Phone')
+        self.assertFalse(any('FROM "auth_user" ORDER BY' in q['sql'] for q in queries))
+        # Sipariş, müşteri ve profil tek sorguda
+        self.assertFalse(any(q['sql'].startswith('SELECT') and 'FROM "store_profile"' in q['sql'] for q in queries))
+
+    def test_profile_and_points_changelists_are_constant(self):
+        from .admin import PointsTransactionAdmin, ProfileAdmin
+
+        self.add_orders(25)
+        record_many([
+            PointsTransaction(user=order.user, order=order, kind='earn', amount=5)
+            for order in Order.objects.select_related('user')
+        ])
+        for name, admin_class in (
+            ('admin:store_profile_changelist', ProfileAdmin),
+            ('admin:store_pointstransaction_changelist', PointsTransactionAdmin),
+        ):
+            with self.subTest(name):
+                self.assertEqual(
+                    self.changelist_queries(name, admin_class, 5),
+                    self.changelist_queries(name, admin_class, 100),
+                )
+
+
+# --- MUHASEBE DIŞA AKTARIMI ---
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        Profile.objects.filter(user=self.user).update(phone='0750', city='Erbil')
+
+        self.delivered = make_order(self.user, 'delivered', total=30000, prices=[Decimal('10'), Decimal('5')])
+        Order.objects.filter(pk=self.delivered.pk).update(market_rate=1500, discount_amount=500)
+        self.pending = make_order(self.user, 'pending', total=20000, actual_cost=Decimal('12'))
+        self.draft = make_order(self.user, 'draft', total=0)
+        # Geçen aya ait sipariş: tarih filtresi için
+        self.old = make_order(self.user, 'pending', total=1000)
+        Order.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - datetime.timedelta(days=40))
+
+    def read_csv(self, text):
+        rows = list(csv.DictReader(io.StringIO(text.lstrip('\ufeff'))))
+        return {int(row['Order ID']): row for row in rows}
+
+    def test_admin_action_streams_csv(self):
+        admin_user = User.objects.create_superuser('boss', 'boss@example.com', 'pass')
+        self.client.force_login(admin_user)
+
+        response = self.client.post(url('admin:store_order_changelist'), {
+            'action': 'export_orders_csv',
+            '_selected_action': [self.delivered.pk, self.pending.pk],
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        rows = self.read_csv(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual(set(rows), {self.delivered.pk, self.pending.pk})
+
+        delivered = rows[self.delivered.pk]
+        self.assertEqual(delivered['Items'], '2')
+        self.assertEqual(Decimal(delivered['Items Total ($)']), 15)
+        self.assertEqual(delivered['Real Cost (IQD)'], '22500')  # 15$ x 1500 (siparişteki kur)
+        self.assertEqual(delivered['Net Profit (IQD)'], '7500')
+        self.assertEqual(delivered['Discount (IQD)'], '500')
+        self.assertEqual(delivered['Phone'], '0750')
+
+        pending = rows[self.pending.pk]
+        self.assertEqual(Decimal(pending['Real Cost ($)']), 12)
+        self.assertEqual(pending['Real Cost (IQD)'], str(12 * rates.current_rates().market_rate))
+
+    def test_command_filters_like_admin(self):
+        out = io.StringIO()
+        call_command('export_orders', stdout=out)
+        self.assertEqual(set(self.read_csv(out.getvalue())), {self.delivered.pk, self.pending.pk, self.old.pk})
+
+        out = io.StringIO()
+        since = (timezone.localdate() - datetime.timedelta(days=7)).isoformat()
+        call_command('export_orders', '--status', 'pending', '--status', 'draft', '--from', since, stdout=out)
+        self.assertEqual(set(self.read_csv(out.getvalue())), {self.pending.pk, self.draft.pk})
+
+    def test_command_writes_csv_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.csv')
+            call_command('export_orders', '--to', timezone.localdate().isoformat(), '-o', path, stderr=io.StringIO())
+            with open(path, encoding='utf-8-sig') as exported:
+                self.assertEqual(len(self.read_csv(exported.read())), 3)
+
+    def test_formula_cells_are_neutralised(self):
+        from .exports import FIELD_INDEX, export_rows
+
+        self.user.username = '=HYPERLINK("http://evil")'
+        self.user.save()
+        Profile.objects.filter(user=self.user).update(phone='+9647501234567', city='@SUM(A1)')
+
+        out = io.StringIO()
+        call_command('export_orders', stdout=out)
+        row = self.read_csv(out.getvalue())[self.pending.pk]
+        self.assertEqual(row['Customer'], '\'=HYPERLINK("http://evil")')
+        self.assertEqual(row['Phone'], "'+9647501234567")
+        self.assertEqual(row['City'], "'@SUM(A1)")
+        self.assertEqual(row['Status'], 'pending')
+
+        # XLSX da aynı satırları yazar; sayılar (eksi kâr dahil) dokunulmadan kalır
+        rows = list(export_rows(Order.objects.filter(pk=self.pending.pk)))[1:]
+        self.assertEqual(rows[0][FIELD_INDEX['user__profile__city']], "'@SUM(A1)")
+        self.assertIsInstance(rows[0][-1], Decimal)
+
+    def test_xlsx(self):
+        from .exports import openpyxl
+        from django.core.management.base import CommandError
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.xlsx')
+            if openpyxl is None:
+                with self.assertRaises(CommandError):
+                    call_command('export_orders', '--format', 'xlsx', '-o', path)
+                return
+
+            call_command('export_orders', '--format', 'xlsx', '-o', path, stderr=io.StringIO())
+            sheet = openpyxl.load_workbook(path, read_only=True)['Orders']
+            self.assertEqual(sum(1 for _ in sheet.iter_rows()), 4)  # başlık + 3 sipariş
+
+
+# --- ÜRÜN KATALOĞU İÇE AKTARMA ---
+class ImportProductsTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+        source = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        self.dir = source.name
+        for name in ('dress', 'coat', 'shoes'):
+            with open(os.path.join(self.dir, f'{name}.jpg'), 'wb') as image:
+                image.write(photo_bytes(size=(1200, 1600)))
+
+    def write_csv(self, rows, name='products.csv'):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8', newline='') as manifest:
+            writer = csv.writer(manifest)
+            writer.writerow(['title', 'price', 'link', 'image'])
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_products', path, '--workers', '0', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_then_upserts_on_link(self):
+        from PIL import Image
+
+        path = self.write_csv([
+            ('Summer Dress', '12.50', 'https://shein.com/dress', 'dress.jpg'),
+            ('Winter Coat', '40', 'https://shein.com/coat', 'coat.jpg'),
+        ])
+        out, _ = self.run_import(path)
+        self.assertIn('Created 2, updated 0', out)
+
+        dress = Product.objects.get(shein_link='https://shein.com/dress')
+        with Image.open(dress.image.path) as image:
+            self.assertLessEqual(max(image.size), images.PRODUCT_DIMENSION)
+
+        path = self.write_csv([
+            ('Summer Dress', '9.99', 'https://shein.com/dress', 'dress.jpg'),
+            ('Winter Coat', '40', 'https://shein.com/coat', 'coat.jpg'),
+            ('Sneakers', '25', 'https://shein.com/shoes', 'shoes.jpg'),
+        ])
+        with self.assertNumQueries(5):  # SELECT + savepoint + INSERT + UPDATE + savepoint
+            out, _ = self.run_import(path)
+        self.assertIn('Created 1, updated 1, unchanged 1', out)
+        self.assertEqual(Product.objects.count(), 3)
+        dress.refresh_from_db()
+        self.assertEqual(dress.price_usd, Decimal('9.99'))
+
+    def test_json_manifest_and_bad_rows(self):
+        path = os.path.join(self.dir, 'products.json')
+        with open(path, 'w') as manifest:
+            json.dump([
+                {'title': 'Coat', 'price_usd': 40, 'shein_link': 'https://shein.com/coat', 'image_path': 'coat.jpg'},
+                {'title': 'No price', 'price': 'abc', 'link': 'https://shein.com/x', 'image': 'coat.jpg'},
+                {'title': 'Missing image', 'price': 5, 'link': 'https://shein.com/y', 'image': 'nope.jpg'},
+                {'title': 'Hidden', 'price': 5, 'link': 'https://shein.com/z', 'image': 'shoes.jpg', 'is_active': False},
+            ], manifest)
+
+        out, err = self.run_import(path)
+        self.assertIn('Created 2', out)
+        self.assertIn('2 error(s)', out)
+        self.assertIn('row 2: price is not a number', err)
+        self.assertIn('row 3: image:', err)
+        self.assertFalse(Product.objects.get(shein_link='https://shein.com/z').is_active)
+
+    def test_refresh_invalidates_home_page(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.get(url('home'))
+
+        self.run_import(self.write_csv([('Summer Dress', '12.50', 'https://shein.com/dress', 'dress.jpg')]))
+        self.assertContains(self.client.get(url('home')), 'Summer Dress')
+
+    def test_process_pool(self):
+        path = self.write_csv([
+            (name.title(), '10', f'https://shein.com/{name}', f'{name}.jpg')
+            for name in ('dress', 'coat', 'shoes')
+        ])
+        out = io.StringIO()
+        call_command('import_products', path, '--workers', '2', '--batch-size', '2', stdout=out)
+        self.assertIn('Created 3', out.getvalue())
+        for product in Product.objects.all():
+            self.assertTrue(os.path.exists(product.image.path))
+
+
+# --- PERFORMANS ÖLÇÜMÜ ---
+@override_settings(PERF_SAMPLE_RATE=1, PERF_SERVER_TIMING=True)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        perf.reset()
+        self.addCleanup(perf.reset)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('ali', password='pass')
+        make_order(self.user, prices=[10, 20])
+
+    def stats(self, name):
+        return next(row for row in perf.snapshot() if row['name'] == name)
+
+    def test_server_timing_header(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url('my_orders'))
+
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$')
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertGreater(float(re.search(r'tpl;dur=([\d.]+)', timing).group(1)), 0)
+
+    def test_stats_grouped_by_url_name(self):
+        for _ in range(3):
+            self.client.get(url('faq'))
+        self.client.force_login(self.user)
+        self.client.get(url('my_orders'))
+
+        faq = self.stats('faq')
+        self.assertEqual(faq['count'], 3)
+        self.assertEqual(sum(count for _, count in faq['buckets']), 3)
+        self.assertGreater(self.stats('my_orders')['max_queries'], 0)
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get(url('faq'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(perf.snapshot(), [])
+
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_timings_not_sent_unless_enabled(self):
+        response = self.client.get(url('faq'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.stats('faq')['count'], 1)
+
+    def test_histogram_percentiles(self):
+        histogram = perf.Histogram()
+        for value in [3] * 90 + [300] * 9 + [9000]:
+            histogram.add(value)
+        self.assertEqual(histogram.percentile(0.5), 5)
+        self.assertEqual(histogram.percentile(0.95), 500)
+        self.assertEqual(histogram.percentile(1), 9000)
+
+    def test_dashboard_is_staff_only(self):
+        self.client.force_login(self.user)
+        self.client.get(url('faq'))
+        response = self.client.get(url('perf_dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+        admin_user = User.objects.create_superuser('boss', 'boss@example.com', 'pass')
+        self.client.force_login(admin_user)
+        self.assertContains(self.client.get(url('perf_dashboard')), '<strong>faq</strong>')
+
+        self.client.post(url('perf_dashboard'))
+        self.assertEqual([row['name'] for row in perf.snapshot()], ['perf_dashboard'])
+
+
+# --- ASGI / ASYNC VIEW'LAR ---
+# Broker yerine geçen süreç içi kanal: yayınlar listen() ile geri döner
+class MemoryBroker:
+    def __init__(self):
+        self.published = []
+        self.listeners = []
+
+    def publish(self, message):
+        self.published.append(message)
+        for loop, queue in self.listeners:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def listen(self):
+        queue = asyncio.Queue()
+        self.listeners.append((asyncio.get_running_loop(), queue))
+        while True:
+            yield await queue.get()
+
+
+@override_settings(ASYNC_VIEWS=True)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # override_settings sınıf temizliğinde geri alınır; temizlikler ters sırayla
+        # çalıştığı için URL'ler ayar geri alındıktan sonra yeniden yüklenir
+        cls.addClassCleanup(cls.reload_urls)
+        super().setUpClass()
+        cls.reload_urls()
+
+    @staticmethod
+    def reload_urls():
+        # core/urls.py view'ları import sırasında ASYNC_VIEWS'e göre seçer
+        import core.urls
+        importlib.reload(core.urls)
+        clear_url_caches()
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        rates.invalidate()
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        Profile.objects.filter(user=self.user).update(dalin_points=100)
+        self.draft = make_order(self.user, 'draft', prices=[Decimal('10'), Decimal('5')])
+        make_order(self.user, 'dubai', prices=[Decimal('7')])
+        Product.objects.create(title='Summer Dress', price_usd=10, shein_link='https://shein.com/dress', image='p.jpg')
+
+    def test_customer_pages_are_async(self):
+        for name, args in (('home', ()), ('faq', ()), ('my_orders', ()), ('order_preview', (self.draft.pk,))):
+            with self.subTest(name):
+                self.assertTrue(iscoroutinefunction(resolve(url(name, *args)).func))
+        self.assertFalse(iscoroutinefunction(resolve(url('create_order')).func))
+
+    async def test_home_served_from_cache(self):
+        first = await self.async_client.get(url('home'))
+        second = await self.async_client.get(url('home'))
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertContains(second, 'Summer Dress')
+
+    async def test_my_orders(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(url('my_orders'))
+        self.assertEqual([order.status for order in response.context['orders']], ['dubai'])
+        self.assertEqual(response.context['orders'][0].item_count, 1)
+
+        again = await self.async_client.get(url('my_orders'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    @mock.patch.object(status_feed, 'POLL_INTERVAL', 0.01)
+    async def test_order_status_long_poll(self):
+        self.assertTrue(iscoroutinefunction(resolve(reverse('order_status')).func))
+        response = await self.async_client.get(reverse('order_status'))
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.user)
+        data = (await self.async_client.get(reverse('order_status'))).json()
+        self.assertEqual(len(data['orders']), 1)
+        self.assertEqual(data['poll_after'], 0)
+
+        with mock.patch.object(status_feed, 'LONG_POLL_MAX', 0.05):
+            response = await self.async_client.get(reverse('order_status'), {'since': data['since'], 'wait': 25})
+        self.assertEqual(response.json()['orders'], [])
+
+        response = await self.async_client.get(reverse('order_status'), {'since': '1e20'})
+        self.assertEqual(response.json(), {'error': 'invalid since'})
+        response = await self.async_client.get(reverse('order_status'), {'wait': 'soon'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'invalid wait'})
+        response = await self.async_client.get(reverse('order_events'), headers={'Last-Event-ID': 'inf'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_order_preview_matches_sync_pricing(self):
+        await self.async_client.aforce_login(self.user)
+        await self.async_client.post(url('order_preview', self.draft.pk), {'toggle_points': '1'})
+        response = await self.async_client.get(url('order_preview', self.draft.pk))
+
+        expected = quote([Decimal('15')], 100, True)
+        self.assertEqual(response.context['final_price'], expected.final_price)
+        self.assertEqual(response.context['points_to_spend'], 100)
+
+        # Django 404 sayfasını ayrı bir thread'de render eder; o thread'in bağlantısı
+        # bellek içi test DB'sinde açık transaction'ı bekleyemez. View doğrudan çağrılır.
+        from .async_views import order_preview
+
+        async def auser():
+            return self.user
+        request = AsyncRequestFactory().get(url('order_preview', 999))
+        request.user, request.auser = self.user, auser
+        with self.assertRaises(Http404):
+            await order_preview(request, 999)
+
+    async def test_anonymous_redirected_to_login(self):
+        response = await self.async_client.get(url('my_orders'))
+        self.assertEqual(response.status_code, 302)
+
+    async def open_events(self, **kwargs):
+        hub = status_stream.Hub(MemoryBroker())
+        patcher = mock.patch.object(status_stream, '_hub', hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('order_events'), **kwargs)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = response.streaming_content
+        self.assertEqual(await anext(content), b'retry: 5000\n\n')
+        return hub, content
+
+    def set_status(self, order, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_set_status(Order.objects.filter(pk=order.pk), status)
+
+    async def test_order_events_stream_transitions(self):
+        self.assertEqual((await self.async_client.get(reverse('order_events'))).status_code, 401)
+
+        hub, content = await self.open_events()
+        other = await sync_to_async(User.objects.create_user)('veli')
+        other_subscription = hub.subscribe(other.pk)
+        order = await Order.objects.aget(user=self.user, status='dubai')
+
+        await sync_to_async(self.set_status)(order, 'shipping')
+        event = (await asyncio.wait_for(anext(content), 2)).decode()
+        self.assertIn('event: status\n', event)
+        data = json.loads(re.search(r'^data: (.*)$', event, re.M).group(1))
+        self.assertEqual((data['id'], data['previous'], data['status']), (order.pk, 'dubai', 'shipping'))
+        # Yayın broker'dan geçti, başka kullanıcıya gitmedi
+        self.assertEqual([message['id'] for message in hub.broker.published], [order.pk])
+        self.assertTrue(other_subscription.queue.empty())
+
+        # İstemci ayrılınca ASGI handler bekleyen okumayı iptal eder
+        pending = asyncio.ensure_future(anext(content))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        other_subscription.close()
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_order_events_heartbeat_and_replay(self):
+        order = await Order.objects.aget(user=self.user, status='dubai')
+        since = order.updated_at
+        await sync_to_async(self.set_status)(order, 'arrived')
+
+        with mock.patch.object(status_stream, 'HEARTBEAT', 0.01):
+            _, content = await self.open_events(headers={'Last-Event-ID': since.isoformat()})
+            replayed = (await anext(content)).decode()
+            self.assertIn('"status": "arrived"', replayed)
+            self.assertEqual(await anext(content), b': ping\n\n')
+
+    async def test_only_event_stream_skips_per_request_thread(self):
+        from .asgi import SharedThreadStreams
+
+        inner = mock.AsyncMock()
+        application = SharedThreadStreams(inner)
+        events, page = reverse('order_events'), url('my_orders')
+        for path, root_path in ((events, ''), ('/shop' + events, '/shop')):
+            await application({'type': 'http', 'path': path, 'root_path': root_path}, None, None)
+        self.assertEqual(inner.handle.await_count, 2)
+        inner.assert_not_awaited()
+
+        for path, root_path in ((page, ''), ('/shop' + page, '/shop'), ('/shop' + events, '')):
+            await application({'type': 'http', 'path': path, 'root_path': root_path}, None, None)
+        self.assertEqual(inner.await_count, 3)
+        self.assertEqual(inner.handle.await_count, 2)
+
+        # handle() olmayan bir handler'da her şey olağan yoldan
+        async def plain(scope, receive, send):
+            plain.calls += 1
+        plain.calls = 0
+        with self.assertLogs('store.asgi', 'WARNING'):
+            fallback = SharedThreadStreams(plain)
+        await fallback({'type': 'http', 'path': events}, None, None)
+        self.assertEqual(plain.calls, 1)
+
+    @override_settings(STATUS_BROKER='store.tests.MemoryBroker')
+    def test_broker_is_loaded_from_settings(self):
+        with mock.patch.object(status_stream, '_hub', None):
+            self.assertIsInstance(status_stream.get_hub().broker, MemoryBroker)
+        with mock.patch.object(status_stream, '_hub', None), override_settings(STATUS_BROKER=''):
+            self.assertIsNone(status_stream.get_hub().broker)
+
+    async def test_lagging_subscriber_is_disconnected(self):
+        hub = status_stream.Hub()
+        subscription = hub.subscribe(self.user.pk)
+        for i in range(status_stream.QUEUE_SIZE + 1):
+            hub.deliver({'user': self.user.pk, 'id': i})
+        await asyncio.sleep(0)
+        self.assertIsNone(await subscription.get())
+        chunks = [chunk async for chunk in status_stream.stream(subscription)]
+        self.assertEqual(chunks, ['retry: 5000\n\n'])
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    @override_settings(PERF_SAMPLE_RATE=1, PERF_SERVER_TIMING=True)
+    async def test_timing_middleware_counts_async_queries(self):
+        from .perf import PerformanceMiddleware
+
+        async def get_response(request):
+            return None
+        self.assertTrue(iscoroutinefunction(PerformanceMiddleware(get_response)))
+
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(url('my_orders'))
+        queries = int(re.search(r'desc="(\d+) queries"', response['Server-Timing']).group(1))
+        self.assertGreater(queries, 0)
+
+
+# --- STATİK DOSYALAR ---
+class StaticAssetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+
+    def test_pages_have_no_inline_css_or_js(self):
+        pages = [url('home'), url('faq'), url('login')]
+        for page in pages:
+            with self.subTest(page):
+                content = self.client.get(page).content.decode()
+                self.assertNotIn('<style', content)
+                self.assertNotIn('<script>', content)
+                self.assertIn('/static/store/css/base.css', content)
+
+        self.client.force_login(self.user)
+        content = self.client.get(url('create_order')).content.decode()
+        self.assertNotIn('<script>', content)
+        self.assertIn('id="item-row-template"', content)
+        self.assertIn('/static/store/js/create_order.js', content)
+
+    def test_collectstatic_hashes_compresses_and_serves(self):
+        from .staticfiles import serve_static
+
+        with tempfile.TemporaryDirectory() as static_root, override_settings(STATIC_ROOT=static_root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(static_root, 'staticfiles.json')) as manifest:
+                hashed = json.load(manifest)['paths']['store/css/base.css']
+            self.assertRegex(hashed, r'^store/css/base\.[0-9a-f]{12}\.css$')
+            self.assertIn(f'/static/{hashed}', self.client.get(url('faq')).content.decode())
+
+            factory = RequestFactory()
+            response = serve_static(factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'), hashed)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            compressed = b''.join(response.streaming_content)
+
+            response = serve_static(factory.get('/'), hashed)
+            self.assertNotIn('Content-Encoding', response)
+            self.assertEqual(gzip.decompress(compressed), b''.join(response.streaming_content))
+
+            for header in ('gzip;q=0', 'br;q=0, gzip;q=0', '*;q=0', 'identity'):
+                with self.subTest(header):
+                    response = serve_static(factory.get('/', HTTP_ACCEPT_ENCODING=header), hashed)
+                    self.assertNotIn('Content-Encoding', response)
+            response = serve_static(factory.get('/', HTTP_ACCEPT_ENCODING='deflate, *;q=0.5'), hashed)
+            self.assertIn(response['Content-Encoding'], ('br', 'gzip'))
+
+            response = serve_static(factory.get('/'), 'store/css/base.css')
+            self.assertNotIn('immutable', response['Cache-Control'])
+            with self.assertRaises(Http404):
+                serve_static(factory.get('/'), '../core/settings.py')
+
+
+# --- KOŞULLU GET (304) ---
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        rates.invalidate()
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.client.force_login(self.user)
+        self.order = make_order(self.user, 'approved', prices=[Decimal('7')])
+        self.draft = make_order(self.user, 'draft', prices=[Decimal('10'), Decimal('5')])
+
+    def revalidate(self, page, response):
+        with CaptureQueriesContext(connection) as queries:
+            again = self.client.get(page, HTTP_IF_NONE_MATCH=response['ETag'])
+        return again, queries
+
+    def test_my_orders_not_modified(self):
+        page = url('my_orders')
+        response = self.client.get(page)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+
+        again, queries = self.revalidate(page, response)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        # oturum, kullanıcı, durum sorgusu; liste sorgusu ve render yok
+        self.assertEqual(len(queries), 3)
+
+        response = self.client.get(page, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_my_orders_changes_invalidate(self):
+        page = url('my_orders')
+        response = self.client.get(page)
+
+        bulk_set_status(Order.objects.filter(pk=self.order.pk), 'dubai')
+        again, _ = self.revalidate(page, response)
+        self.assertEqual(again.status_code, 200)
+        self.assertNotEqual(again['ETag'], response['ETag'])
+
+        # Sonraki sayfa ve başka dil ayrı sürümler
+        self.assertNotEqual(self.client.get(page, {'cursor': 'abc'})['ETag'], again['ETag'])
+        with translation.override('ar'):
+            arabic = self.client.get(reverse('my_orders'))
+        self.assertNotEqual(arabic['ETag'], again['ETag'])
+
+    def test_other_user_gets_fresh_page(self):
+        page = url('my_orders')
+        response = self.client.get(page)
+        self.client.force_login(User.objects.create_user('veli'))
+        again, _ = self.revalidate(page, response)
+        self.assertEqual(again.status_code, 200)
+
+    def test_queued_message_is_not_hidden_by_304(self):
+        page = url('my_orders')
+        response = self.client.get(page)
+
+        # Sipariş değişmez, sadece mesaj kuyruğa girer
+        self.client.get(url('cancel_order', self.order.pk))
+        again, _ = self.revalidate(page, response)
+        self.assertEqual(again.status_code, 200)
+        self.assertContains(again, 'Cannot cancel.')
+        self.assertNotIn('ETag', again)
+
+        # Mesaj gösterildi; sonraki doğrulama yine 304
+        self.assertEqual(self.revalidate(page, response)[0].status_code, 304)
+
+    def test_order_preview_not_modified_until_draft_changes(self):
+        page = url('order_preview', self.draft.pk)
+        response = self.client.get(page)
+        self.assertEqual(self.revalidate(page, response)[0].status_code, 304)
+
+        # Arka planda işlenen ekran görüntüsü, puan bakiyesi ve kur önizlemeyi değiştirir
+        screenshot = OrderScreenshot.objects.create(order=self.draft, image='screenshots/a.jpg')
+        again, _ = self.revalidate(page, response)
+        self.assertEqual(again.status_code, 200)
+        OrderScreenshot.objects.filter(pk=screenshot.pk).update(processed_at=timezone.now())
+        self.assertEqual(self.revalidate(page, again)[0].status_code, 200)
+
+        response = self.client.get(page)
+        record(self.user.id, 50, 'adjust')
+        self.assertEqual(self.revalidate(page, response)[0].status_code, 200)
+
+        response = self.client.get(page)
+        ExchangeRate.objects.create(our_rate=1600, market_rate=1450)
+        self.assertEqual(self.revalidate(page, response)[0].status_code, 200)
+
+    def test_order_preview_toggle_and_missing(self):
+        page = url('order_preview', self.draft.pk)
+        response = self.client.get(page)
+        self.client.post(page, {'toggle_points': '1'})
+        self.assertEqual(self.revalidate(page, response)[0].status_code, 200)
+
+        self.assertEqual(self.client.get(url('order_preview', self.order.pk)).status_code, 404)
+
+
+# --- SİPARİŞ DURUMU AKIŞI ---
+class OrderStatusFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('ali', 'ali@example.com', 'pass')
+        self.order = make_order(self.user, 'approved')
+        self.other = make_order(self.user, 'dubai')
+        make_order(self.user, 'draft')
+        make_order(User.objects.create_user('veli'), 'approved')
+
+    def test_requires_login(self):
+        response = self.client.get(reverse('order_status'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_returns_only_changes_since(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('order_status'))
+        data = response.json()
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual([order['id'] for order in data['orders']], [self.order.pk, self.other.pk])
+        self.assertEqual(data['orders'][1]['status_display'], '🇦🇪 Arrived in Dubai')
+        self.assertEqual(data['poll_after'], status_feed.SHORT_POLL_AFTER)
+        self.assertFalse(data['more'])
+
+        since = data['since']
+        self.assertEqual(self.client.get(reverse('order_status'), {'since': since}).json()['orders'], [])
+
+        self.order.tracking_note = 'Packed'
+        self.order.save()
+        data = self.client.get(reverse('order_status'), {'since': since, 'wait': 25}).json()
+        self.assertEqual(data['orders'], [{
+            'id': self.order.pk, 'status': 'approved', 'status_display': self.order.get_status_display(),
+            'tracking_note': 'Packed', 'updated_at': self.order.updated_at.isoformat(),
+        }])
+        self.assertGreater(data['since'], since)
+
+    def test_orders_sharing_a_timestamp_are_not_skipped(self):
+        # Toplu işlem hepsine aynı updated_at'i verir; sayfa sınırı bu ana denk gelir
+        since = str(timezone.now().timestamp())
+        Order.objects.bulk_create([Order(user=self.user, status='approved') for _ in range(150)])
+        bulk_set_status(Order.objects.filter(user=self.user), 'dubai')
+        moved_at = Order.objects.filter(user=self.user).latest('updated_at').updated_at
+        expected = set(Order.objects.filter(updated_at=moved_at).values_list('id', flat=True))
+        self.assertEqual(len(expected), 151)
+
+        self.client.force_login(self.user)
+        first = self.client.get(reverse('order_status'), {'since': since}).json()
+        self.assertEqual(len(first['orders']), status_feed.STATUS_LIMIT)
+        self.assertTrue(first['more'])
+        second = self.client.get(reverse('order_status'), {'since': first['since']}).json()
+        self.assertFalse(second['more'])
+        self.assertEqual({order['id'] for order in first['orders'] + second['orders']}, expected)
+
+        # SSE olay kimliği aynı imleç: Last-Event-ID ile kalan siparişler tekrar oynatılır
+        last = first['orders'][-1]
+        event_id = status_stream.format_event({'user': self.user.pk, **last}).split('\n')[0][len('id: '):]
+        self.assertEqual(event_id, first['since'])
+
+    def test_page_since_covers_changes_during_render(self):
+        from . import views
+
+        # Sayfa sorgusu ile render arasında admin siparişi günceller
+        keyset_page = views.keyset_page
+
+        def page_then_change(*args, **kwargs):
+            page = keyset_page(*args, **kwargs)
+            bulk_set_status(Order.objects.filter(pk=self.order.pk), 'dubai')
+            return page
+
+        self.client.force_login(self.user)
+        with mock.patch.object(views, 'keyset_page', page_then_change):
+            since = self.client.get(url('my_orders')).context['status_since']
+        data = self.client.get(reverse('order_status'), {'since': since}).json()
+        self.assertEqual([(order['id'], order['status']) for order in data['orders']], [(self.order.pk, 'dubai')])
+
+    def test_since_formats(self):
+        self.client.force_login(self.user)
+        epoch = str(timezone.now().timestamp() + 60)
+        self.assertEqual(self.client.get(reverse('order_status'), {'since': epoch}).json()['orders'], [])
+        for since in ('yesterday', '1e20', '-1e20', 'inf', '1,x'):
+            with self.subTest(since):
+                response = self.client.get(reverse('order_status'), {'since': since})
+                self.assertEqual(response.status_code, 400)
+
+    def test_saves_and_bulk_changes_touch_stamp(self):
+        key = status_feed.stamp_key(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.tracking_note = 'Packed'
+            self.order.save()
+        first = cache.get(key)
+        self.assertIsNotNone(first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_set_status(Order.objects.filter(pk=self.other.pk), 'shipping')
+        self.assertGreater(cache.get(key), first)
+
+    @mock.patch.object(status_feed, 'POLL_INTERVAL', 0.01)
+    async def test_long_poll_wakes_on_change(self):
+        since = timezone.now()
+        waiter = asyncio.create_task(status_feed.alatest(self.user.pk, status_feed.Cursor(since), wait=5))
+        await asyncio.sleep(0.05)
+        self.assertFalse(waiter.done())
+
+        await Order.objects.filter(pk=self.order.pk).aupdate(status='dubai', updated_at=timezone.now())
+        status_feed.touch([self.user.pk])
+        data = await asyncio.wait_for(waiter, 2)
+        self.assertEqual([(order['id'], order['status']) for order in data['orders']], [(self.order.pk, 'dubai')])
+        self.assertEqual(data['poll_after'], 0)
+
+    @mock.patch.object(status_feed, 'POLL_INTERVAL', 0.01)
+    async def test_long_poll_times_out_empty(self):
+        since = timezone.now()
+        data = await status_feed.alatest(self.user.pk, status_feed.Cursor(since), wait=0.05)
+        self.assertEqual(data['orders'], [])
+        self.assertEqual(data['since'], since.isoformat())
@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox, Order, PointsTransaction
+from .outbox import status_email
+from .points import record_many
+from .reports import order_bucket, refresh_rollups
+from .status_feed import touch_on_commit
+from .status_stream import publish_on_commit, transition
+
+# Admin'deki toplu işlemlerle ilerletilebilen durumlar
+PIPELINE_STATUSES = ('approved', 'dubai', 'shipping', 'arrived', 'delivered')
+
+
+# --- PUANLARI TOPLU YÜKLE (TEK INSERT + TEK UPDATE) ---
+def credit_points(orders):
+    record_many([
+        PointsTransaction(user_id=order.user_id, order=order, kind='earn', amount=order.points_to_earn)
+        for order in orders
+    ])
+
+
+# Gelen queryset (örn. admin changelist'i) kendi JOIN'lerini taşıyabilir; kilit
+# sadece sipariş satırlarına konur. PostgreSQL dış JOIN'in null tarafını
+# (profil) kilitleyemez, kullanıcı satırlarını kilitlemeye de gerek yok.
+def lock_orders(queryset, status):
+    return (
+        Order.objects.filter(pk__in=queryset.values('pk'))
+        .select_for_update(of=('self',))
+        .select_related('user')
+        .exclude(status='draft')
+        .exclude(status=status)
+    )
+
+
+# --- TOPLU DURUM DEĞİŞİKLİĞİ ---
+# save() yerine bulk_update kullandığı için sinyaller çalışmaz; sinyallerin
+# yaptığı işleri (puan, mail, rollup, durum akışı) burada toplu olarak yapıyoruz.
+def bulk_set_status(queryset, status):
+    with transaction.atomic():
+        orders = list(lock_orders(queryset, status))
+        if not orders:
+            return 0
+
+        now = timezone.now()
+        buckets = set()
+        previous = {}
+        for order in orders:
+            buckets.add(order_bucket(order))
+            previous[order.pk] = order.status
+            order.status = status
+            order.updated_at = now
+            buckets.add(order_bucket(order))
+
+        if status == 'delivered':
+            to_credit = [order for order in orders if not order.points_added_to_profile]
+            credit_points(to_credit)
+            for order in to_credit:
+                order.points_added_to_profile = True
+
+        Order.objects.bulk_update(orders, ['status', 'updated_at', 'points_added_to_profile'])
+
+        EmailOutbox.objects.bulk_create(
+            [status_email(order) for order in orders if order.user.email]
+        )
+        refresh_rollups(buckets)
+        touch_on_commit(order.user_id for order in orders)
+        publish_on_commit(transition(order, previous[order.pk]) for order in orders)
+
+    return len(orders)
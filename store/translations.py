@@ -1,7 +1,16 @@
-def get_translations(lang_code):
-    if not lang_code:
-        lang_code = 'en'
+import json
+import logging
+import os
+from types import MappingProxyType
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
+
+# --- TEMEL SÖZLÜK ---
+# Sadece import sırasında bir kez çağrılır (aşağıdaki BASE_CATALOGS).
+def _base_dictionary():
     dictionary = {
         'en': {
             'meta_title': 'Dalin Shopping | Easy Shein Orders',
@@ -119,6 +128,8 @@ def get_translations(lang_code):
             'ask_whatsapp': 'Ask on WhatsApp',
             'no_orders_title': 'No orders yet',
             'no_orders_text': "You haven't placed any orders yet.",
+            'older_orders_btn': 'Older Orders →',
+            'newest_orders_btn': '← Newest Orders',
             'order_summary_title': 'Order Summary',
             'order_summary_subtitle': 'Please review details before confirming.',
             'items_in_order': 'Items in Order',
@@ -298,6 +309,8 @@ def get_translations(lang_code):
             'ask_whatsapp': 'لە واتسئەپ بپرسە',
             'no_orders_title': 'هێشتا داواکاریت نییە',
             'no_orders_text': 'تۆ هێشتا هیچ داواکارییەکت ئەنجام نەداوە.',
+            'older_orders_btn': 'داواکارییە کۆنەکان ←',
+            'newest_orders_btn': '→ نوێترین داواکارییەکان',
             'order_summary_title': 'کورتەی داواکاری',
             'order_summary_subtitle': 'تکایە پێش پشتڕاستکردنەوە پێداچوونەوە بکە.',
             'items_in_order': 'کاڵاکانی ناو داواکاری',
@@ -477,6 +490,8 @@ def get_translations(lang_code):
             'ask_whatsapp': 'اسأل عبر واتساب',
             'no_orders_title': 'لا توجد طلبات بعد',
             'no_orders_text': 'لم تقم بإجراء أي طلبات حتى الآن.',
+            'older_orders_btn': 'الطلبات الأقدم ←',
+            'newest_orders_btn': '→ أحدث الطلبات',
             'order_summary_title': 'ملخص الطلب',
             'order_summary_subtitle': 'يرجى مراجعة التفاصيل قبل التأكيد.',
             'items_in_order': 'القطع في الطلب',
@@ -542,4 +557,60 @@ def get_translations(lang_code):
         }
     }
 
-    return dictionary.get(lang_code, dictionary['en'])
\ No newline at end of file
+    return dictionary
+
+
+# --- DERLENMİŞ KATALOGLAR ---
+# Her istekte 540 satırlık sözlüğü yeniden kurmak yerine bir kez kurup
+# dil başına salt okunur (MappingProxyType) olarak saklıyoruz.
+def _freeze(dictionary):
+    return MappingProxyType({lang: MappingProxyType(texts) for lang, texts in dictionary.items()})
+
+BASE_CATALOGS = _freeze(_base_dictionary())
+
+# Diskteki override dosyası (JSON): {"en": {"home": "Home"}, "ar": {...}}
+# Sadece mtime değiştiğinde tekrar okunur.
+_override_state = (None, None, BASE_CATALOGS)  # (path, mtime, catalogs)
+
+
+def _load_overrides(path):
+    with open(path, encoding='utf-8') as f:
+        overrides = json.load(f)
+
+    merged = {lang: dict(texts) for lang, texts in BASE_CATALOGS.items()}
+    for lang, texts in overrides.items():
+        merged.setdefault(lang, dict(BASE_CATALOGS['en'])).update(texts)
+    return _freeze(merged)
+
+
+def get_catalogs():
+    global _override_state
+
+    path = getattr(settings, 'TRANSLATIONS_OVERRIDE_FILE', None)
+    if not path:
+        return BASE_CATALOGS
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached_path, cached_mtime, catalogs = _override_state
+    if (cached_path, cached_mtime) == (path, mtime):
+        return catalogs
+
+    if mtime is None:
+        catalogs = BASE_CATALOGS
+    else:
+        try:
+            catalogs = _load_overrides(path)
+        except (OSError, ValueError, TypeError, AttributeError) as exc:
+            # Bozuk dosya siteyi düşürmesin; son geçerli katalogla devam et
+            logger.warning("Could not load translation overrides from %s: %s", path, exc)
+    _override_state = (path, mtime, catalogs)
+    return catalogs
+
+
+def get_translations(lang_code):
+    catalogs = get_catalogs()
+    return catalogs.get(lang_code or 'en', catalogs['en'])
@@ -1,23 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.response import TemplateResponse
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from .forms import OrderForm, RegisterForm, ProfileUpdateForm, CancelOrderForm
-from .models import Order, OrderItem, Product, Profile, OrderScreenshot
-from decimal import Decimal
+from .models import Order, OrderItem, Product, Profile
+from .pricing import POINT_VALUE_IQD, quote
+from .rates import current_rates
+from .pagination import keyset_page
+from .page_cache import cache_anonymous_page, cache_version
+from .conditional import conditional_page, my_orders_validators, preview_validators
+from .cart import attach_screenshots, parse_items, save_items
+from .points import locked_balance, record
+from . import perf, status_feed
 
-# --- AYARLAR ---
-MARKET_RATE = 1450      
-OUR_RATE = 1200           
-SHIPPING_FEE = 5000       
-POINT_EARN_RATE = 1000    
-POINT_VALUE_IQD = 25   
+MY_ORDERS_PAGE_SIZE = 20
 
 # --- ANA SAYFA ---
+# Anonim ziyaretçiye önbellekten gelir; giriş yapmışlara ürün ızgarası fragment olarak önbellekte
+@cache_anonymous_page
 def home(request):
     products = Product.objects.filter(is_active=True).order_by('-created_at')
-    return render(request, 'store/index.html', {'products': products})
+    return TemplateResponse(request, 'store/index.html', {
+        'products': products,
+        'our_rate': f"{current_rates().our_rate:,}",
+        'page_cache_version': cache_version(),
+    })
 
 # --- SİPARİŞ OLUŞTURMA (DRAFT) ---
 @login_required
@@ -51,24 +68,15 @@ def create_order(request):
             messages.error(request, 'Please add at least one item.')
             return redirect('create_order')
 
-        # Siparişi Oluştur
-        order = Order.objects.create(
-            user=request.user,
-            status='draft',
-            wants_to_use_points=use_points
-        )
-        
-        for img in images:
-            OrderScreenshot.objects.create(order=order, image=img)
-        
-        # Ürünleri Kaydet
-        for link, price in zip(links, prices):
-            if link and price:
-                OrderItem.objects.create(
-                    order=order,
-                    product_link=link,
-                    manual_price_usd=Decimal(price)
-                )
+        # Siparişi, ürünleri ve resimleri tek transaction'da toplu kaydet
+        with transaction.atomic():
+            order = Order.objects.create(
+                user=request.user,
+                status='draft',
+                wants_to_use_points=use_points
+            )
+            save_items(order, parse_items(links, prices), existing=[])
+            attach_screenshots(order, images)
 
         return redirect('order_preview', order_id=order.id)
 
@@ -93,24 +101,13 @@ def edit_order(request, order_id):
             messages.error(request, 'Please add at least one item.')
             return redirect('edit_order', order_id=order.id)
 
-        # Eski ürünleri sil (Temiz sayfa)
-        order.items.all().delete()
+        # Sadece değişen ürün satırlarına dokun (hepsini silip yeniden yazma)
+        with transaction.atomic():
+            save_items(order, parse_items(links, prices))
+            attach_screenshots(order, new_images)
 
-        # Yeni ürünleri ekle
-        for link, price in zip(links, prices):
-            if link and price:
-                OrderItem.objects.create(
-                    order=order,
-                    product_link=link,
-                    manual_price_usd=Decimal(price)
-                )
-
-        order.wants_to_use_points = use_points
-        order.save()
-
-        if new_images:
-            for img in new_images:
-                OrderScreenshot.objects.create(order=order, image=img)
+            order.wants_to_use_points = use_points
+            order.save()
 
         return redirect('order_preview', order_id=order.id)
     
@@ -123,6 +120,7 @@ def edit_order(request, order_id):
 
 # --- ÖNİZLEME (STEP 2: REVIEW) - DÜZELTİLDİ ---
 @login_required
+@conditional_page(preview_validators)
 def order_preview(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user, status='draft')
     profile = request.user.profile
@@ -133,45 +131,34 @@ def order_preview(request, order_id):
         order.save()
         return redirect('order_preview', order_id=order.id)
 
-    # --- KRİTİK DÜZELTME BURADA ---
-    items = order.items.all() # Tüm ürünleri çek
-    
-    # Tüm ürünlerin fiyatını topla (SUM)
-    total_usd = sum(item.manual_price_usd for item in items) 
+    items = list(order.items.all())
+    return render(request, 'store/order_preview.html', preview_context(
+        order, items, list(order.screenshots.all()), profile, current_rates()
+    ))
 
-    # Hesaplamaları TOPLAM USD üzerinden yap
-    market_price_iqd = (total_usd * Decimal(MARKET_RATE))
-    our_price_iqd = (total_usd * Decimal(OUR_RATE))
-    shipping_fee = Decimal(SHIPPING_FEE)
-    
-    total_before_discount = our_price_iqd + shipping_fee
-    
-    discount = 0
-    points_to_spend = 0
-
-    if order.wants_to_use_points and profile.dalin_points > 0:
-        points_to_spend = profile.dalin_points
-        discount = points_to_spend * POINT_VALUE_IQD
-        if discount > total_before_discount:
-            points_to_spend = int(total_before_discount / POINT_VALUE_IQD)
-            discount = points_to_spend * POINT_VALUE_IQD
-            
-    final_price = total_before_discount - discount
-
-    return render(request, 'store/order_preview.html', {
+# Sync ve async (store/async_views.py) önizleme aynı hesabı kullanır
+def preview_context(order, items, screenshots, profile, rates):
+    price = quote(
+        [item.manual_price_usd for item in items],
+        points_balance=profile.dalin_points,
+        use_points=order.wants_to_use_points,
+        our_rate=rates.our_rate,
+        market_rate=rates.market_rate,
+    )
+    return {
         'order': order,
         'items': items,
-        'market_rate': MARKET_RATE,
-        'our_rate': OUR_RATE,
-        'market_price_iqd': market_price_iqd,
-        'our_price_iqd': our_price_iqd,
-        'shipping_fee': shipping_fee,
-        'discount': discount,
-        'final_price': final_price,
-        'points_to_spend': points_to_spend,
+        'market_rate': rates.market_rate,
+        'our_rate': rates.our_rate,
+        'market_price_iqd': price.market_price_iqd,
+        'our_price_iqd': price.our_price_iqd,
+        'shipping_fee': price.shipping_fee,
+        'discount': price.discount,
+        'final_price': price.final_price,
+        'points_to_spend': price.points_to_spend,
         'profile': profile,
-        'screenshots': order.screenshots.all()
-    })
+        'screenshots': screenshots,
+    }
 
 # --- ONAYLA (STEP 3: SUCCESS) - DÜZELTİLDİ ---
 @login_required
@@ -179,49 +166,85 @@ def confirm_order(request, order_id):
     order = get_object_or_404(Order, id=order_id, user=request.user, status='draft')
     
     if request.method == 'POST':
-        profile = request.user.profile
-        
-        # --- KRİTİK DÜZELTME BURADA DA YAPILDI ---
-        items = order.items.all()
-        total_usd = sum(item.manual_price_usd for item in items)
+        rates = current_rates()
+
+        # Sipariş ve bakiye satırları kilitli: aynı sipariş iki kez onaylanamaz,
+        # aynı puanlar iki ayrı siparişte harcanamaz
+        with transaction.atomic():
+            order = get_object_or_404(
+                Order.objects.select_for_update(), id=order_id, user=request.user, status='draft'
+            )
+            price = quote(
+                [item.manual_price_usd for item in order.items.all()],
+                points_balance=locked_balance(request.user.id),
+                use_points=order.wants_to_use_points,
+                our_rate=rates.our_rate,
+                market_rate=rates.market_rate,
+            )
+
+            if price.points_to_spend:
+                record(request.user.id, -price.points_to_spend, 'spend', order=order)
+
+            # Kaydet
+            order.total_price_iqd = price.final_price
+            order.points_spent = price.points_to_spend
+            order.discount_amount = price.discount
+            order.points_to_earn = price.points_to_earn
+            order.our_rate = rates.our_rate
+            order.market_rate = rates.market_rate
+            order.status = 'pending'
+            order.save()
 
-        our_price_iqd = (total_usd * Decimal(OUR_RATE))
-        total_before_discount = our_price_iqd + Decimal(SHIPPING_FEE)
-        
-        discount = 0
-        points_spent = 0
-        
-        if order.wants_to_use_points and profile.dalin_points > 0:
-            points_spent = profile.dalin_points
-            discount = points_spent * POINT_VALUE_IQD
-            if discount > total_before_discount:
-                points_spent = int(total_before_discount / POINT_VALUE_IQD)
-                discount = points_spent * POINT_VALUE_IQD
-            
-            profile.dalin_points -= points_spent
-            profile.save()
-            
-        final_price = total_before_discount - discount
-        points_to_earn = int(final_price / POINT_EARN_RATE)
-        
-        # Kaydet
-        order.total_price_iqd = final_price
-        order.points_spent = points_spent
-        order.discount_amount = discount
-        order.points_to_earn = points_to_earn
-        order.status = 'pending'
-        order.save()
-        
         messages.success(request, '🎉 Order Confirmed!')
         return render(request, 'store/order_success.html', {'order': order})
         
     return redirect('home')
 
 # --- DİĞERLERİ (AYNI) ---
+# Ürün sayısı JOIN + GROUP BY yerine alt sorgu: böylece order_user_recent_idx
+# sıralamayı da karşılar ve LIMIT ilk sayfada erken keser
+def user_orders(user_id):
+    item_count = (
+        OrderItem.objects.filter(order=OuterRef('pk'))
+        .order_by().values('order')
+        .annotate(count=Count('*')).values('count')
+    )
+    return (
+        Order.objects.filter(user_id=user_id)
+        .exclude(status='draft')
+        .annotate(item_count=Coalesce(Subquery(item_count, output_field=IntegerField()), 0))
+    )
+
 @login_required
+@conditional_page(my_orders_validators)
 def my_orders(request):
-    orders = Order.objects.filter(user=request.user).exclude(status='draft').order_by('-created_at')
-    return render(request, 'store/my_orders.html', {'orders': orders})
+    # Ürün sayısı tek sorguda (sipariş başına COUNT yok), sayfalar cursor ile
+    orders = user_orders(request.user.id)
+    cursor = request.GET.get('cursor')
+    # Durum yoklaması sorgudan önceki andan başlar: arada gelen değişiklik kaçmasın
+    status_since = timezone.now()
+    orders, next_cursor = keyset_page(orders, cursor, MY_ORDERS_PAGE_SIZE)
+    return render(request, 'store/my_orders.html', {
+        'orders': orders,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+        'status_since': status_since.isoformat(),
+    })
+
+# --- SİPARİŞ DURUMU (JSON) ---
+# Siparişlerim sayfası bunu yoklar (store/js/my_orders.js). Senkron sürüm
+# long-poll yapmaz (thread tutmasın): ?wait yok sayılır, poll_after ile
+# istemciye ne kadar bekleyeceği söylenir. Long-poll async_views.py'de.
+@never_cache
+def order_status(request):
+    # login_required yönlendirmesi JSON istemcisine anlamsız; 401 dönüyoruz
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    try:
+        since = status_feed.parse_since(request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'error': 'invalid since'}, status=400)
+    return JsonResponse(status_feed.latest(request.user.id, since))
 
 @login_required
 def order_success(request):
@@ -259,8 +282,9 @@ def profile_view(request):
         form = ProfileUpdateForm(instance=profile)
     return render(request, 'store/profile.html', {'form': form, 'profile': profile})
 
+@cache_anonymous_page
 def faq_view(request):
-    return render(request, 'store/faq.html')
+    return TemplateResponse(request, 'store/faq.html')
 
 def register_view(request):
     if request.method == "POST":
@@ -288,4 +312,17 @@ def login_view(request):
 
 def logout_view(request):
     logout(request)
-    return redirect('home')
\ No newline at end of file
+    return redirect('home')
+
+# --- PERFORMANS PANELİ (admin) ---
+@staff_member_required
+def performance_dashboard(request):
+    if request.method == "POST":
+        perf.reset()
+        messages.success(request, "Performance statistics reset.")
+        return redirect('perf_dashboard')
+    return render(request, 'admin/performance.html', {
+        'title': "Performance",
+        'rows': perf.snapshot(),
+        'sample_rate': settings.PERF_SAMPLE_RATE,
+    })